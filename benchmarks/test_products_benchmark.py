@@ -0,0 +1,120 @@
+"""Benchmarks of the product repository queries."""
+
+import random
+
+from vineapp.products.pagination import cursor_for
+from vineapp.products.search import SearchIndex
+
+
+def test_get_all(repository, benchmark, size):
+    """Read all products and touch every row."""
+    products = benchmark(lambda: list(repository.get_all()))
+
+    assert len(products) == size
+
+
+def test_get_all_arrow(repository, benchmark, size):
+    """Read all products as an Arrow table."""
+    table = benchmark(repository.get_all_arrow)
+
+    assert table.num_rows == size
+
+
+def test_get_by_id(repository, benchmark, size):
+    """Look up products by random ids."""
+    rng = random.Random(0)
+
+    product = benchmark(lambda: repository.get_by_id(rng.randint(1, size)))
+
+    assert product is not None
+
+
+def test_get_many(repository, benchmark, size):
+    """Resolve a page worth of random ids in one query."""
+    rng = random.Random(0)
+
+    products = benchmark(
+        lambda: repository.get_many(rng.sample(range(1, size + 1), 50))
+    )
+
+    assert len(products) == 50
+
+
+def test_get_paginated_first_page(repository, benchmark):
+    """Get the first page in the default order."""
+    products, total = benchmark(lambda: repository.get_paginated(items_per_page=50))
+
+    assert len(products) == 50
+
+
+def test_get_paginated_deep_page(repository, benchmark, size):
+    """Get the page at 90% of the listing, sorted by name."""
+    page = size * 9 // 10 // 50
+
+    products, _ = benchmark(
+        lambda: repository.get_paginated(
+            page=page, items_per_page=50, sort_by="name", descending=True
+        )
+    )
+
+    assert len(products) == 50
+
+
+def test_get_paginated_deep_filtered_page(repository, benchmark, size):
+    """Get a deep page of a filtered listing, sorted by product group."""
+    # About one in six products is named after figs
+    page = size // 6 * 9 // 10 // 50
+
+    products, total = benchmark(
+        lambda: repository.get_paginated(
+            page=page,
+            items_per_page=50,
+            sort_by="product_group_name",
+            filter_text="fig",
+        )
+    )
+
+    assert len(products) == 50
+    assert total > page * 50
+
+
+def test_get_paginated_without_total(repository, benchmark, size):
+    """Get a deep page without counting the listing."""
+    page = size * 9 // 10 // 50
+
+    products, total = benchmark(
+        lambda: repository.get_paginated(
+            page=page, items_per_page=50, sort_by="name", include_total=False
+        )
+    )
+
+    assert len(products) == 50
+    assert total is None
+
+
+def test_get_keyset_page_deep(repository, benchmark, size):
+    """Continue from a cursor at 90% of the listing, sorted by name."""
+    offset_page = size * 9 // 10 // 50
+    products, _ = repository.get_paginated(
+        page=offset_page, items_per_page=50, sort_by="name", include_total=False
+    )
+    cursor = cursor_for(products[-1], "name", False, None, False)
+
+    page = benchmark(
+        lambda: repository.get_keyset_page(
+            cursor=cursor, items_per_page=50, include_total=False
+        )
+    )
+
+    assert len(page.products) == 50
+
+
+def test_search(repository, benchmark):
+    """Search products by text with a warm index."""
+    index = SearchIndex()
+
+    products, total = benchmark(
+        lambda: repository.search("okinawa 00", items_per_page=50, index=index)
+    )
+
+    assert total > 0
@@ -29,20 +29,179 @@ Example usage:
         print(f"Configuration error: {e}")
     except requests.RequestException as e:
         print(f"API request failed: {e}")
+
+In async code, such as the web pages, use :class:`AsyncFiberyGraphQLClient`
+to wait for Fibery without blocking the event loop and to run independent
+queries at the same time:
+
+    client = get_async_fibery_client()
+    schema, entities = await client.execute_many([schema_query, entities_query])
 """
 
+import asyncio
 import os
-from dataclasses import dataclass
-from typing import Optional
+import threading
+import weakref
+from dataclasses import dataclass, field
+from typing import List, MutableMapping, Optional, Sequence, Tuple
+
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Rate limited or temporarily unavailable, worth another try
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+@dataclass
+class HTTPSettings:
+    """Connection pool, timeout and retry configuration for Fibery requests."""
+
+    pool_size: int = 10
+    connect_timeout: float = 5.0
+    read_timeout: float = 30.0
+    retries: int = 3
+    backoff: float = 0.5
+    max_concurrency: int = 4
+
+    @classmethod
+    def from_env(cls) -> "HTTPSettings":
+        """Create settings from VINEAPP_FIBERY_* environment variables."""
+        defaults = cls()
+        return cls(
+            pool_size=int(os.getenv("VINEAPP_FIBERY_POOL_SIZE", defaults.pool_size)),
+            connect_timeout=float(
+                os.getenv("VINEAPP_FIBERY_CONNECT_TIMEOUT", defaults.connect_timeout)
+            ),
+            read_timeout=float(
+                os.getenv("VINEAPP_FIBERY_READ_TIMEOUT", defaults.read_timeout)
+            ),
+            retries=int(os.getenv("VINEAPP_FIBERY_RETRIES", defaults.retries)),
+            backoff=float(os.getenv("VINEAPP_FIBERY_BACKOFF", defaults.backoff)),
+            max_concurrency=int(
+                os.getenv("VINEAPP_FIBERY_MAX_CONCURRENCY", defaults.max_concurrency)
+            ),
+        )
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """Get the connect and read timeouts as requests expects them."""
+        return (self.connect_timeout, self.read_timeout)
+
+
+_session: Optional[requests.Session] = None
+_session_settings: Optional[HTTPSettings] = None
+_session_lock = threading.Lock()
+# An async client belongs to the event loop it is used on
+_async_clients: MutableMapping[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def create_session(settings: HTTPSettings) -> requests.Session:
+    """Create a session keeping connections to Fibery alive between queries.
+
+    Failed requests are retried with exponential backoff on connection errors
+    and on the statuses in RETRY_STATUSES, honouring ``Retry-After``. GraphQL
+    queries are sent as POSTs but don't change anything, so they are safe to
+    retry. Responses are requested gzip compressed and decoded by requests.
+    """
+    retry = Retry(
+        total=settings.retries,
+        backoff_factor=settings.backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"POST"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=settings.pool_size,
+        pool_maxsize=settings.pool_size,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Accept-Encoding"] = "gzip, deflate"
+    return session
+
+
+def get_session() -> requests.Session:
+    """Get the session shared by all Fibery clients, creating it once.
+
+    Its settings are read from the environment when it is created.
+    """
+    global _session, _session_settings
+    with _session_lock:
+        if _session is None:
+            _session_settings = HTTPSettings.from_env()
+            _session = create_session(_session_settings)
+        return _session
+
+
+def get_http_settings() -> HTTPSettings:
+    """Get the settings of the shared session, or from the environment."""
+    return _session_settings or HTTPSettings.from_env()
+
+
+def close_session() -> None:
+    """Close the pooled connections and forget the shared session."""
+    global _session, _session_settings
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _session_settings = None
+
+
+def create_async_client(settings: HTTPSettings) -> httpx.AsyncClient:
+    """Create an async HTTP client keeping connections to Fibery alive.
+
+    Connection failures are retried by the transport; responses with a
+    status in RETRY_STATUSES are retried by :class:`AsyncFiberyGraphQLClient`.
+    httpx requests and decodes gzip responses by default.
+    """
+    limits = httpx.Limits(
+        max_connections=settings.pool_size,
+        max_keepalive_connections=settings.pool_size,
+    )
+    return httpx.AsyncClient(
+        transport=httpx.AsyncHTTPTransport(retries=settings.retries, limits=limits),
+        timeout=httpx.Timeout(settings.read_timeout, connect=settings.connect_timeout),
+    )
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """Get the async HTTP client shared on the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _session_lock:
+        client = _async_clients.get(loop)
+        if client is None or client.is_closed:
+            client = create_async_client(get_http_settings())
+            _async_clients[loop] = client
+        return client
+
+
+async def close_async_client() -> None:
+    """Close the pooled connections of the running event loop's async client."""
+    with _session_lock:
+        client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
 
 
 @dataclass
 class FiberyGraphQLClient:
-    """Client for interacting with Fibery's GraphQL API."""
+    """Client for interacting with Fibery's GraphQL API.
+
+    Queries are sent over the session shared by all clients unless one is
+    given, so clients are cheap to create and reuse open connections.
+    """
 
     url: str
     token: str
+    session: Optional[requests.Session] = field(default=None, repr=False)
+    timeout: Optional[Tuple[float, float]] = None
 
     def execute(self, query: str) -> dict:
         """Execute a GraphQL query against the Fibery API.
@@ -60,13 +219,110 @@ class FiberyGraphQLClient:
             "Authorization": f"Token {self.token}",
             "Content-Type": "application/json",
         }
+        session = self.session or get_session()
+        timeout = self.timeout or get_http_settings().timeout
 
-        response = requests.post(self.url, headers=headers, json={"query": query})
+        response = session.post(
+            self.url, headers=headers, json={"query": query}, timeout=timeout
+        )
         response.raise_for_status()  # Raise exception for error status codes
 
         return response.json()
 
 
+@dataclass
+class AsyncFiberyGraphQLClient:
+    """Async client for Fibery's GraphQL API.
+
+    Queries are sent over the async HTTP client shared on the event loop
+    unless one is given.
+    """
+
+    url: str
+    token: str
+    client: Optional[httpx.AsyncClient] = field(default=None, repr=False)
+    settings: Optional[HTTPSettings] = None
+
+    async def execute(self, query: str) -> dict:
+        """Execute a GraphQL query against the Fibery API.
+
+        Rate limited and failed queries are sent again after a backoff.
+
+        Args:
+            query: The GraphQL query to execute
+
+        Returns:
+            The JSON response from the API
+
+        Raises:
+            httpx.HTTPError: If the request fails or returns an error status
+        """
+        settings = self.settings or get_http_settings()
+        client = self.client or get_async_client()
+        headers = {
+            "Authorization": f"Token {self.token}",
+            "Content-Type": "application/json",
+        }
+
+        for attempt in range(settings.retries + 1):
+            response = await client.post(
+                self.url, headers=headers, json={"query": query}
+            )
+            if response.status_code not in RETRY_STATUSES:
+                break
+            if attempt < settings.retries:
+                await asyncio.sleep(_retry_delay(response, settings.backoff, attempt))
+        response.raise_for_status()
+
+        return response.json()
+
+    async def execute_many(
+        self, queries: Sequence[str], max_concurrency: Optional[int] = None
+    ) -> List[dict]:
+        """Execute independent GraphQL queries concurrently.
+
+        Args:
+            queries: The GraphQL queries to execute
+            max_concurrency: Most queries to have in flight at once,
+                VINEAPP_FIBERY_MAX_CONCURRENCY if None
+
+        Returns:
+            The JSON responses, in the order of the queries
+
+        Raises:
+            httpx.HTTPError: If any of the requests fails
+        """
+        settings = self.settings or get_http_settings()
+        limit = asyncio.Semaphore(max_concurrency or settings.max_concurrency)
+
+        async def execute(query: str) -> dict:
+            async with limit:
+                return await self.execute(query)
+
+        return list(await asyncio.gather(*(execute(query) for query in queries)))
+
+
+def _retry_delay(response: httpx.Response, backoff: float, attempt: int) -> float:
+    """Get the seconds to wait before a retry, as the server asks if it does."""
+    try:
+        return max(float(response.headers["Retry-After"]), 0.0)
+    except (KeyError, ValueError):
+        return backoff * 2**attempt
+
+
+def _get_configuration(space_name: Optional[str]) -> Tuple[str, str]:
+    """Get the GraphQL URL and token from the environment."""
+    token = os.getenv("VINEAPP_FIBERY_TOKEN")
+    if not token:
+        raise ValueError("VINEAPP_FIBERY_TOKEN environment variable is not set")
+
+    from vineapp.fibery.models import get_fibery_info
+
+    info = get_fibery_info(space_name=space_name)
+
+    return str(info.graphql_url), token
+
+
 def get_fibery_client(space_name: Optional[str] = None) -> FiberyGraphQLClient:
     """Get a configured Fibery GraphQL client using environment variables.
 
@@ -79,12 +335,23 @@ def get_fibery_client(space_name: Optional[str] = None) -> FiberyGraphQLClient:
     Raises:
         ValueError: If required environment variables are not set
     """
-    token = os.getenv("VINEAPP_FIBERY_TOKEN")
-    if not token:
-        raise ValueError("VINEAPP_FIBERY_TOKEN environment variable is not set")
+    url, token = _get_configuration(space_name)
+    return FiberyGraphQLClient(url=url, token=token)
 
-    from vineapp.fibery.models import get_fibery_info
 
-    info = get_fibery_info(space_name=space_name)
+def get_async_fibery_client(
+    space_name: Optional[str] = None,
+) -> AsyncFiberyGraphQLClient:
+    """Get a configured async Fibery GraphQL client using environment variables.
+
+    Args:
+        space_name: Optional space name to override the environment variable
+
+    Returns:
+        A configured AsyncFiberyGraphQLClient instance
 
-    return FiberyGraphQLClient(url=str(info.graphql_url), token=token)
+    Raises:
+        ValueError: If required environment variables are not set
+    """
+    url, token = _get_configuration(space_name)
+    return AsyncFiberyGraphQLClient(url=url, token=token)
@@ -0,0 +1,192 @@
+"""Local HTTP server standing in for the Fibery GraphQL API.
+
+:class:`FiberyGraphQLServer` answers the GraphQL queries the knowledge base
+pages send, for a space with a few synthetic databases, so those pages can be
+load tested without network access::
+
+    cliapp fibery-server --latency 0.1
+    VINEAPP_FIBERY_URL=http://localhost:32080/ VINEAPP_FIBERY_SPACE=Public
+    VINEAPP_FIBERY_TOKEN=any
+
+It understands schema introspection (``__schema`` and ``__type``) and
+``find<Database>s (limit: n)`` entity queries; anything else gets a GraphQL
+error, like Fibery returns for unknown fields. Any token is accepted.
+Connections are kept alive between requests, as Fibery does, and counted in
+:attr:`FiberyGraphQLServer.connections`.
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_PORT = 32080
+DEFAULT_SPACE = "Public"
+DEFAULT_DATABASES = ("Actie", "Werkdocument", "Leerpunt")
+
+FIELDS = {"id": "ID", "name": "String", "description": "RichText"}
+
+_TYPE = re.compile(r'__type\s*\(\s*name:\s*"(\w+)"\s*\)')
+_FIND = re.compile(r"\{\s*(find\w+)\s*\(\s*limit:\s*(\d+)\s*\)")
+
+
+class FiberyGraphQLServer(ThreadingHTTPServer):
+    """Threaded HTTP server answering GraphQL queries on synthetic databases.
+
+    Use it as a context manager to serve from a background thread.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        space: str = DEFAULT_SPACE,
+        databases: Sequence[str] = DEFAULT_DATABASES,
+        latency: float = 0.0,
+    ):
+        """Bind the server.
+
+        Args:
+            host: Address to listen on
+            port: Port to listen on, 0 picks a free port
+            space: Name of the Fibery space
+            databases: Names of the databases in the space
+            latency: Seconds to wait before answering each query
+        """
+        super().__init__((host, port), _GraphQLHandler)
+        self.space = space
+        self.databases = list(databases)
+        self.latency = latency
+        self.connections = 0
+        self._connections_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        """Get the port the server listens on."""
+        return self.server_address[1]
+
+    @property
+    def url(self) -> str:
+        """Get the base URL to set as VINEAPP_FIBERY_URL."""
+        return f"http://{self.server_address[0]}:{self.port}/"
+
+    @property
+    def path(self) -> str:
+        """Get the path of the space's GraphQL endpoint."""
+        return f"/api/graphql/space/{self.space.replace(' ', '_')}"
+
+    def __enter__(self) -> "FiberyGraphQLServer":
+        """Start serving from a background thread."""
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+
+    def execute(self, query: str) -> Dict:
+        """Answer a GraphQL query.
+
+        Returns:
+            The GraphQL response, with ``data`` or ``errors``
+        """
+        prefix = self.space.replace(" ", "")
+        if "__schema" in query:
+            types = [self._type(f"{prefix}{name}") for name in self.databases]
+            types.append({"name": f"{prefix}BackgroundJob", "fields": [{"name": "id"}]})
+            types.append({"name": "String", "fields": None})
+            find_fields = [{"name": f"find{name}s"} for name in self.databases]
+            types.append({"name": "Query", "fields": find_fields})
+            return {"data": {"__schema": {"types": types}}}
+
+        match = _TYPE.search(query)
+        if match:
+            type_name = match.group(1)
+            known = type_name in {f"{prefix}{name}" for name in self.databases}
+            return {"data": {"__type": self._type(type_name) if known else None}}
+
+        match = _FIND.search(query)
+        if match:
+            field, limit = match.group(1), int(match.group(2))
+            if field in {f"find{name}s" for name in self.databases}:
+                return {"data": {field: self._entities(field[4:-1], limit)}}
+            return _error(f'Cannot query field "{field}" on type "Query".')
+        return _error("Unsupported query")
+
+    @staticmethod
+    def _type(name: str) -> Dict:
+        """Describe a database type and its fields."""
+        return {
+            "name": name,
+            "fields": [
+                {"name": field, "type": {"name": type_name}}
+                for field, type_name in FIELDS.items()
+            ],
+        }
+
+    @staticmethod
+    def _entities(database: str, limit: int) -> List[Dict]:
+        """Create synthetic entities of a database."""
+        return [
+            {
+                "id": f"{database.lower()}-{i}",
+                "name": f"{database} {i}",
+                "description": {"text": f"Description of {database.lower()} {i}"},
+            }
+            for i in range(1, limit + 1)
+        ]
+
+
+def _error(message: str) -> Dict:
+    """Create a GraphQL error response."""
+    return {"errors": [{"message": message}]}
+
+
+class _GraphQLHandler(BaseHTTPRequestHandler):
+    """Handles POSTs of GraphQL queries to the space's endpoint."""
+
+    server: FiberyGraphQLServer
+    # Keep connections alive; every response has a Content-Length
+    protocol_version = "HTTP/1.1"
+
+    def setup(self) -> None:
+        super().setup()
+        with self.server._connections_lock:
+            self.server.connections += 1
+
+    def do_POST(self) -> None:
+        if self.path.rstrip("/") != self.server.path:
+            self._send(404, {"message": "Not found"})
+            return
+        if not self.headers.get("Authorization", "").startswith("Token "):
+            self._send(401, {"message": "Unauthorized"})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            query = json.loads(self.rfile.read(length))["query"]
+        except (ValueError, KeyError, TypeError):
+            self._send(400, {"message": "Expected a JSON body with a query"})
+            return
+        if self.server.latency > 0:
+            time.sleep(self.server.latency)
+        self._send(200, self.server.execute(query))
+
+    def _send(self, status: int, body: Dict) -> None:
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args) -> None:
+        """Keep request logs off the console."""
@@ -129,39 +129,17 @@ class FiberyDatabase(BaseModel):
             ValueError: If schema or entities cannot be loaded
         """
         from .graphql import get_fibery_client
+        from .schema import get_schema_cache
 
         # Convert name to type name (e.g., 'actions' -> '{space_name}Actions')
         # Remove spaces from space name in type prefix
         type_prefix = space_name.replace(" ", "")
         type_name = f"{type_prefix}{name.title()}"
 
-        # Get schema information using GraphQL
+        # Get schema information from the cached schema of the space
         client = get_fibery_client()
-        schema_query = f"""
-            query {{
-                __type(name: "{type_name}") {{
-                    name
-                    fields {{
-                        name
-                        type {{
-                            name
-                        }}
-                    }}
-                }}
-            }}
-        """
-
-        schema_result = client.execute(schema_query)
-        if "errors" in schema_result:
-            error_msg = schema_result["errors"][0].get(
-                "message", "Unknown GraphQL error"
-            )
-            raise ValueError(f"GraphQL Error: {error_msg}")
-
-        if "data" not in schema_result or "__type" not in schema_result["data"]:
-            raise ValueError("Unexpected API response format")
-
-        type_info = schema_result["data"]["__type"]
+        types = get_schema_cache(client.url).get(client)
+        type_info = types.get(type_name)
         if not type_info:
             raise ValueError(f"Type '{type_name}' not found")
 
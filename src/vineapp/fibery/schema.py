@@ -0,0 +1,259 @@
+"""Cache of the GraphQL schema of a Fibery space.
+
+The schema of a space only changes when someone adds a database or a field,
+yet the knowledge base pages need it on every visit. A :class:`SchemaCache`
+loads the whole schema with one introspection query and then answers which
+databases there are and which fields they have without asking Fibery:
+
+- when it is older than its ttl, it is reloaded in the background while the
+  copy it has keeps being served
+- with ``VINEAPP_FIBERY_SCHEMA_CACHE_PATH`` set, it is also kept in a JSON
+  file, so a restarted server starts with the schema it had
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from .graphql import AsyncFiberyGraphQLClient, FiberyGraphQLClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 3600.0
+
+SCHEMA_QUERY = """
+    query {
+        __schema {
+            types {
+                name
+                fields {
+                    name
+                    type {
+                        name
+                    }
+                }
+            }
+        }
+    }
+"""
+
+# Types by name, as returned by SCHEMA_QUERY
+Types = Dict[str, Dict]
+
+
+def parse_schema(result: Dict) -> Types:
+    """Get the types by name from the result of SCHEMA_QUERY.
+
+    Raises:
+        ValueError: If the result has errors or an unexpected format
+    """
+    if "errors" in result:
+        error_msg = result["errors"][0].get("message", "Unknown GraphQL error")
+        raise ValueError(f"GraphQL Error: {error_msg}")
+    try:
+        types = result["data"]["__schema"]["types"]
+    except (KeyError, TypeError):
+        raise ValueError("Unexpected API response format")
+    return {type_info["name"]: type_info for type_info in types}
+
+
+class SchemaCache:
+    """The GraphQL types of a Fibery space, loaded once and refreshed when stale.
+
+    :meth:`get` and :meth:`aget` load the schema if there is none yet. A
+    stale schema is returned as is while one reload runs in the background;
+    if that fails, the schema is kept and the next call tries again.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        path: Optional[Path] = None,
+    ):
+        """Initialize an empty cache.
+
+        Args:
+            url: GraphQL URL of the space
+            ttl: Seconds after loading that the schema is reloaded
+            path: JSON file to keep the schema in, none if None
+        """
+        self.url = url
+        self.ttl = ttl
+        self.path = path
+        self._types: Optional[Types] = None
+        # Wall clock time, so it stays meaningful in the file
+        self._loaded_at = 0.0
+        self._read = False
+        self._refreshing = False
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+    @property
+    def age(self) -> float:
+        """Get the number of seconds since the schema was loaded."""
+        return time.time() - self._loaded_at
+
+    @property
+    def stale(self) -> bool:
+        """Check whether the schema is older than the ttl."""
+        return self.age > self.ttl
+
+    def get(self, client: FiberyGraphQLClient) -> Types:
+        """Get the types by name, reloading a stale schema in a thread.
+
+        Raises:
+            ValueError: If there is no schema yet and it can't be loaded
+            requests.RequestException: If there is no schema yet and the
+                request fails
+        """
+        types = self._cached()
+        if types is None:
+            return self.update(client.execute(SCHEMA_QUERY))
+        if self._claim_refresh():
+            threading.Thread(target=self._refresh, args=(client,), daemon=True).start()
+        return types
+
+    async def aget(self, client: AsyncFiberyGraphQLClient) -> Types:
+        """Get the types by name, reloading a stale schema in a task.
+
+        Raises:
+            ValueError: If there is no schema yet and it can't be loaded
+            httpx.HTTPError: If there is no schema yet and the request fails
+        """
+        types = self._cached()
+        if types is None:
+            return self.update(await client.execute(SCHEMA_QUERY))
+        if self._claim_refresh():
+            self._task = asyncio.get_running_loop().create_task(self._arefresh(client))
+        return types
+
+    def update(self, result: Dict) -> Types:
+        """Replace the schema by the result of SCHEMA_QUERY.
+
+        Returns:
+            The new types by name
+
+        Raises:
+            ValueError: If the result has errors or an unexpected format
+        """
+        types = parse_schema(result)
+        with self._lock:
+            self._types = types
+            self._loaded_at = time.time()
+        if self.path is not None:
+            _write(self.path, self.url, {"loaded_at": self._loaded_at, "types": types})
+        return types
+
+    def invalidate(self) -> None:
+        """Forget the schema, so the next call loads it again."""
+        with self._lock:
+            self._types = None
+            self._loaded_at = 0.0
+
+    def _cached(self) -> Optional[Types]:
+        """Get the schema in memory, read from the file the first time."""
+        with self._lock:
+            if not self._read and self.path is not None:
+                entry = _read(self.path).get(self.url)
+                if entry:
+                    self._types = entry["types"]
+                    self._loaded_at = entry["loaded_at"]
+            self._read = True
+            return self._types
+
+    def _claim_refresh(self) -> bool:
+        """Check whether a reload is due and no other one is running."""
+        with self._lock:
+            if self._refreshing or not self.stale:
+                return False
+            self._refreshing = True
+            return True
+
+    def _refresh(self, client: FiberyGraphQLClient) -> None:
+        """Reload the schema, keeping the current one if that fails."""
+        try:
+            self.update(client.execute(SCHEMA_QUERY))
+        except Exception:
+            logger.warning("Reloading the schema of %s failed", self.url, exc_info=True)
+        finally:
+            self._refreshing = False
+
+    async def _arefresh(self, client: AsyncFiberyGraphQLClient) -> None:
+        """Reload the schema, keeping the current one if that fails."""
+        try:
+            self.update(await client.execute(SCHEMA_QUERY))
+        except Exception:
+            logger.warning("Reloading the schema of %s failed", self.url, exc_info=True)
+        finally:
+            self._refreshing = False
+
+
+_file_lock = threading.Lock()
+
+
+def _read(path: Path) -> Dict:
+    """Read the schemas kept in a file by URL, none if it can't be read."""
+    try:
+        with _file_lock:
+            return json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError):
+        logger.warning("Ignoring unreadable schema cache %s", path, exc_info=True)
+        return {}
+
+
+def _write(path: Path, url: str, entry: Dict) -> None:
+    """Keep the schema of a URL in a file, next to those of other URLs."""
+    try:
+        with _file_lock:
+            try:
+                schemas = json.loads(path.read_text())
+            except (OSError, ValueError):
+                schemas = {}
+            schemas[url] = entry
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = path.with_name(path.name + ".tmp")
+            temporary.write_text(json.dumps(schemas))
+            temporary.replace(path)
+    except OSError:
+        logger.warning("Could not write the schema cache %s", path, exc_info=True)
+
+
+_caches: Dict[str, SchemaCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_schema_cache(url: str) -> SchemaCache:
+    """Get the process-wide schema cache of a Fibery space.
+
+    The reload interval is read from ``VINEAPP_FIBERY_SCHEMA_TTL`` (in
+    seconds, 3600 by default) and the file to keep schemas in from
+    ``VINEAPP_FIBERY_SCHEMA_CACHE_PATH`` (none by default).
+
+    Args:
+        url: GraphQL URL of the space
+
+    Returns:
+        The shared SchemaCache instance
+    """
+    with _caches_lock:
+        if url not in _caches:
+            ttl = float(
+                os.getenv("VINEAPP_FIBERY_SCHEMA_TTL", str(DEFAULT_TTL_SECONDS))
+            )
+            path = os.getenv("VINEAPP_FIBERY_SCHEMA_CACHE_PATH")
+            _caches[url] = SchemaCache(url, ttl=ttl, path=Path(path) if path else None)
+        return _caches[url]
+
+
+def clear_schema_caches() -> None:
+    """Forget the schemas of all spaces, in memory; files are kept."""
+    with _caches_lock:
+        _caches.clear()
@@ -0,0 +1,79 @@
+"""Arrow representations of product data."""
+
+from typing import Iterator, Union
+
+import pyarrow as pa
+from pyarrow import flight
+
+from vineapp.products.profiling import phase
+
+PRODUCT_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("name", pa.string()),
+        ("product_group_id", pa.int64()),
+        ("product_group_name", pa.string()),
+    ]
+)
+
+
+def to_product_table(
+    table: Union[pa.Table, pa.RecordBatch],
+) -> Union[pa.Table, pa.RecordBatch]:
+    """Select and cast the product columns of a query result.
+
+    Args:
+        table: Arrow table or record batch with at least the product columns
+
+    Returns:
+        A table (or batch) with exactly the columns and types of PRODUCT_SCHEMA
+    """
+    return table.select(PRODUCT_SCHEMA.names).cast(PRODUCT_SCHEMA)
+
+
+def read_flight(connection, sql: str) -> pa.Table:
+    """Run a query over a Dremio Flight connection and read the Arrow result.
+
+    Args:
+        connection: A sqlalchemy_dremio DBAPI connection
+        sql: The SQL statement to run
+
+    Returns:
+        The result as sent by Dremio, without conversion to Python rows
+    """
+    client, options = connection.flightclient, connection.options
+    with phase("execute"):
+        descriptor = flight.FlightDescriptor.for_command(sql)
+        info = client.get_flight_info(descriptor, options)
+    with phase("fetch"):
+        tables = [
+            client.do_get(endpoint.ticket, options).read_all()
+            for endpoint in info.endpoints
+        ]
+        return pa.concat_tables(tables) if tables else info.schema.empty_table()
+
+
+def stream_flight(connection, sql: str) -> Iterator[pa.RecordBatch]:
+    """Run a query over a Dremio Flight connection and yield batches as they arrive.
+
+    Args:
+        connection: A sqlalchemy_dremio DBAPI connection
+        sql: The SQL statement to run
+
+    Yields:
+        The record batches of the result, in the order Dremio sends them
+    """
+    client, options = connection.flightclient, connection.options
+    info = client.get_flight_info(flight.FlightDescriptor.for_command(sql), options)
+    for endpoint in info.endpoints:
+        for chunk in client.do_get(endpoint.ticket, options):
+            yield chunk.data
+
+
+def rebatch(
+    batches: Iterator[pa.RecordBatch], batch_size: int
+) -> Iterator[pa.RecordBatch]:
+    """Split record batches so none is larger than batch_size rows."""
+    for batch in batches:
+        for offset in range(0, batch.num_rows, batch_size):
+            yield batch.slice(offset, batch_size)
@@ -0,0 +1,158 @@
+"""Async product access for code running on an event loop.
+
+Dremio queries block while the Flight client waits for results. The async
+repository runs them on a bounded thread pool, so an event loop such as the
+one NiceGUI serves every browser tab from keeps handling other work.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional, Tuple, TypeVar, Union
+
+from vineapp.products.cache import CachedProductRepository
+from vineapp.products.engine import PoolSettings
+from vineapp.products.models import Product, ProductRepository, ProductTable
+from vineapp.products.pagination import KeysetPage
+from vineapp.products.snapshot import ProductSnapshot
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the process-wide thread pool that runs blocking product queries.
+
+    The number of threads is read from ``VINEAPP_DB_MAX_WORKERS``. It defaults
+    to the number of connections the engine pool can hand out, so queries
+    don't queue up on threads only to wait for a pooled connection.
+
+    Returns:
+        The shared executor
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            settings = PoolSettings.from_env()
+            max_workers = int(
+                os.getenv(
+                    "VINEAPP_DB_MAX_WORKERS",
+                    settings.size + settings.max_overflow,
+                )
+            )
+            _executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="vineapp-db"
+            )
+        return _executor
+
+
+def shutdown_executor() -> None:
+    """Stop the shared thread pool after running queries have finished."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+class AsyncProductRepository:
+    """Awaitable wrapper around a product repository or snapshot.
+
+    Every call runs the blocking method of the wrapped data source on a
+    thread pool and awaits its result, leaving the event loop free.
+    """
+
+    def __init__(
+        self,
+        repository: Optional[
+            Union[ProductRepository, ProductSnapshot, CachedProductRepository]
+        ] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        """Initialize the async repository.
+
+        Args:
+            repository: Data source to query, a default ProductRepository if None
+            executor: Thread pool to run queries on, the shared one if None
+        """
+        self.repository = repository or ProductRepository()
+        self.executor = executor
+
+    async def get_all(self) -> ProductTable:
+        """Get all products, ordered by product group and name."""
+        return await self._run(self.repository.get_all)
+
+    async def get_by_id(self, product_id: int) -> Optional[Product]:
+        """Get a product by its ID, None if it doesn't exist."""
+        return await self._run(self.repository.get_by_id, product_id)
+
+    async def get_many(self, product_ids: Iterable[int]) -> List[Product]:
+        """Get the products with the given IDs in a single query."""
+        return await self._run(self.repository.get_many, list(product_ids))
+
+    async def search(
+        self, text: str, page: int = 1, items_per_page: int = 10
+    ) -> Tuple[List[Product], int]:
+        """Search products by name and product group name, best matches first.
+
+        Takes the same arguments as :meth:`ProductRepository.search`.
+        """
+        return await self._run(self.repository.search, text, page, items_per_page)
+
+    async def get_paginated(
+        self,
+        page: int = 1,
+        items_per_page: int = 10,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+        filter_text: Optional[str] = None,
+        include_total: bool = True,
+    ) -> Tuple[List[Product], Optional[int]]:
+        """Get paginated products.
+
+        Takes the same arguments as :meth:`ProductRepository.get_paginated`.
+        """
+        return await self._run(
+            self.repository.get_paginated,
+            page=page,
+            items_per_page=items_per_page,
+            sort_by=sort_by,
+            descending=descending,
+            filter_text=filter_text,
+            include_total=include_total,
+        )
+
+    async def get_keyset_page(
+        self,
+        cursor: Optional[str] = None,
+        items_per_page: int = 10,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+        filter_text: Optional[str] = None,
+        include_total: bool = True,
+    ) -> KeysetPage:
+        """Get a page of products continuing from a keyset cursor.
+
+        Takes the same arguments as :meth:`ProductRepository.get_keyset_page`.
+        """
+        return await self._run(
+            self.repository.get_keyset_page,
+            cursor=cursor,
+            items_per_page=items_per_page,
+            sort_by=sort_by,
+            descending=descending,
+            filter_text=filter_text,
+            include_total=include_total,
+        )
+
+    async def _run(self, function: Callable[..., T], *args, **kwargs) -> T:
+        """Run a blocking call on the thread pool and await its result."""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, function, *args, **kwargs)
+        return await loop.run_in_executor(self.executor or get_executor(), call)
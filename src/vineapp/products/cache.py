@@ -0,0 +1,418 @@
+"""Query result cache for product repositories.
+
+Most visitors ask for the same few pages, typically the first page in the
+default order. A :class:`CachedProductRepository` answers repeated calls with
+the same (normalised) parameters from a :class:`QueryCache` instead of
+running them on Dremio again. It also remembers every product it has read by
+id, so opening a product that was just listed doesn't need a query.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields, is_dataclass, replace
+from typing import Any, Callable, Hashable, Iterable, List, Optional, Tuple, Union
+
+from vineapp.products.models import Product, ProductRepository, ProductTable
+from vineapp.products.pagination import KeysetPage
+from vineapp.products.snapshot import ProductSnapshot
+
+DEFAULT_TTL_SECONDS = 60.0
+DEFAULT_MAX_ENTRIES = 1000
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+DEFAULT_PRODUCT_TTL_SECONDS = 300.0
+DEFAULT_PRODUCT_MAX_ENTRIES = 10000
+
+_MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    """Counters describing how well a cache answers lookups."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Get the fraction of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+@dataclass
+class _Entry:
+    """A cached value with its expiry time and estimated size."""
+
+    value: Any
+    expires_at: float
+    size: int
+
+
+@dataclass
+class QueryCache:
+    """Thread-safe LRU cache whose entries expire after a time to live.
+
+    The least recently used entries are evicted when the cache holds more
+    than ``max_entries`` values or more than ``max_bytes`` estimated bytes.
+    """
+
+    ttl: float = DEFAULT_TTL_SECONDS
+    max_entries: int = DEFAULT_MAX_ENTRIES
+    max_bytes: int = DEFAULT_MAX_BYTES
+    stats: CacheStats = field(default_factory=CacheStats)
+    _entries: "OrderedDict[Hashable, _Entry]" = field(
+        default_factory=OrderedDict, repr=False
+    )
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @classmethod
+    def from_env(
+        cls,
+        prefix: str = "VINEAPP_QUERY_CACHE",
+        ttl: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> "QueryCache":
+        """Create a cache configured with environment variables.
+
+        Args:
+            prefix: Prefix of the _TTL, _MAX_ENTRIES and _MAX_BYTES variables
+            ttl: Time to live used when the variable is not set
+            max_entries: Maximum number of entries used when not set
+            max_bytes: Maximum estimated size used when not set
+        """
+        return cls(
+            ttl=float(os.getenv(f"{prefix}_TTL", ttl)),
+            max_entries=int(os.getenv(f"{prefix}_MAX_ENTRIES", max_entries)),
+            max_bytes=int(os.getenv(f"{prefix}_MAX_BYTES", max_bytes)),
+        )
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a cached value, counting a hit or a miss.
+
+        Args:
+            key: The cache key
+            default: Value returned when the key isn't cached or has expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.stats.expirations += 1
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return entry.value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Cache a value, evicting the least recently used ones if needed."""
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = _Entry(value, time.monotonic() + self.ttl, size)
+            self.stats.entries += 1
+            self.stats.bytes += size
+            while (
+                len(self._entries) > self.max_entries
+                or self.stats.bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                self.stats.evictions += 1
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """Remove cached values.
+
+        Args:
+            predicate: Only remove the entries whose key it accepts; all
+                entries if None
+
+        Returns:
+            The number of entries removed
+        """
+        with self._lock:
+            keys = [k for k in self._entries if predicate is None or predicate(k)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def __len__(self) -> int:
+        """Get the number of cached values, including expired ones not yet removed."""
+        return len(self._entries)
+
+    def _remove(self, key: Hashable) -> None:
+        """Remove an entry; the lock must be held."""
+        entry = self._entries.pop(key)
+        self.stats.entries -= 1
+        self.stats.bytes -= entry.size
+
+
+def estimate_size(value: Any) -> int:
+    """Estimate the memory used by a cached query result, in bytes.
+
+    Products are measured by their field values, so the estimate doesn't
+    depend on ORM bookkeeping attached to the instances.
+    """
+    if isinstance(value, Product):
+        return sys.getsizeof(value) + sum(
+            sys.getsizeof(v) for v in value.model_dump().values()
+        )
+    if isinstance(value, ProductTable):
+        return sys.getsizeof(value) + value.table.nbytes
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    if is_dataclass(value) and not isinstance(value, type):
+        return sys.getsizeof(value) + sum(
+            estimate_size(getattr(value, f.name)) for f in fields(value)
+        )
+    return sys.getsizeof(value)
+
+
+class CachedProductRepository:
+    """Product repository that serves repeated reads from a query cache.
+
+    Wraps a :class:`ProductRepository` or :class:`ProductSnapshot` and offers
+    the same read methods. Results are cached per method and normalised
+    parameters, so calls that only differ in spelling share an entry.
+
+    Products returned by page and id lookups are also kept in a map by id,
+    which answers :meth:`get_by_id` and :meth:`get_many` for products that
+    were read recently by any query.
+    """
+
+    def __init__(
+        self,
+        repository: Optional[Union[ProductRepository, ProductSnapshot]] = None,
+        cache: Optional[QueryCache] = None,
+        products: Optional[QueryCache] = None,
+    ):
+        """Initialize the cached repository.
+
+        Args:
+            repository: Data source to query, a default ProductRepository if None
+            cache: Cache to keep query results in, None to not cache them
+            products: Cache to keep products in by id, None to not keep them
+        """
+        self.repository = repository or ProductRepository()
+        self.cache = cache
+        self.products = products
+
+    def invalidate(self) -> int:
+        """Forget all cached results and products, so the next reads query again.
+
+        Returns:
+            The number of entries removed
+        """
+        return sum(cache.invalidate() for cache in (self.cache, self.products) if cache)
+
+    def get_all(self) -> ProductTable:
+        """Get all products, ordered by product group and name."""
+        return self._cached(("get_all",), self.repository.get_all)
+
+    def get_by_id(self, product_id: int) -> Optional[Product]:
+        """Get a product by its ID, None if it doesn't exist."""
+        product = self._known_product(int(product_id))
+        if product is not None:
+            return product
+        product = self._cached(
+            ("get_by_id", int(product_id)), self.repository.get_by_id, product_id
+        )
+        self._remember(product)
+        return product
+
+    def get_many(self, product_ids: Iterable[int]) -> List[Product]:
+        """Get the products with the given IDs.
+
+        Products that were read recently are taken from the product map; the
+        others are fetched together in a single query.
+
+        Takes the same arguments as :meth:`ProductRepository.get_many`.
+        """
+        ids = list(dict.fromkeys(int(i) for i in product_ids))
+        found = {}
+        for product_id in ids:
+            product = self._known_product(product_id)
+            if product is not None:
+                found[product_id] = product
+        missing = [i for i in ids if i not in found]
+        if missing:
+            fetched = self.repository.get_many(missing)
+            self._remember(*fetched)
+            found.update((p.id, p) for p in fetched)
+        return [found[i] for i in ids if i in found]
+
+    def search(
+        self, text: str, page: int = 1, items_per_page: int = 10
+    ) -> Tuple[List[Product], int]:
+        """Search products by name and product group name, best matches first.
+
+        Takes the same arguments as :meth:`ProductRepository.search`.
+        """
+        key = ("search", (text or "").casefold(), int(page), int(items_per_page))
+        cached = self._lookup(key)
+        if cached is _MISSING:
+            products, total = self.repository.search(text, page, items_per_page)
+            cached = (tuple(products), total)
+            self._store(key, cached)
+            self._remember(*products)
+        products, total = cached
+        return list(products), total
+
+    def get_paginated(
+        self,
+        page: int = 1,
+        items_per_page: int = 10,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+        filter_text: Optional[str] = None,
+        include_total: bool = True,
+    ) -> Tuple[List[Product], Optional[int]]:
+        """Get paginated products, from the cache when possible.
+
+        Takes the same arguments as :meth:`ProductRepository.get_paginated`.
+        A cached page with its total also answers calls that skip the total.
+        """
+        key = (
+            "get_paginated",
+            int(page),
+            int(items_per_page),
+            sort_by or None,
+            bool(descending),
+            filter_text or None,
+        )
+        cached = self._lookup(key)
+        if cached is not _MISSING and (cached[1] is not None or not include_total):
+            products, total = cached
+            return list(products), total if include_total else None
+        products, total = self.repository.get_paginated(
+            page=page,
+            items_per_page=items_per_page,
+            sort_by=sort_by,
+            descending=descending,
+            filter_text=filter_text,
+            include_total=include_total,
+        )
+        self._store(key, (tuple(products), total))
+        self._remember(*products)
+        return products, total
+
+    def get_keyset_page(
+        self,
+        cursor: Optional[str] = None,
+        items_per_page: int = 10,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+        filter_text: Optional[str] = None,
+        include_total: bool = True,
+    ) -> KeysetPage:
+        """Get a page of products continuing from a keyset cursor.
+
+        Takes the same arguments as :meth:`ProductRepository.get_keyset_page`.
+        """
+        key = (
+            "get_keyset_page",
+            cursor or None,
+            int(items_per_page),
+            None if cursor else sort_by or None,
+            False if cursor else bool(descending),
+            None if cursor else filter_text or None,
+        )
+        cached = self._lookup(key)
+        if cached is not _MISSING and (cached.total is not None or not include_total):
+            return KeysetPage(
+                products=list(cached.products),
+                total=cached.total if include_total else None,
+                next_cursor=cached.next_cursor,
+                previous_cursor=cached.previous_cursor,
+            )
+        result = self.repository.get_keyset_page(
+            cursor=cursor,
+            items_per_page=items_per_page,
+            sort_by=sort_by,
+            descending=descending,
+            filter_text=filter_text,
+            include_total=include_total,
+        )
+        self._store(key, result)
+        self._remember(*result.products)
+        return replace(result, products=list(result.products))
+
+    def _cached(self, key: Tuple, function: Callable[..., Any], *args) -> Any:
+        """Get a result from the cache, or call the function and cache it."""
+        cached = self._lookup(key)
+        if cached is not _MISSING:
+            return cached
+        result = function(*args)
+        self._store(key, result)
+        return result
+
+    def _lookup(self, key: Tuple) -> Any:
+        """Get a cached query result, _MISSING if there is none."""
+        return self.cache.get(key, _MISSING) if self.cache is not None else _MISSING
+
+    def _store(self, key: Tuple, value: Any) -> None:
+        """Cache a query result when result caching is enabled."""
+        if self.cache is not None:
+            self.cache.put(key, value)
+
+    def _known_product(self, product_id: int) -> Optional[Product]:
+        """Get a product from the product map, None if it isn't known."""
+        return self.products.get(product_id) if self.products is not None else None
+
+    def _remember(self, *products: Optional[Product]) -> None:
+        """Keep products in the product map."""
+        if self.products is not None:
+            for product in products:
+                if product is not None:
+                    self.products.put(product.id, product)
+
+
+_cache: Optional[QueryCache] = None
+_product_cache: Optional[QueryCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> QueryCache:
+    """Get the process-wide query cache, configured from the environment.
+
+    Returns:
+        The shared QueryCache instance
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = QueryCache.from_env()
+        return _cache
+
+
+def get_product_cache() -> QueryCache:
+    """Get the process-wide map of recently read products by id.
+
+    Configured with the VINEAPP_PRODUCT_CACHE_* environment variables, by
+    default it keeps up to 10000 products for 5 minutes.
+
+    Returns:
+        The shared QueryCache instance
+    """
+    global _product_cache
+    with _cache_lock:
+        if _product_cache is None:
+            _product_cache = QueryCache.from_env(
+                "VINEAPP_PRODUCT_CACHE",
+                ttl=DEFAULT_PRODUCT_TTL_SECONDS,
+                max_entries=DEFAULT_PRODUCT_MAX_ENTRIES,
+            )
+        return _product_cache
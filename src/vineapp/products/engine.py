@@ -0,0 +1,242 @@
+"""Process-wide registry of pooled database engines.
+
+Creating an engine for Dremio Flight means a new Flight client, TLS and
+authentication handshake and dialect initialisation. Engines are therefore
+shared per connection string, and their connection pool keeps warm Flight
+connections around between page loads. Each engine also keeps a cache of
+compiled statements, so a query that only differs in its values from an
+earlier one isn't compiled again.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+from sqlalchemy.pool import QueuePool
+
+DEFAULT_CONNECTION = "dremio+flight://localhost:32010/dremio"
+DEFAULT_STATEMENT_CACHE_SIZE = 500
+
+
+@dataclass
+class PoolSettings:
+    """Connection pool configuration for an engine."""
+
+    size: int = 5
+    max_overflow: int = 5
+    timeout: float = 30.0
+    recycle: int = 3600
+    max_idle: float = 300.0
+    pre_ping: bool = False
+
+    @classmethod
+    def from_env(cls) -> "PoolSettings":
+        """Create pool settings from VINEAPP_DB_POOL_* environment variables."""
+        defaults = cls()
+        return cls(
+            size=int(os.getenv("VINEAPP_DB_POOL_SIZE", defaults.size)),
+            max_overflow=int(
+                os.getenv("VINEAPP_DB_POOL_MAX_OVERFLOW", defaults.max_overflow)
+            ),
+            timeout=float(os.getenv("VINEAPP_DB_POOL_TIMEOUT", defaults.timeout)),
+            recycle=int(os.getenv("VINEAPP_DB_POOL_RECYCLE", defaults.recycle)),
+            max_idle=float(os.getenv("VINEAPP_DB_POOL_MAX_IDLE", defaults.max_idle)),
+            pre_ping=os.getenv("VINEAPP_DB_POOL_PRE_PING", "false").lower() == "true",
+        )
+
+
+@dataclass
+class PoolMetrics:
+    """Counters describing how well an engine's pool reuses connections."""
+
+    checkouts: int = 0
+    hits: int = 0
+    misses: int = 0
+    idle_discards: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def hit_rate(self) -> float:
+        """Get the fraction of checkouts served by an already open connection."""
+        return self.hits / self.checkouts if self.checkouts else 0.0
+
+    def record(self, counter: str) -> None:
+        """Increment one of the counters."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+@dataclass
+class StatementCacheStats:
+    """Counters describing how often executed statements were compiled again.
+
+    Statements that can't be cached, such as raw SQL strings, are counted as
+    uncached rather than as misses.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    uncached: int = 0
+    entries: int = 0
+    capacity: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def hit_rate(self) -> float:
+        """Get the fraction of cacheable statements served by a cached compilation."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def record(self, counter: str) -> None:
+        """Increment one of the counters."""
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+_engines: Dict[str, Engine] = {}
+_metrics: Dict[str, PoolMetrics] = {}
+_statement_stats: Dict[str, StatementCacheStats] = {}
+_registry_lock = threading.Lock()
+
+
+def get_connection_string() -> str:
+    """Get the database connection string from VINEAPP_DB_CONNECTION."""
+    return os.getenv("VINEAPP_DB_CONNECTION", DEFAULT_CONNECTION)
+
+
+def get_engine(
+    connection_string: Optional[str] = None,
+    settings: Optional[PoolSettings] = None,
+) -> Engine:
+    """Get the shared engine for a connection string, creating it once.
+
+    Args:
+        connection_string: Database URL, VINEAPP_DB_CONNECTION if None
+        settings: Pool settings used when the engine is first created,
+            read from the environment if None
+
+    Returns:
+        The engine shared by everyone using this connection string
+    """
+    connection_string = connection_string or get_connection_string()
+    with _registry_lock:
+        if connection_string not in _engines:
+            metrics = PoolMetrics()
+            statement_stats = StatementCacheStats()
+            _engines[connection_string] = _create_engine(
+                connection_string,
+                settings or PoolSettings.from_env(),
+                metrics,
+                statement_stats,
+            )
+            _metrics[connection_string] = metrics
+            _statement_stats[connection_string] = statement_stats
+        return _engines[connection_string]
+
+
+def get_pool_metrics(connection_string: Optional[str] = None) -> PoolMetrics:
+    """Get the pool metrics of a shared engine.
+
+    Args:
+        connection_string: Database URL, VINEAPP_DB_CONNECTION if None
+
+    Returns:
+        The metrics, all zero if no engine was created for the connection string
+    """
+    connection_string = connection_string or get_connection_string()
+    return _metrics.get(connection_string, PoolMetrics())
+
+
+def get_statement_cache_stats(
+    connection_string: Optional[str] = None,
+) -> StatementCacheStats:
+    """Get the compiled statement cache statistics of a shared engine.
+
+    Args:
+        connection_string: Database URL, VINEAPP_DB_CONNECTION if None
+
+    Returns:
+        The statistics, all zero if no engine was created for the connection
+        string
+    """
+    connection_string = connection_string or get_connection_string()
+    stats = _statement_stats.get(connection_string, StatementCacheStats())
+    engine = _engines.get(connection_string)
+    # SQLAlchemy doesn't expose the cache publicly; it is None when disabled
+    cache = getattr(engine, "_compiled_cache", None)
+    stats.entries = len(cache) if cache is not None else 0
+    stats.capacity = cache.capacity if cache is not None else 0
+    return stats
+
+
+def dispose_engines() -> None:
+    """Close all pooled connections and forget the shared engines."""
+    with _registry_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+        _metrics.clear()
+        _statement_stats.clear()
+
+
+def _create_engine(
+    connection_string: str,
+    settings: PoolSettings,
+    metrics: PoolMetrics,
+    statement_stats: StatementCacheStats,
+) -> Engine:
+    """Create an engine with a queue pool and instrument its pool events.
+
+    The compiled statement cache holds VINEAPP_DB_STATEMENT_CACHE_SIZE
+    statements; 0 turns it off.
+    """
+    engine = create_engine(
+        connection_string,
+        poolclass=QueuePool,
+        pool_size=settings.size,
+        max_overflow=settings.max_overflow,
+        pool_timeout=settings.timeout,
+        pool_recycle=settings.recycle,
+        pool_pre_ping=settings.pre_ping,
+        echo=os.getenv("VINEAPP_SQL_ECHO", "false").lower() == "true",
+        query_cache_size=int(
+            os.getenv("VINEAPP_DB_STATEMENT_CACHE_SIZE", DEFAULT_STATEMENT_CACHE_SIZE)
+        ),
+    )
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def on_execute(connection, cursor, statement, parameters, context, executemany):
+        if context is None or context.compiled is None:
+            return  # Raw SQL, nothing was compiled
+        if context.cache_hit is CACHE_HIT:
+            statement_stats.record("hits")
+        elif context.cache_hit is CACHE_MISS:
+            statement_stats.record("misses")
+        else:
+            statement_stats.record("uncached")
+
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        connection_record.info["fresh"] = True
+
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.pop("checked_in_at", None)
+        if checked_in_at and time.monotonic() - checked_in_at > settings.max_idle:
+            # The pool discards the connection and retries with a new one
+            metrics.record("idle_discards")
+            raise exc.DisconnectionError("Connection was idle for too long")
+        metrics.record("checkouts")
+        fresh = connection_record.info.pop("fresh", False)
+        metrics.record("misses" if fresh else "hits")
+
+    return engine
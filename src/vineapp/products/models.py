@@ -1,18 +1,81 @@
 """Product data models."""
 
-import os
-from typing import List, Optional, Union, Tuple
-from sqlalchemy import create_engine, func, Integer, bindparam, desc, text, distinct
-from sqlalchemy.engine import Engine
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union, Tuple
+
+import pyarrow as pa
+from sqlalchemy import (
+    String,
+    and_,
+    func,
+    Integer,
+    bindparam,
+    desc,
+    literal_column,
+    or_,
+    distinct,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import Executable
+from sqlalchemy.sql.elements import ColumnElement
 from sqlmodel import Field, Session, SQLModel, select
-from sqlalchemy_dremio.flight import DremioDialect_flight
+from sqlalchemy_dremio.flight import DremioCompiler, DremioDialect_flight
 from sqlalchemy.dialects import registry
 
+from vineapp.products.arrow import (
+    read_flight,
+    rebatch,
+    stream_flight,
+    to_product_table,
+)
+from vineapp.products.engine import get_engine
+from vineapp.products.profiling import (
+    instrument_engine,
+    phase,
+    profiled,
+    record_result,
+    suspended,
+)
+from vineapp.products.pagination import (
+    KeysetPage,
+    PageCursor,
+    cursor_for,
+    decode_cursor,
+    keyset_columns,
+)
+from vineapp.products.reflections import (
+    ReflectionDiagnostics,
+    get_reflection_diagnostics,
+)
+from vineapp.products.search import SearchIndex, get_search_index
+
+
+class LiteralDremioCompiler(DremioCompiler):
+    """Dremio compiler that renders bound parameters as escaped literals.
+
+    Dremio Flight doesn't support parameters, so every bound value is marked
+    ``literal_execute``: the compiled statement keeps a placeholder and the
+    value is rendered as a literal, escaped by its column type, only when the
+    statement is executed. Queries can use plain expressions such as
+    ``Product.name == name``, and statements that only differ in their values
+    share one compiled form.
+    """
+
+    def visit_bindparam(self, bindparam, literal_execute=False, **kw):
+        """Render a bound parameter to be inlined at execution time."""
+        return super().visit_bindparam(bindparam, literal_execute=True, **kw)
+
 
 class CustomDremioDialect(DremioDialect_flight):
-    """Custom Dremio dialect that implements import_dbapi."""
+    """Custom Dremio dialect that implements import_dbapi.
 
-    supports_statement_cache = False
+    Statements are compiled with :class:`LiteralDremioCompiler`, whose output
+    holds no values, so compiled statements can be cached.
+    """
+
+    statement_compiler = LiteralDremioCompiler
+    supports_statement_cache = True
 
     @classmethod
     def import_dbapi(cls):
@@ -36,6 +99,65 @@ class Product(SQLModel, table=True):
     product_group_name: str
 
 
+class ProductTable(Sequence[Product]):
+    """Read-only sequence of products backed by an Arrow table.
+
+    Product instances are only created for the rows a caller actually
+    accesses, so bulk consumers can work on :attr:`table` directly.
+    """
+
+    def __init__(self, table: pa.Table):
+        """Initialize with an Arrow table in the PRODUCT_SCHEMA layout."""
+        self.table = table
+
+    def __len__(self) -> int:
+        """Get the number of products."""
+        return self.table.num_rows
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Product, "ProductTable"]:
+        """Get a product, or a slice of the products as a new ProductTable."""
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return ProductTable(self.table.slice(start, max(stop - start, 0)))
+            return ProductTable(self.table.take(list(range(start, stop, step))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ProductTable index out of range")
+        return Product(**self.table.slice(index, 1).to_pylist()[0])
+
+    def __iter__(self) -> Iterator[Product]:
+        """Iterate over the products, creating them batch by batch."""
+        for batch in self.table.to_batches():
+            for row in batch.to_pylist():
+                yield Product(**row)
+
+    def __add__(self, other: Sequence[Product]) -> List[Product]:
+        """Concatenate with another sequence of products into a list."""
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return list(self) + list(other)
+
+    def __radd__(self, other: Sequence[Product]) -> List[Product]:
+        """Concatenate another sequence of products with this one into a list."""
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return list(other) + list(self)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare with another sequence of products."""
+        if isinstance(other, ProductTable):
+            return self.table.equals(other.table)
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        """Get a short representation with the number of products."""
+        return f"ProductTable({len(self)} products)"
+
+
 class RepositoryError(Exception):
     """Base exception for repository errors."""
 
@@ -51,28 +173,218 @@ class InvalidParameterError(RepositoryError):
 class ProductRepository:
     """Read-only repository for product data access.
 
-    Currently using Dremio Flight protocol which doesn't support parameterized queries.
+    Currently using Dremio Flight protocol which doesn't support parameterized
+    queries; the Dremio dialect renders bound values as escaped literals.
     """
 
-    def __init__(self, connection: Optional[Union[str, Engine]] = None):
-        """Initialize repository with optional connection string or engine."""
+    def __init__(
+        self,
+        connection: Optional[Union[str, Engine]] = None,
+        diagnostics: Optional[ReflectionDiagnostics] = None,
+    ):
+        """Initialize repository with optional connection string or engine.
+
+        Without an engine, the process-wide pooled engine for the connection
+        string (VINEAPP_DB_CONNECTION by default) is used, so repositories are
+        cheap to create and share warm connections.
+
+        With reflection diagnostics, queries are timed per shape and each shape
+        is explained now and then to see whether Dremio accelerates it. They
+        default to the process-wide diagnostics, which are off unless enabled
+        with VINEAPP_REFLECTION_DIAGNOSTICS.
+        """
         if isinstance(connection, Engine):
             self.engine = connection
         else:
-            conn_str = os.getenv(
-                "VINEAPP_DB_CONNECTION", "dremio+flight://localhost:32010/dremio"
+            self.engine = get_engine(connection)
+        instrument_engine(self.engine)
+        self.diagnostics = diagnostics or get_reflection_diagnostics()
+
+    def get_all(self) -> ProductTable:
+        """Get all products from the data source.
+
+        Returns:
+            A sequence of products backed by an Arrow table; Product instances
+            are only created for the rows that are accessed
+        """
+        return ProductTable(self.get_all_arrow())
+
+    @profiled("get_all")
+    def get_all_arrow(self) -> pa.Table:
+        """Get all products as an Arrow table, ordered like get_all."""
+        statement = select(Product).order_by(*self._order_by(None, False))
+        with self._observe("all", statement):
+            table = self.fetch_arrow(statement)
+        with phase("materialize"):
+            return to_product_table(table)
+
+    def iter_all(self, batch_size: int = 1000) -> Iterator[Product]:
+        """Iterate over all products as they are received, ordered like get_all.
+
+        Runs in bounded memory: only one batch of products is held at a time.
+
+        Args:
+            batch_size: Maximum number of products to convert at a time
+        """
+        for batch in self.iter_batches(batch_size):
+            for row in batch.to_pylist():
+                yield Product(**row)
+
+    def iter_batches(self, batch_size: int = 1000) -> Iterator[pa.RecordBatch]:
+        """Iterate over all products as Arrow record batches, ordered like get_all.
+
+        Args:
+            batch_size: Maximum number of rows per batch
+
+        Raises:
+            InvalidParameterError: If the batch size is invalid
+        """
+        if batch_size < 1:
+            raise InvalidParameterError("Batch size must be greater than 0")
+        statement = select(Product).order_by(*self._order_by(None, False))
+        for batch in self.stream_arrow(statement, batch_size):
+            yield to_product_table(batch)
+
+    def stream_arrow(
+        self, query: Union[str, Executable], batch_size: int = 1000
+    ) -> Iterator[pa.RecordBatch]:
+        """Run a query and yield its result as Arrow record batches.
+
+        Like :meth:`fetch_arrow`, but batches are yielded as soon as they
+        arrive, so the caller can start processing before the query has
+        finished and never holds the whole result in memory. The connection
+        stays checked out until the iterator is exhausted or closed.
+
+        Args:
+            query: SQL text or a SQLAlchemy statement
+            batch_size: Maximum number of rows per batch
+        """
+        sql = query if isinstance(query, str) else self._render(query)
+        with self.engine.connect() as connection:
+            dbapi_connection = connection.connection.dbapi_connection
+            if hasattr(dbapi_connection, "flightclient"):
+                yield from rebatch(stream_flight(dbapi_connection, sql), batch_size)
+                return
+            result = connection.execution_options(stream_results=True).exec_driver_sql(
+                sql
             )
-            self.engine = create_engine(conn_str)
+            columns = list(result.keys())
+            for rows in result.partitions(batch_size):
+                yield pa.record_batch(
+                    {c: [row[i] for row in rows] for i, c in enumerate(columns)}
+                )
+
+    @profiled("fetch_arrow")
+    def fetch_arrow(self, query: Union[str, Executable]) -> pa.Table:
+        """Run a query and return its result as an Arrow table.
+
+        On Dremio the query is sent with the pooled connection's Flight client
+        and the Arrow stream is returned as is, skipping the conversion to
+        Python rows and ORM instances. Other engines, as used in tests, build
+        the table from the result rows.
+
+        Args:
+            query: SQL text or a SQLAlchemy statement; statement parameters are
+                rendered as literals since Dremio Flight doesn't support them
 
-    def get_all(self) -> List[Product]:
-        """Get all products from the data source."""
+        Returns:
+            The query result
+        """
+        with phase("plan"):
+            sql = query if isinstance(query, str) else self._render(query)
+        with self._connect() as connection:
+            dbapi_connection = connection.connection.dbapi_connection
+            if hasattr(dbapi_connection, "flightclient"):
+                table = read_flight(dbapi_connection, sql)
+            else:
+                with phase("fetch"):
+                    result = connection.exec_driver_sql(sql)
+                    columns, rows = list(result.keys()), result.all()
+                with phase("materialize"):
+                    table = pa.table(
+                        {c: [row[i] for row in rows] for i, c in enumerate(columns)}
+                    )
+        record_result(table.num_rows, table.nbytes)
+        return table
+
+    @contextmanager
+    def _connect(self) -> Iterator[Connection]:
+        """Check out a pooled connection, timed as the connect phase."""
+        with phase("connect"):
+            connection = self.engine.connect()
+        with connection:
+            yield connection
+
+    @contextmanager
+    def _session(self) -> Iterator[Session]:
+        """Open a session with a checked out connection, timed as the connect phase."""
         with Session(self.engine) as session:
-            statement = select(Product).order_by(
-                Product.product_group_name, Product.name
-            )
-            result = session.execute(statement)
-            return [row[0] for row in result]
+            with phase("connect"):
+                session.connection()
+            yield session
+
+    def _render(self, statement: Executable) -> str:
+        """Render a statement as SQL with its parameters inlined."""
+        compiled = statement.compile(
+            dialect=self.engine.dialect, compile_kwargs={"literal_binds": True}
+        )
+        return str(compiled)
+
+    def explain(self, query: Union[str, Executable]) -> str:
+        """Get the plan Dremio makes for a query, without running it.
 
+        Args:
+            query: SQL text or a SQLAlchemy statement
+
+        Returns:
+            The text of the query plan
+        """
+        sql = query if isinstance(query, str) else self._render(query)
+        plan = self.fetch_arrow(f"EXPLAIN PLAN FOR {sql}")
+        column = "text" if "text" in plan.column_names else plan.column_names[0]
+        return "\n".join(str(line) for line in plan[column].to_pylist())
+
+    @contextmanager
+    def _observe(
+        self,
+        shape: str,
+        statement: Executable,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[None]:
+        """Time a query for the reflection diagnostics, explaining it when due.
+
+        Args:
+            shape: Name of the kind of query, e.g. "page" or "count"
+            statement: The statement being run
+            params: Values of its bind parameters not set on the statement,
+                only bound when the statement is explained
+        """
+        diagnostics = self.diagnostics
+        if diagnostics is None:
+            yield
+            return
+        if diagnostics.claim_explain(shape):
+            sql = self._render(statement.params(params) if params else statement)
+            try:
+                with suspended():
+                    diagnostics.record_plan(shape, sql, self.explain(sql))
+            except Exception as e:
+                # Diagnostics must never break the query they describe
+                diagnostics.record_error(shape, sql, e)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            diagnostics.record(shape, time.perf_counter() - started)
+
+    @staticmethod
+    def _size(products: Sequence[Product]) -> int:
+        """Approximate the size of products as that of their field values."""
+        return sum(
+            16 + len(p.name or "") + len(p.product_group_name or "") for p in products
+        )
+
+    @profiled("get_by_id")
     def get_by_id(self, product_id: int) -> Optional[Product]:
         """Get a product by its ID.
 
@@ -82,14 +394,79 @@ class ProductRepository:
         Returns:
             The product if found, None otherwise
         """
-        with Session(self.engine) as session:
-            # Note: Using string interpolation because Dremio Flight doesn't support parameters
-            base_query = select(Product)
-            filter_expr = text(f"id = {product_id}")
-            query = base_query.where(filter_expr)
-            result = session.exec(query)
-            return result.first()
+        query = select(Product).where(Product.id == product_id)
+        with self._observe("by id", query), self._session() as session:
+            with phase("fetch"):
+                product = session.exec(query).first()
+        found = [product] if product else []
+        record_result(len(found), self._size(found))
+        return product
+
+    @profiled("get_many")
+    def get_many(self, product_ids: Iterable[int]) -> List[Product]:
+        """Get the products with the given IDs in a single query.
 
+        Args:
+            product_ids: The IDs of the products to retrieve
+
+        Returns:
+            The products found, in the order of their first ID in product_ids;
+            IDs that don't exist are left out
+        """
+        ids = list(dict.fromkeys(int(i) for i in product_ids))
+        if not ids:
+            return []
+        # Rendered as an IN list of literals, Dremio Flight doesn't support parameters
+        ids_param = bindparam("ids", ids, expanding=True, literal_execute=True)
+        query = select(Product).where(Product.id.in_(ids_param))
+        with self._observe("by ids", query), self._session() as session:
+            with phase("fetch"):
+                products = {p.id: p for p in session.exec(query)}
+        with phase("materialize"):
+            found = [products[i] for i in ids if i in products]
+        record_result(len(found), self._size(found))
+        return found
+
+    @profiled("search")
+    def search(
+        self,
+        text: str,
+        page: int = 1,
+        items_per_page: int = 10,
+        index: Optional[SearchIndex] = None,
+    ) -> Tuple[List[Product], int]:
+        """Search products by name and product group name, best matches first.
+
+        Matching ids come from an in-process trigram index, which is loaded
+        with all products on first use and updated when older than its ttl.
+        Only the products on the requested page are fetched from the data
+        source.
+
+        Args:
+            text: Text the name or product group name contains, case-insensitive
+            page: The page number (1-based)
+            items_per_page: Number of items per page
+            index: Index to search, the shared one for this connection if None
+
+        Returns:
+            Tuple containing the products on the page and the number of matches
+
+        Raises:
+            InvalidParameterError: If pagination parameters are invalid
+        """
+        if page < 1:
+            raise InvalidParameterError("Page number must be greater than 0")
+        if items_per_page < 1:
+            raise InvalidParameterError("Items per page must be greater than 0")
+
+        if index is None:
+            index = get_search_index(self.engine.url.render_as_string())
+        index.refresh(self.get_all_arrow)
+        ids = index.search(text)
+        offset = (page - 1) * items_per_page
+        return self.get_many(ids[offset : offset + items_per_page]), len(ids)
+
+    @profiled("get_paginated")
     def get_paginated(
         self,
         page: int = 1,
@@ -97,18 +474,26 @@ class ProductRepository:
         sort_by: Optional[str] = None,
         descending: bool = False,
         filter_text: Optional[str] = None,
-    ) -> Tuple[List[Product], int]:
+        include_total: bool = True,
+    ) -> Tuple[List[Product], Optional[int]]:
         """Get paginated products from the data source.
 
+        The total count is computed in the same statement as the page with a
+        ``COUNT(*) OVER ()`` window column, so a request costs a single round
+        trip to Dremio.
+
         Args:
             page: The page number (1-based)
             items_per_page: Number of items per page
             sort_by: Column name to sort by
             descending: Sort in descending order if True
             filter_text: Optional text to filter products by (case-insensitive)
+            include_total: Set to False to skip counting, e.g. when only the
+                page or sort order changed and the caller already knows the total
 
         Returns:
-            Tuple containing list of products for the requested page and total count
+            Tuple containing list of products for the requested page and total
+            count, or None for the total when include_total is False
 
         Raises:
             InvalidParameterError: If pagination parameters are invalid
@@ -119,41 +504,23 @@ class ProductRepository:
         if items_per_page < 1:
             raise InvalidParameterError("Items per page must be greater than 0")
 
-        with Session(self.engine) as session:
-            # Create base query
-            base_query = select(Product)
+        with self._session() as session:
+            # Create base query, counting all matching rows alongside the page
+            columns = [Product]
+            if include_total:
+                columns.append(func.count().over().label("total_count"))
+            base_query = select(*columns)
 
             # Apply filter if provided
-            if filter_text:
-                # Note: Using string interpolation because Dremio Flight doesn't support parameters
-                pattern = f"%{filter_text}%"
-                filter_expr = text(
-                    f"lower(name) LIKE lower('{pattern}') OR "
-                    f"lower(product_group_name) LIKE lower('{pattern}')"
-                )
+            filter_expr = self._filter_clause(filter_text)
+            if filter_expr is not None:
                 base_query = base_query.where(filter_expr)
 
-            # Get total count using the same filter but without the subquery
-            count_stmt = select(func.count(distinct(Product.id)))
-            if filter_text:
-                count_stmt = count_stmt.where(filter_expr)
-            total = session.exec(count_stmt).one()
-
             # Calculate offset
             offset = (page - 1) * items_per_page
 
             # Apply sorting
-            if sort_by:
-                column = getattr(Product, sort_by)
-                if descending:
-                    base_query = base_query.order_by(desc(column))
-                else:
-                    base_query = base_query.order_by(column)
-            else:
-                # Default sorting
-                base_query = base_query.order_by(
-                    Product.product_group_name, Product.name
-                )
+            base_query = base_query.order_by(*self._order_by(sort_by, descending))
 
             # Apply pagination
             query = base_query.limit(
@@ -161,13 +528,178 @@ class ProductRepository:
             ).offset(bindparam("offset", type_=Integer, literal_execute=True))
 
             # Execute with bound parameters
-            result = session.exec(
-                query,
-                params={
-                    "limit": items_per_page,
-                    "offset": offset,
-                },
-            )
-            products = list(result)
+            params = {"limit": items_per_page, "offset": offset}
+            shape = "page" if filter_expr is None else "filtered page"
+            with self._observe(shape, query, params), phase("fetch"):
+                rows = list(session.exec(query, params=params))
+            if not include_total:
+                record_result(len(rows), self._size(rows))
+                return rows, None
+
+            products = [row[0] for row in rows]
+            record_result(len(products), self._size(products))
+            if rows:
+                total = rows[0][1]
+            elif offset == 0:
+                total = 0
+            else:
+                # Past the last page there is no row to carry the window count
+                total = self._count(session, filter_expr)
 
             return products, total
+
+    @profiled("get_keyset_page")
+    def get_keyset_page(
+        self,
+        cursor: Optional[str] = None,
+        items_per_page: int = 10,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+        filter_text: Optional[str] = None,
+        include_total: bool = True,
+    ) -> KeysetPage:
+        """Get a page of products using keyset (seek) pagination.
+
+        Instead of skipping rows with OFFSET, the page is located by seeking
+        past the sort key stored in the cursor, so every page costs the same
+        regardless of its depth. Sort and filter are taken from the cursor
+        when one is given, so a continuation always pages through the listing
+        it was issued for.
+
+        Args:
+            cursor: Continuation token from a previous page, None for the first page
+            items_per_page: Number of items per page
+            sort_by: Column name to sort by
+            descending: Sort in descending order if True
+            filter_text: Optional text to filter products by (case-insensitive)
+            include_total: Set to False to skip the count query, e.g. when
+                continuing a listing whose total the caller already knows
+
+        Returns:
+            The page of products, the total count (None if not included) and
+            tokens for adjacent pages
+
+        Raises:
+            InvalidParameterError: If the cursor or pagination parameters are invalid
+        """
+        if items_per_page < 1:
+            raise InvalidParameterError("Items per page must be greater than 0")
+
+        try:
+            position = (
+                decode_cursor(cursor)
+                if cursor
+                else PageCursor([], sort_by, descending, filter_text or None)
+            )
+        except ValueError as e:
+            raise InvalidParameterError(str(e)) from e
+        sort_by, descending = position.sort_by, position.descending
+        filter_text = position.filter_text
+        backwards = position.before
+
+        with self._session() as session:
+            filter_expr = self._filter_clause(filter_text)
+            query = select(Product)
+            if filter_expr is not None:
+                query = query.where(filter_expr)
+            if position.values:
+                query = query.where(self._seek_clause(position))
+
+            # Walk backwards by reversing the order, then restore it below.
+            query = query.order_by(*self._order_by(sort_by, descending != backwards))
+            # Fetch one extra row to find out whether there is another page.
+            query = query.limit(bindparam("limit", type_=Integer, literal_execute=True))
+            params = {"limit": items_per_page + 1}
+            shape = "keyset page" if filter_expr is None else "filtered keyset page"
+            with self._observe(shape, query, params), phase("fetch"):
+                rows = list(session.exec(query, params=params))
+            # The seek predicate excludes earlier rows, so the total can't be
+            # fused into the page query as a window count.
+            total = self._count(session, filter_expr) if include_total else None
+
+        has_more = len(rows) > items_per_page
+        products = rows[:items_per_page]
+        record_result(len(products), self._size(products))
+        if backwards:
+            products.reverse()
+
+        def token(product: Product, before: bool) -> str:
+            return cursor_for(product, sort_by, descending, filter_text, before)
+
+        has_next = has_more if not backwards else bool(position.values)
+        has_previous = has_more if backwards else bool(position.values)
+        return KeysetPage(
+            products=products,
+            total=total,
+            next_cursor=token(products[-1], False) if products and has_next else None,
+            previous_cursor=(
+                token(products[0], True) if products and has_previous else None
+            ),
+        )
+
+    def _count(self, session: Session, filter_expr) -> int:
+        """Count the products matching an optional filter expression."""
+        count_stmt = select(func.count(distinct(Product.id)))
+        if filter_expr is not None:
+            count_stmt = count_stmt.where(filter_expr)
+        with self._observe("count", count_stmt), phase("fetch"):
+            return session.exec(count_stmt).one()
+
+    @staticmethod
+    def _filter_clause(filter_text: Optional[str]):
+        """Build the case-insensitive name/product group filter, if any."""
+        if not filter_text:
+            return None
+        pattern = f"%{filter_text}%"
+        return or_(
+            Product.name.ilike(pattern), Product.product_group_name.ilike(pattern)
+        )
+
+    @staticmethod
+    def _sort_key(column_name: str) -> ColumnElement:
+        """Get the expression a column is ordered by.
+
+        Text columns are coalesced to an empty string so rows with a missing
+        name sort first, and keyset comparisons never have to deal with NULLs.
+        """
+        if column_name not in Product.model_fields:
+            raise InvalidParameterError(
+                f"Cannot sort by unknown column '{column_name}'"
+            )
+        column = getattr(Product, column_name)
+        if isinstance(column.type, String):
+            return func.coalesce(column, literal_column("''"))
+        return column
+
+    def _order_by(self, sort_by: Optional[str], descending: bool) -> list:
+        """Build a deterministic ORDER BY, using the id as final tie-breaker."""
+        keys = [self._sort_key(c) for c in keyset_columns(sort_by)]
+        return [desc(k) for k in keys] if descending else keys
+
+    def _seek_clause(self, position: PageCursor) -> ColumnElement:
+        """Build the predicate selecting the rows after (or before) a cursor.
+
+        Expands the row-value comparison ``(a, b, id) > (x, y, z)`` into
+        ``a > x OR (a = x AND b > y) OR (a = x AND b = y AND id > z)``.
+        Values are rendered as escaped literals at execution time since
+        Dremio Flight doesn't support parameters.
+        """
+        columns = keyset_columns(position.sort_by)
+        if len(columns) != len(position.values):
+            raise InvalidParameterError("Page cursor does not match the sort order")
+
+        keys = [self._sort_key(c) for c in columns]
+        values = [self._literal(k, v) for k, v in zip(keys, position.values)]
+        forward = position.descending == position.before
+        terms = []
+        for i, (key, value) in enumerate(zip(keys, values)):
+            equal_prefix = [k == v for k, v in zip(keys[:i], values[:i])]
+            terms.append(and_(*equal_prefix, key > value if forward else key < value))
+        return or_(*terms)
+
+    @staticmethod
+    def _literal(key: ColumnElement, value):
+        """Bind a cursor value so it is rendered as an escaped literal."""
+        if value is None and isinstance(key.type, String):
+            value = ""
+        return bindparam(None, value, type_=key.type, literal_execute=True)
@@ -0,0 +1,114 @@
+"""Keyset (seek) pagination support for product listings.
+
+Keyset pagination locates a page by the sort key of the last (or first) row
+of the neighbouring page instead of skipping ``offset`` rows, so navigating
+to the next or previous page costs the same at any depth.
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, List, Optional
+
+if TYPE_CHECKING:
+    from vineapp.products.models import Product
+
+DEFAULT_SORT_COLUMNS = ["product_group_name", "name"]
+
+
+@dataclass
+class PageCursor:
+    """Decoded continuation token pointing just before or after a row."""
+
+    values: List[Any]
+    sort_by: Optional[str] = None
+    descending: bool = False
+    filter_text: Optional[str] = None
+    before: bool = False
+
+
+@dataclass
+class KeysetPage:
+    """A page of products together with its continuation tokens."""
+
+    products: List["Product"] = field(default_factory=list)
+    total: Optional[int] = 0
+    next_cursor: Optional[str] = None
+    previous_cursor: Optional[str] = None
+
+
+def keyset_columns(sort_by: Optional[str] = None) -> List[str]:
+    """Get the column names that uniquely order a product listing.
+
+    Args:
+        sort_by: Column name to sort by, or None for the default ordering
+
+    Returns:
+        The sort columns followed by ``id`` as a unique tie-breaker
+    """
+    columns = [sort_by] if sort_by else list(DEFAULT_SORT_COLUMNS)
+    return [c for c in columns if c != "id"] + ["id"]
+
+
+def encode_cursor(cursor: PageCursor) -> str:
+    """Encode a cursor as an opaque, URL-safe token."""
+    payload = {
+        "v": cursor.values,
+        "s": cursor.sort_by,
+        "d": cursor.descending,
+        "f": cursor.filter_text,
+        "b": cursor.before,
+    }
+    data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii")
+
+
+def decode_cursor(token: str) -> PageCursor:
+    """Decode a token created by :func:`encode_cursor`.
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        return PageCursor(
+            values=list(payload["v"]),
+            sort_by=payload["s"],
+            descending=bool(payload["d"]),
+            filter_text=payload["f"],
+            before=bool(payload["b"]),
+        )
+    except (binascii.Error, ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid page cursor: {e}") from e
+
+
+def cursor_for(
+    product: "Product",
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+    filter_text: Optional[str] = None,
+    before: bool = False,
+) -> str:
+    """Create a token that continues a listing after (or before) a product.
+
+    Args:
+        product: The boundary row of the current page
+        sort_by: Column name the listing is sorted by
+        descending: Whether the listing is sorted in descending order
+        filter_text: The filter applied to the listing
+        before: Continue before the product instead of after it
+
+    Returns:
+        An opaque continuation token
+    """
+    values = [getattr(product, c) for c in keyset_columns(sort_by)]
+    return encode_cursor(
+        PageCursor(
+            values=values,
+            sort_by=sort_by,
+            descending=descending,
+            filter_text=filter_text or None,
+            before=before,
+        )
+    )
@@ -0,0 +1,402 @@
+"""Timing and profiling of product queries.
+
+Every repository call runs inside :func:`profile_query`, which collects a
+:class:`QueryProfile` splitting the call's time into phases:
+
+- ``connect``: checking out a pooled connection
+- ``plan``: compiling the statement (or finding it in the statement cache)
+  and rendering its parameters
+- ``execute``: running the statement on the database
+- ``fetch``: reading the result rows, including creating ORM instances
+- ``materialize``: turning the rows into the returned products or Arrow table
+
+Finished profiles are logged to the ``vineapp.products.queries`` logger and
+added to the process-wide :class:`QueryMetrics`, which keeps a histogram and
+a rolling window of recent durations per operation and renders them in the
+Prometheus text format.
+"""
+
+import bisect
+import functools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("vineapp.products.queries")
+
+PHASES = ("connect", "plan", "execute", "fetch", "materialize")
+
+# Upper bounds of the duration histogram buckets, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DEFAULT_WINDOW_SECONDS = 300.0
+DEFAULT_SLOW_QUERY_SECONDS = 1.0
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_current: ContextVar[Optional["QueryProfile"]] = ContextVar(
+    "vineapp_query_profile", default=None
+)
+
+
+@dataclass
+class QueryProfile:
+    """Timing of one repository call, split into phases."""
+
+    operation: str
+    phases: Dict[str, float] = field(default_factory=lambda: dict.fromkeys(PHASES, 0))
+    rows: int = 0
+    bytes: int = 0
+    total: float = 0.0
+    error: Optional[str] = None
+    # Seconds already attributed to a phase, so enclosing phases can skip them
+    _accounted: float = field(default=0.0, repr=False)
+
+    def add(self, phase: str, seconds: float) -> None:
+        """Attribute time to a phase."""
+        self.phases[phase] += seconds
+        self._accounted += seconds
+
+    def as_dict(self) -> Dict[str, object]:
+        """Get the profile as a flat dictionary for structured logging."""
+        return {
+            "operation": self.operation,
+            "total_ms": round(self.total * 1000, 3),
+            **{f"{p}_ms": round(s * 1000, 3) for p, s in self.phases.items()},
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "error": self.error,
+        }
+
+
+@contextmanager
+def profile_query(operation: str) -> Iterator[Optional[QueryProfile]]:
+    """Profile a repository call, then log and record it.
+
+    Calls made while another one is being profiled, such as the lookups a
+    search runs, are counted as part of the outer call.
+
+    Args:
+        operation: Name of the call, e.g. "get_paginated"
+
+    Yields:
+        The new profile, None when nested in another one
+    """
+    if _current.get() is not None:
+        yield None
+        return
+    profile = QueryProfile(operation)
+    token = _current.set(profile)
+    started = time.perf_counter()
+    try:
+        yield profile
+    except Exception as e:
+        profile.error = type(e).__name__
+        raise
+    finally:
+        profile.total = time.perf_counter() - started
+        _current.reset(token)
+        metrics = get_query_metrics()
+        metrics.record(profile)
+        _log(profile, metrics.slow_query_seconds)
+
+
+def profiled(operation: str) -> Callable[[F], F]:
+    """Decorate a repository method to run inside :func:`profile_query`."""
+
+    def decorate(function: F) -> F:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with profile_query(operation):
+                return function(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Attribute the time spent in a block to a phase of the current profile.
+
+    Time that nested phases or the engine events attribute while the block
+    runs is left out, so a block around a whole query only gets the rest.
+    """
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    started, accounted = time.perf_counter(), profile._accounted
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        profile.add(name, elapsed - (profile._accounted - accounted))
+
+
+def record_result(rows: int, size: int) -> None:
+    """Count result rows and their size in bytes in the current profile."""
+    profile = _current.get()
+    if profile is not None:
+        profile.rows += rows
+        profile.bytes += size
+
+
+@contextmanager
+def suspended() -> Iterator[None]:
+    """Leave queries run in a block, e.g. diagnostics, out of the current profile."""
+    token = _current.set(None)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Attribute plan and execute time of an engine's statements to profiles.
+
+    Safe to call more than once for the same engine.
+    """
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_execute", _before_execute)
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_execute(connection, clauseelement, multiparams, params, options):
+    """Note when SQLAlchemy starts to prepare a statement."""
+    if _current.get() is not None:
+        connection.info["vineapp_execute_started"] = time.perf_counter()
+
+
+def _before_cursor_execute(connection, cursor, statement, params, context, many):
+    """Attribute the preparation of a statement to the plan phase."""
+    profile = _current.get()
+    if profile is None:
+        return
+    now = time.perf_counter()
+    started = connection.info.pop("vineapp_execute_started", None)
+    if started is not None:
+        profile.add("plan", now - started)
+    connection.info["vineapp_cursor_started"] = now
+
+
+def _after_cursor_execute(connection, cursor, statement, params, context, many):
+    """Attribute running a statement to the execute phase."""
+    profile = _current.get()
+    started = connection.info.pop("vineapp_cursor_started", None)
+    if profile is not None and started is not None:
+        profile.add("execute", time.perf_counter() - started)
+
+
+def _log(profile: QueryProfile, slow: float) -> None:
+    """Log a finished profile, as a warning when it took at least slow seconds."""
+    level = logging.WARNING if profile.total >= slow else logging.DEBUG
+    if logger.isEnabledFor(level):
+        logger.log(
+            level,
+            "%s took %.1f ms (%d rows, %d bytes)",
+            profile.operation,
+            profile.total * 1000,
+            profile.rows,
+            profile.bytes,
+            extra={"query": profile.as_dict()},
+        )
+
+
+@dataclass
+class OperationStats:
+    """Cumulative and recent statistics of one operation."""
+
+    count: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    rows: int = 0
+    bytes: int = 0
+    phases: Dict[str, float] = field(default_factory=lambda: dict.fromkeys(PHASES, 0))
+    # Number of calls per histogram bucket, the last one for slower calls
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(BUCKETS) + 1))
+    # (finished at, seconds) of the calls in the rolling window
+    recent: Deque[Tuple[float, float]] = field(default_factory=deque)
+
+
+class QueryMetrics:
+    """Thread-safe statistics of profiled repository calls per operation."""
+
+    def __init__(
+        self,
+        window: float = DEFAULT_WINDOW_SECONDS,
+        slow_query_seconds: float = DEFAULT_SLOW_QUERY_SECONDS,
+    ):
+        """Initialize empty metrics.
+
+        Args:
+            window: Seconds of recent calls the quantiles are computed from
+            slow_query_seconds: Seconds from which calls are logged as warnings
+        """
+        self.window = window
+        self.slow_query_seconds = slow_query_seconds
+        self._operations: Dict[str, OperationStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, profile: QueryProfile) -> None:
+        """Add a finished profile to the statistics of its operation."""
+        now = time.monotonic()
+        with self._lock:
+            stats = self._operations.setdefault(profile.operation, OperationStats())
+            stats.count += 1
+            stats.errors += profile.error is not None
+            stats.seconds += profile.total
+            stats.rows += profile.rows
+            stats.bytes += profile.bytes
+            for name, seconds in profile.phases.items():
+                stats.phases[name] += seconds
+            stats.buckets[bisect.bisect_left(BUCKETS, profile.total)] += 1
+            stats.recent.append((now, profile.total))
+            self._expire(stats, now)
+
+    def quantiles(self, operation: str) -> Dict[float, float]:
+        """Get duration quantiles of an operation over the rolling window.
+
+        Returns:
+            Seconds per quantile, empty if there were no recent calls
+        """
+        now = time.monotonic()
+        with self._lock:
+            stats = self._operations.get(operation)
+            if stats is None:
+                return {}
+            self._expire(stats, now)
+            durations = sorted(seconds for _, seconds in stats.recent)
+        if not durations:
+            return {}
+        return {
+            q: durations[min(int(q * len(durations)), len(durations) - 1)]
+            for q in QUANTILES
+        }
+
+    def operations(self) -> Dict[str, OperationStats]:
+        """Get a copy of the statistics per operation."""
+        with self._lock:
+            return {
+                name: OperationStats(
+                    count=s.count,
+                    errors=s.errors,
+                    seconds=s.seconds,
+                    rows=s.rows,
+                    bytes=s.bytes,
+                    phases=dict(s.phases),
+                    buckets=list(s.buckets),
+                    recent=deque(s.recent),
+                )
+                for name, s in self._operations.items()
+            }
+
+    def reset(self) -> None:
+        """Forget all statistics."""
+        with self._lock:
+            self._operations.clear()
+
+    def render_prometheus(self) -> str:
+        """Render the statistics in the Prometheus text exposition format."""
+        operations = self.operations()
+        lines = [
+            "# HELP vineapp_query_duration_seconds Duration of product queries.",
+            "# TYPE vineapp_query_duration_seconds histogram",
+        ]
+        for name, stats in operations.items():
+            cumulative = 0
+            for bound, count in zip(BUCKETS + (float("inf"),), stats.buckets):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(
+                    f'vineapp_query_duration_seconds_bucket{{operation="{name}",'
+                    f'le="{le}"}} {cumulative}'
+                )
+            lines.append(
+                f'vineapp_query_duration_seconds_sum{{operation="{name}"}} '
+                f"{stats.seconds}"
+            )
+            lines.append(
+                f'vineapp_query_duration_seconds_count{{operation="{name}"}} '
+                f"{stats.count}"
+            )
+        lines += [
+            "# HELP vineapp_query_recent_seconds Quantiles of recent query durations.",
+            "# TYPE vineapp_query_recent_seconds gauge",
+        ]
+        for name in operations:
+            for q, seconds in self.quantiles(name).items():
+                lines.append(
+                    f'vineapp_query_recent_seconds{{operation="{name}",'
+                    f'quantile="{q}"}} {seconds}'
+                )
+        lines += [
+            "# HELP vineapp_query_phase_seconds_total Query time spent per phase.",
+            "# TYPE vineapp_query_phase_seconds_total counter",
+        ]
+        for name, stats in operations.items():
+            for phase_name, seconds in stats.phases.items():
+                lines.append(
+                    f'vineapp_query_phase_seconds_total{{operation="{name}",'
+                    f'phase="{phase_name}"}} {seconds}'
+                )
+        for metric, attribute, help_text in (
+            ("rows", "rows", "Rows returned by product queries."),
+            ("bytes", "bytes", "Approximate size of product query results."),
+            ("errors", "errors", "Product queries that raised an error."),
+        ):
+            lines += [
+                f"# HELP vineapp_query_{metric}_total {help_text}",
+                f"# TYPE vineapp_query_{metric}_total counter",
+            ]
+            for name, stats in operations.items():
+                lines.append(
+                    f'vineapp_query_{metric}_total{{operation="{name}"}} '
+                    f"{getattr(stats, attribute)}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def _expire(self, stats: OperationStats, now: float) -> None:
+        """Drop calls that left the rolling window; the lock must be held."""
+        while stats.recent and now - stats.recent[0][0] > self.window:
+            stats.recent.popleft()
+
+
+_metrics: Optional[QueryMetrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_query_metrics() -> QueryMetrics:
+    """Get the process-wide query metrics.
+
+    The rolling window is read from ``VINEAPP_QUERY_METRICS_WINDOW`` (in
+    seconds, 300 by default) and the duration from which calls are logged
+    as warnings from ``VINEAPP_SLOW_QUERY_SECONDS`` (1 second by default).
+
+    Returns:
+        The shared QueryMetrics instance
+    """
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            window = float(
+                os.getenv("VINEAPP_QUERY_METRICS_WINDOW", str(DEFAULT_WINDOW_SECONDS))
+            )
+            slow = float(
+                os.getenv("VINEAPP_SLOW_QUERY_SECONDS", str(DEFAULT_SLOW_QUERY_SECONDS))
+            )
+            _metrics = QueryMetrics(window=window, slow_query_seconds=slow)
+        return _metrics
@@ -0,0 +1,166 @@
+"""Diagnostics on whether product queries are accelerated by Dremio reflections.
+
+Dremio answers a query from a reflection, a materialisation of (part of) a
+dataset, when its planner finds one that covers the query. Whether it did can
+be read from the query plan: accelerated plans scan the reflection's
+``__accelerator`` table instead of the dataset.
+
+:class:`ReflectionDiagnostics` collects, per query shape (all products, a page,
+a filtered page, a count, a lookup by id, ...), how often the repository ran
+it, how long that took in total and whether its plan was accelerated. Each
+shape is explained once per ``explain_interval``, so the diagnostics don't
+double the number of queries sent to Dremio.
+"""
+
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_EXPLAIN_INTERVAL = 3600.0
+
+# Accelerated plans scan "__accelerator"."<dataset id>"."<reflection id>"
+_ACCELERATOR_SCAN = re.compile(r'__accelerator"?\s*\.\s*"?[\w-]+"?\s*\.\s*"?([\w-]+)')
+
+
+def parse_plan(plan: str) -> Tuple[bool, List[str]]:
+    """Find out from a Dremio query plan whether reflections were used.
+
+    Args:
+        plan: The text of an ``EXPLAIN PLAN FOR`` result
+
+    Returns:
+        Whether the plan scans a reflection, and the ids of the reflections
+    """
+    reflections = list(dict.fromkeys(_ACCELERATOR_SCAN.findall(plan)))
+    return "__accelerator" in plan, reflections
+
+
+@dataclass
+class QueryShapeStats:
+    """Execution and acceleration statistics of one query shape."""
+
+    shape: str
+    executions: int = 0
+    total_seconds: float = 0.0
+    # None until the shape is explained, or when explaining it failed
+    accelerated: Optional[bool] = None
+    reflections: List[str] = field(default_factory=list)
+    sql: Optional[str] = None
+    error: Optional[str] = None
+    explained_at: Optional[float] = None
+
+    @property
+    def mean_seconds(self) -> float:
+        """Get the mean execution time in seconds."""
+        return self.total_seconds / self.executions if self.executions else 0.0
+
+
+class ReflectionDiagnostics:
+    """Thread-safe collector of query shape statistics."""
+
+    def __init__(self, explain_interval: float = DEFAULT_EXPLAIN_INTERVAL):
+        """Initialize empty diagnostics.
+
+        Args:
+            explain_interval: Seconds before a shape is explained again, to
+                notice reflections that were added, dropped or refreshed
+        """
+        self.explain_interval = explain_interval
+        self._shapes: Dict[str, QueryShapeStats] = {}
+        self._lock = threading.Lock()
+
+    def claim_explain(self, shape: str) -> bool:
+        """Check whether a shape is due to be explained, claiming it if so.
+
+        Only the first caller gets True, so concurrent queries of the same
+        shape don't each run an EXPLAIN.
+        """
+        with self._lock:
+            stats = self._stats(shape)
+            now = time.monotonic()
+            if (
+                stats.explained_at is not None
+                and now - stats.explained_at < self.explain_interval
+            ):
+                return False
+            stats.explained_at = now
+            return True
+
+    def record_plan(self, shape: str, sql: str, plan: str) -> None:
+        """Record the query plan of a shape."""
+        accelerated, reflections = parse_plan(plan)
+        with self._lock:
+            stats = self._stats(shape)
+            stats.sql, stats.error = sql, None
+            stats.accelerated, stats.reflections = accelerated, reflections
+
+    def record_error(self, shape: str, sql: str, error: Exception) -> None:
+        """Record that a shape could not be explained."""
+        with self._lock:
+            stats = self._stats(shape)
+            stats.sql, stats.error = sql, str(error)
+            stats.accelerated, stats.reflections = None, []
+
+    def record(self, shape: str, seconds: float) -> None:
+        """Record an execution of a shape and how long it took."""
+        with self._lock:
+            stats = self._stats(shape)
+            stats.executions += 1
+            stats.total_seconds += seconds
+
+    def report(self) -> List[QueryShapeStats]:
+        """Get a copy of the statistics, the shapes taking most time first."""
+        with self._lock:
+            shapes = [
+                replace(s, reflections=list(s.reflections))
+                for s in self._shapes.values()
+            ]
+        return sorted(shapes, key=lambda s: (-s.total_seconds, s.shape))
+
+    def reset(self) -> None:
+        """Forget all statistics, so every shape is explained again."""
+        with self._lock:
+            self._shapes.clear()
+
+    def _stats(self, shape: str) -> QueryShapeStats:
+        """Get the statistics of a shape; the lock must be held."""
+        if shape not in self._shapes:
+            self._shapes[shape] = QueryShapeStats(shape)
+        return self._shapes[shape]
+
+
+_diagnostics: Optional[ReflectionDiagnostics] = None
+_diagnostics_lock = threading.Lock()
+
+
+def reflection_diagnostics_enabled() -> bool:
+    """Check whether VINEAPP_REFLECTION_DIAGNOSTICS turns the diagnostics on."""
+    return os.getenv("VINEAPP_REFLECTION_DIAGNOSTICS", "false").lower() == "true"
+
+
+def get_reflection_diagnostics() -> Optional[ReflectionDiagnostics]:
+    """Get the process-wide reflection diagnostics, if enabled.
+
+    The diagnostics are enabled with ``VINEAPP_REFLECTION_DIAGNOSTICS=true``;
+    ``VINEAPP_REFLECTION_EXPLAIN_INTERVAL`` sets how often (in seconds, 3600 by
+    default) each query shape is explained again.
+
+    Returns:
+        The shared ReflectionDiagnostics instance, None when disabled
+    """
+    global _diagnostics
+    if not reflection_diagnostics_enabled():
+        return None
+    with _diagnostics_lock:
+        if _diagnostics is None:
+            interval = float(
+                os.getenv(
+                    "VINEAPP_REFLECTION_EXPLAIN_INTERVAL",
+                    str(DEFAULT_EXPLAIN_INTERVAL),
+                )
+            )
+            _diagnostics = ReflectionDiagnostics(explain_interval=interval)
+        return _diagnostics
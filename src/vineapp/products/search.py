@@ -0,0 +1,193 @@
+"""In-process trigram index for searching products by text.
+
+A case-insensitive substring filter can't use an index on Dremio, so every
+search scans the whole products view. The :class:`SearchIndex` keeps an
+inverted index from trigrams (three character sequences) of product and
+product group names to product ids. A search only checks the products that
+contain every trigram of the text, and ranks the matches by how well they
+match.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import pyarrow as pa
+
+DEFAULT_TTL_SECONDS = 300.0
+
+NGRAM_SIZE = 3
+
+
+def ngrams(text: str) -> Set[str]:
+    """Get the trigrams of a normalised text."""
+    return {text[i : i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def normalize(text: Optional[str]) -> str:
+    """Normalise a text for case-insensitive matching."""
+    return (text or "").casefold()
+
+
+def match_rank(text: str, name: str, group: str) -> Optional[int]:
+    """Rank how well a normalised search text matches a product.
+
+    Args:
+        text: The normalised search text
+        name: The normalised product name
+        group: The normalised product group name
+
+    Returns:
+        0 for an exact name, 1 for a name prefix, 2 for a word prefix in the
+        name, 3 for elsewhere in the name, 4 for an exact group name or
+        prefix, 5 for elsewhere in the group name and None for no match
+    """
+    position = name.find(text)
+    if position == 0:
+        return 0 if name == text else 1
+    if position > 0:
+        while position > 0:
+            if not name[position - 1].isalnum():
+                return 2
+            position = name.find(text, position + 1)
+        return 3
+    position = group.find(text)
+    if position == 0:
+        return 4
+    if position > 0:
+        return 5
+    return None
+
+
+class SearchIndex:
+    """Trigram index over the names and product group names of products.
+
+    The index is brought up to date with :meth:`update`, which only reindexes
+    the products that were added, changed or removed since the last update.
+    Matches are ranked by :func:`match_rank`, ties keep the order of the
+    table the index was last updated with.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL_SECONDS):
+        """Initialize an empty index.
+
+        Args:
+            ttl: Seconds after an update that :attr:`stale` reports the index
+                as due for another one
+        """
+        self.ttl = ttl
+        self._documents: Dict[int, Tuple[str, str]] = {}
+        self._positions: Dict[int, int] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._updated_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Get the number of indexed products."""
+        return len(self._documents)
+
+    @property
+    def stale(self) -> bool:
+        """Check whether the index was never updated or is older than its ttl."""
+        updated_at = self._updated_at
+        return updated_at is None or time.monotonic() - updated_at > self.ttl
+
+    def refresh(self, load: Callable[[], pa.Table], force: bool = False) -> None:
+        """Update the index from a freshly loaded table when it is stale.
+
+        Only one thread loads at a time; the others wait and then find the
+        index up to date.
+
+        Args:
+            load: Function returning all products as an Arrow table
+            force: Update even if the index isn't stale
+        """
+        with self._refresh_lock:
+            if force or self.stale:
+                self.update(load())
+
+    def update(self, table: pa.Table) -> None:
+        """Bring the index in line with a table of all products.
+
+        Args:
+            table: All products, with at least id, name and product_group_name
+                columns, in the order ties are ranked in
+        """
+        documents = {
+            row["id"]: (normalize(row["name"]), normalize(row["product_group_name"]))
+            for row in table.select(["id", "name", "product_group_name"]).to_pylist()
+        }
+        positions = {product_id: i for i, product_id in enumerate(documents)}
+        with self._lock:
+            for product_id, document in self._documents.items():
+                if documents.get(product_id) != document:
+                    self._unindex(product_id, document)
+            for product_id, document in documents.items():
+                if self._documents.get(product_id) != document:
+                    self._index(product_id, document)
+            self._documents = documents
+            self._positions = positions
+            self._updated_at = time.monotonic()
+
+    def search(self, text: str) -> List[int]:
+        """Find the products whose name or product group name contains a text.
+
+        Args:
+            text: The text to look for, case-insensitive
+
+        Returns:
+            The ids of the matching products, best matches first; all products
+            in table order for an empty text
+        """
+        text = normalize(text)
+        with self._lock:
+            if not text:
+                return list(self._documents)
+            grams = sorted(
+                (self._postings.get(g, set()) for g in ngrams(text)), key=len
+            )
+            candidates = set.intersection(*grams) if grams else self._documents
+            ranked = []
+            for product_id in candidates:
+                rank = match_rank(text, *self._documents[product_id])
+                if rank is not None:
+                    ranked.append((rank, self._positions[product_id], product_id))
+        return [product_id for _, _, product_id in sorted(ranked)]
+
+    def _index(self, product_id: int, document: Tuple[str, str]) -> None:
+        """Add a product to the postings; the lock must be held."""
+        for gram in ngrams(document[0]) | ngrams(document[1]):
+            self._postings.setdefault(gram, set()).add(product_id)
+
+    def _unindex(self, product_id: int, document: Tuple[str, str]) -> None:
+        """Remove a product from the postings; the lock must be held."""
+        for gram in ngrams(document[0]) | ngrams(document[1]):
+            postings = self._postings[gram]
+            postings.discard(product_id)
+            if not postings:
+                del self._postings[gram]
+
+
+_indexes: Dict[str, SearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(key: str) -> SearchIndex:
+    """Get the process-wide search index for a data source.
+
+    The update interval is read from the ``VINEAPP_SEARCH_INDEX_TTL``
+    environment variable (in seconds, 300 by default).
+
+    Args:
+        key: Identifies the data source, e.g. its connection string
+
+    Returns:
+        The shared SearchIndex instance
+    """
+    with _indexes_lock:
+        if key not in _indexes:
+            ttl = float(os.getenv("VINEAPP_SEARCH_INDEX_TTL", str(DEFAULT_TTL_SECONDS)))
+            _indexes[key] = SearchIndex(ttl=ttl)
+        return _indexes[key]
@@ -0,0 +1,361 @@
+"""In-memory Arrow snapshot of the products view.
+
+The products view is small enough to hold in memory. A snapshot loads it once
+as a ``pyarrow.Table`` and answers listing, filtering, sorting and paging with
+Arrow compute kernels instead of a round trip to Dremio per request.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from vineapp.products.arrow import PRODUCT_SCHEMA
+from vineapp.products.models import (
+    InvalidParameterError,
+    Product,
+    ProductRepository,
+    ProductTable,
+)
+from vineapp.products.pagination import (
+    KeysetPage,
+    PageCursor,
+    cursor_for,
+    decode_cursor,
+    keyset_columns,
+)
+from vineapp.products.search import SearchIndex
+
+DEFAULT_TTL_SECONDS = 300.0
+
+
+class ProductSnapshot:
+    """Read-only product access served from an in-memory Arrow table.
+
+    The snapshot is loaded lazily on first use and reloaded when it is older
+    than ``ttl`` seconds or when :meth:`refresh` is called. While one caller
+    reloads a stale snapshot, the others keep being served from the old one.
+    It offers the same read methods as :class:`ProductRepository`, with the
+    same ordering.
+    """
+
+    def __init__(
+        self,
+        repository: Optional[ProductRepository] = None,
+        ttl: float = DEFAULT_TTL_SECONDS,
+    ):
+        """Initialize the snapshot.
+
+        Args:
+            repository: Repository to load products from, a default one if None
+            ttl: Maximum age of the snapshot in seconds before it is reloaded
+        """
+        self.repository = repository or ProductRepository()
+        self.ttl = ttl
+        self._table: Optional[pa.Table] = None
+        self._orderings: Dict[Tuple[Optional[str], bool], pa.Array] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        # Held while loading, so only one caller loads at a time
+        self._load_lock = threading.Lock()
+        self._search_index = SearchIndex()
+        self._indexed_table: Optional[pa.Table] = None
+        self._search_lock = threading.Lock()
+
+    @property
+    def table(self) -> pa.Table:
+        """Get the products table, loading or reloading it when stale."""
+        return self._current()[0]
+
+    def _current(self) -> Tuple[pa.Table, dict]:
+        """Get the table with its sort orders, loading or reloading when stale.
+
+        Both are returned together so a concurrent refresh can't pair the
+        sort orders of one table with the rows of another.
+        """
+        with self._lock:
+            loaded = self._table is not None
+        if not loaded:
+            with self._load_lock:
+                if self._table is None:
+                    self._load()
+        elif self.age > self.ttl and self._load_lock.acquire(blocking=False):
+            try:
+                if self.age > self.ttl:
+                    self._load()
+            finally:
+                self._load_lock.release()
+        with self._lock:
+            return self._table, self._orderings
+
+    @property
+    def age(self) -> float:
+        """Get the number of seconds since the snapshot was loaded."""
+        return time.monotonic() - self._loaded_at
+
+    def refresh(self) -> None:
+        """Reload the snapshot from the repository now."""
+        with self._load_lock:
+            self._load()
+
+    def _load(self) -> None:
+        """Load all products into a new Arrow table and swap it in.
+
+        The table is read without holding the lock, so readers are served
+        from the previous table until the new one is ready.
+        """
+        table = self.repository.get_all_arrow()
+        with self._lock:
+            self._table = table
+            self._orderings = {}
+            self._loaded_at = time.monotonic()
+
+    def get_all(self) -> ProductTable:
+        """Get all products, ordered by product group and name.
+
+        Returns:
+            A sequence of products backed by an Arrow table, as returned by
+            :meth:`ProductRepository.get_all`
+        """
+        table, orderings = self._current()
+        return ProductTable(table.take(self._ordering(table, orderings, None, False)))
+
+    def get_by_id(self, product_id: int) -> Optional[Product]:
+        """Get a product by its ID.
+
+        Args:
+            product_id: The ID of the product to retrieve
+
+        Returns:
+            The product if found, None otherwise
+        """
+        table = self.table
+        position = pc.index(table["id"], product_id).as_py()
+        if position < 0:
+            return None
+        return Product(**table.slice(position, 1).to_pylist()[0])
+
+    def get_many(self, product_ids: Iterable[int]) -> List[Product]:
+        """Get the products with the given IDs.
+
+        Takes the same arguments as :meth:`ProductRepository.get_many`.
+        """
+        ids = list(dict.fromkeys(int(i) for i in product_ids))
+        table = self.table
+        found = table.filter(pc.is_in(table["id"], pa.array(ids, pa.int64())))
+        products = {row["id"]: Product(**row) for row in found.to_pylist()}
+        return [products[i] for i in ids if i in products]
+
+    def search(
+        self, text: str, page: int = 1, items_per_page: int = 10
+    ) -> Tuple[List[Product], int]:
+        """Search products by name and product group name, best matches first.
+
+        Takes the same arguments as :meth:`ProductRepository.search`. The
+        search index is updated from the snapshot after each reload, only
+        reindexing the products that changed.
+
+        Raises:
+            InvalidParameterError: If pagination parameters are invalid
+        """
+        if page < 1:
+            raise InvalidParameterError("Page number must be greater than 0")
+        if items_per_page < 1:
+            raise InvalidParameterError("Items per page must be greater than 0")
+
+        table = self.table
+        with self._search_lock:
+            if self._indexed_table is not table:
+                self._search_index.update(table)
+                self._indexed_table = table
+            ids = self._search_index.search(text)
+        offset = (page - 1) * items_per_page
+        page_ids = pa.array(ids[offset : offset + items_per_page], pa.int64())
+        return self._materialize(table, pc.index_in(page_ids, table["id"])), len(ids)
+
+    def get_paginated(
+        self,
+        page: int = 1,
+        items_per_page: int = 10,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+        filter_text: Optional[str] = None,
+        include_total: bool = True,
+    ) -> Tuple[List[Product], Optional[int]]:
+        """Get paginated products from the snapshot.
+
+        Takes the same arguments as :meth:`ProductRepository.get_paginated`.
+
+        Raises:
+            InvalidParameterError: If pagination parameters are invalid
+        """
+        if page < 1:
+            raise InvalidParameterError("Page number must be greater than 0")
+        if items_per_page < 1:
+            raise InvalidParameterError("Items per page must be greater than 0")
+
+        table, orderings = self._current()
+        order = self._filtered_ordering(
+            table, orderings, sort_by, descending, filter_text
+        )
+        offset = (page - 1) * items_per_page
+        products = self._materialize(table, order[offset : offset + items_per_page])
+        return products, len(order) if include_total else None
+
+    def get_keyset_page(
+        self,
+        cursor: Optional[str] = None,
+        items_per_page: int = 10,
+        sort_by: Optional[str] = None,
+        descending: bool = False,
+        filter_text: Optional[str] = None,
+        include_total: bool = True,
+    ) -> KeysetPage:
+        """Get a page of products continuing from a keyset cursor.
+
+        Takes the same arguments as :meth:`ProductRepository.get_keyset_page`.
+        The page is located by the id of the cursor's boundary row; if that
+        product is no longer in the snapshot the listing restarts at the top.
+
+        Raises:
+            InvalidParameterError: If the cursor or pagination parameters are invalid
+        """
+        if items_per_page < 1:
+            raise InvalidParameterError("Items per page must be greater than 0")
+        try:
+            position = (
+                decode_cursor(cursor)
+                if cursor
+                else PageCursor([], sort_by, descending, filter_text or None)
+            )
+        except ValueError as e:
+            raise InvalidParameterError(str(e)) from e
+
+        table, orderings = self._current()
+        order = self._filtered_ordering(
+            table,
+            orderings,
+            position.sort_by,
+            position.descending,
+            position.filter_text,
+        )
+        start, end = self._seek(table, order, position, items_per_page)
+        products = self._materialize(table, order[start:end])
+
+        def token(product: Product, before: bool) -> str:
+            return cursor_for(
+                product,
+                position.sort_by,
+                position.descending,
+                position.filter_text,
+                before,
+            )
+
+        has_next = products and end < len(order)
+        has_previous = products and start > 0
+        return KeysetPage(
+            products=products,
+            total=len(order) if include_total else None,
+            next_cursor=token(products[-1], False) if has_next else None,
+            previous_cursor=token(products[0], True) if has_previous else None,
+        )
+
+    @staticmethod
+    def _seek(
+        table: pa.Table, order: pa.Array, position: PageCursor, items_per_page: int
+    ) -> Tuple[int, int]:
+        """Find the slice of the ordering a keyset cursor points to."""
+        boundary = -1
+        if position.values:
+            ids = table["id"].take(order)
+            boundary = pc.index(ids, position.values[-1]).as_py()
+        if boundary < 0:
+            return 0, items_per_page
+        if position.before:
+            return max(boundary - items_per_page, 0), boundary
+        return boundary + 1, boundary + 1 + items_per_page
+
+    def _filtered_ordering(
+        self,
+        table: pa.Table,
+        orderings: dict,
+        sort_by: Optional[str],
+        descending: bool,
+        filter_text: Optional[str],
+    ) -> pa.Array:
+        """Get the row indices matching a filter, in sort order."""
+        order = self._ordering(table, orderings, sort_by, descending)
+        if not filter_text:
+            return order
+        # Same semantics as the SQL filter: case-insensitive LIKE '%text%'
+        pattern = f"%{filter_text}%"
+        mask = pc.or_kleene(
+            pc.match_like(table["name"], pattern, ignore_case=True),
+            pc.match_like(table["product_group_name"], pattern, ignore_case=True),
+        )
+        mask = pc.fill_null(mask, False)
+        return order.filter(mask.take(order))
+
+    @staticmethod
+    def _ordering(
+        table: pa.Table, orderings: dict, sort_by: Optional[str], descending: bool
+    ) -> pa.Array:
+        """Get (and remember) the row indices of the table in sort order.
+
+        Matches the repository ordering: missing text sorts as an empty
+        string and the id breaks ties.
+        """
+        key = (sort_by, descending)
+        if key not in orderings:
+            columns = keyset_columns(sort_by)
+            unknown = [c for c in columns if c not in PRODUCT_SCHEMA.names]
+            if unknown:
+                raise InvalidParameterError(
+                    f"Cannot sort by unknown column '{unknown[0]}'"
+                )
+            keys = pa.table(
+                {
+                    c: (
+                        pc.fill_null(table[c], "")
+                        if pa.types.is_string(table[c].type)
+                        else table[c]
+                    )
+                    for c in columns
+                }
+            )
+            direction = "descending" if descending else "ascending"
+            orderings[key] = pc.sort_indices(
+                keys, sort_keys=[(c, direction) for c in columns]
+            )
+        return orderings[key]
+
+    @staticmethod
+    def _materialize(table: pa.Table, indices: pa.Array) -> List[Product]:
+        """Create Product instances for the given rows."""
+        return [Product(**row) for row in table.take(indices).to_pylist()]
+
+
+_snapshot: Optional[ProductSnapshot] = None
+_snapshot_lock = threading.Lock()
+
+
+def get_product_snapshot() -> ProductSnapshot:
+    """Get the process-wide product snapshot.
+
+    The reload interval is read from the ``VINEAPP_PRODUCT_SNAPSHOT_TTL``
+    environment variable (in seconds, 300 by default).
+
+    Returns:
+        The shared ProductSnapshot instance
+    """
+    global _snapshot
+    with _snapshot_lock:
+        if _snapshot is None:
+            ttl = float(
+                os.getenv("VINEAPP_PRODUCT_SNAPSHOT_TTL", str(DEFAULT_TTL_SECONDS))
+            )
+            _snapshot = ProductSnapshot(ttl=ttl)
+        return _snapshot
@@ -3,8 +3,9 @@
 from nicegui import APIRouter, ui
 from typing import Optional
 
-from ...fibery.graphql import get_fibery_client
+from ...fibery.graphql import get_async_fibery_client
 from ...fibery.models import FiberyEntity, FiberySchema, get_fibery_info
+from ...fibery.schema import get_schema_cache
 from ..components import frame
 from ..components.model_card import display_model_card
 from ..components.message import message
@@ -13,34 +14,9 @@ from ..components.styles import (
     HEADER_CLASSES,
 )
 
-
 router = APIRouter(prefix="/kb/database")
 
 
-def _build_schema_query(type_name: str) -> str:
-    """Build GraphQL query for schema information.
-
-    Args:
-        type_name: The name of the type to query
-
-    Returns:
-        str: The GraphQL query
-    """
-    return f"""
-        query {{
-            __type(name: "{type_name}") {{
-                name
-                fields {{
-                    name
-                    type {{
-                        name
-                    }}
-                }}
-            }}
-        }}
-    """
-
-
 def _build_entities_query(field_name: str) -> str:
     """Build GraphQL query for entities.
 
@@ -100,27 +76,17 @@ def _display_entities(entities: list) -> None:
                 display_model_card(entity)
 
 
-def _get_schema(client, type_name: str) -> Optional[FiberySchema]:
-    """Get schema information from Fibery.
+def _get_schema(types: dict, type_name: str) -> Optional[FiberySchema]:
+    """Get schema information from the GraphQL schema.
 
     Args:
-        client: The GraphQL client to use
-        type_name: The name of the type to query
+        types: The types of the schema by name
+        type_name: The name of the type to get
 
     Returns:
         Optional[FiberySchema]: Schema if found, None if error
     """
-    schema_result = client.execute(_build_schema_query(type_name))
-    if "errors" in schema_result:
-        error_msg = schema_result["errors"][0].get("message", "Unknown GraphQL error")
-        message(f"GraphQL Error: {error_msg}")
-        return None
-
-    if "data" not in schema_result or "__type" not in schema_result["data"]:
-        message("Unexpected API response format")
-        return None
-
-    type_info = schema_result["data"]["__type"]
+    type_info = types.get(type_name)
     if not type_info:
         message(f"Type '{type_name}' not found")
         return None
@@ -132,53 +98,81 @@ def _get_schema(client, type_name: str) -> Optional[FiberySchema]:
         return None
 
 
-def _get_entities(client, name: str) -> Optional[list]:
-    """Get entities from Fibery.
+def _get_find_field(types: dict, name: str) -> Optional[str]:
+    """Get the field of the Query type that finds the entities of a database.
+
+    Fibery names it after the database, mostly in the singular and
+    sometimes in the plural.
 
     Args:
-        client: The GraphQL client to use
+        types: The types of the schema by name
         name: The name of the database
 
     Returns:
-        Optional[list]: List of entities if found, None if error
+        Optional[str]: The field name, None if the schema has neither form
     """
-    # Try singular form first
-    find_field = f"find{name}"
-    result = client.execute(_build_entities_query(find_field))
-    if "errors" not in result and "data" in result and find_field in result["data"]:
-        return result["data"][find_field]
+    query_type = types.get("Query") or {}
+    query_fields = {field["name"] for field in query_type.get("fields") or []}
+    for find_field in (f"find{name}", f"find{name}s"):
+        if find_field in query_fields:
+            return find_field
+    return None
 
-    # Try plural form
-    find_field = f"{find_field}s"
-    result = client.execute(_build_entities_query(find_field))
-    if "errors" not in result and "data" in result and find_field in result["data"]:
-        return result["data"][find_field]
 
+def _get_entities(result: dict, find_field: str, name: str) -> Optional[list]:
+    """Get entities from the result of the entity query.
+
+    Args:
+        result: The response to the entity query
+        find_field: The field the query asked for
+        name: The name of the database
+
+    Returns:
+        Optional[list]: List of entities if found, None if error
+    """
     if "errors" in result:
         error_msg = result["errors"][0].get("message", "Unknown GraphQL error")
         message(f"GraphQL Error: {error_msg}")
     elif "data" not in result:
         message("Unexpected API response format")
+    elif result["data"].get(find_field):
+        return result["data"][find_field]
     else:
         message(f"No entities found for '{name}'")
     return None
 
 
 @router.page("/{name}")
-def database_page(name: str) -> None:
+async def database_page(name: str) -> None:
     """Render the database detail page.
 
+    The schema and the query field that finds the entities come from the
+    cached schema of the space, so only the entities are queried.
+
     Args:
         name: The name of the database (e.g., 'Actie' or 'Werkdocument')
     """
     with frame(f"{name} Database"):
         info = get_fibery_info()
-        client = get_fibery_client()
+        client = get_async_fibery_client()
         type_name = f"{info._get_type_space_name()}{name}"
 
-        schema = _get_schema(client, type_name)
-        if schema:
-            _display_schema(schema)
-            entities = _get_entities(client, name)
-            if entities:
-                _display_entities(entities)
+        try:
+            types = await get_schema_cache(client.url).aget(client)
+        except ValueError as e:
+            message(str(e))
+            return
+
+        schema = _get_schema(types, type_name)
+        if not schema:
+            return
+        _display_schema(schema)
+
+        find_field = _get_find_field(types, name)
+        if find_field is None:
+            message(f"No entities found for '{name}'")
+            return
+        result = await client.execute(_build_entities_query(find_field))
+        entities = _get_entities(result, find_field, name)
+        if entities:
+            _display_entities(entities)
@@ -0,0 +1,49 @@
+"""Event loop diagnostics page implementation."""
+
+from datetime import datetime
+
+from nicegui import APIRouter, ui
+
+from ..components import frame
+from ..components.styles import (
+    CARD_CLASSES,
+    HEADER_CLASSES,
+    SUBHEADER_CLASSES,
+)
+from ..watchdog import get_loop_watchdog
+
+router = APIRouter(prefix="/diagnostics")
+
+
+@router.page("/")
+def diagnostics_page() -> None:
+    """Render the event loop lag and the stalls recorded by the watchdog."""
+    with frame("Event Loop Diagnostics"):
+        with ui.card().classes(CARD_CLASSES.replace("max-w-3xl", "max-w-5xl")):
+            ui.label("Event Loop Diagnostics").classes(HEADER_CLASSES + " mb-4")
+            watchdog = get_loop_watchdog()
+            if watchdog is None:
+                ui.label(
+                    "The event loop watchdog is off. "
+                    "Set VINEAPP_LOOP_LAG_THRESHOLD above 0 to turn it on."
+                ).classes(SUBHEADER_CLASSES)
+                return
+
+            stats = watchdog.stats()
+            ui.label(
+                f"Lag p50 {stats.p50 * 1000:.1f} ms, p99 {stats.p99 * 1000:.1f} ms, "
+                f"max {stats.max * 1000:.1f} ms over {stats.samples} heartbeats"
+            ).classes(SUBHEADER_CLASSES)
+            ui.label(
+                f"{stats.stalls} stalls longer than "
+                f"{watchdog.threshold * 1000:.0f} ms"
+            ).classes(SUBHEADER_CLASSES + " mb-4")
+
+            for stall in watchdog.stalls():
+                started = datetime.fromtimestamp(stall.started_at)
+                title = (
+                    f"{started:%H:%M:%S} {stall.seconds * 1000:.0f} ms in "
+                    f"{stall.handler or 'an unknown handler'}"
+                )
+                with ui.expansion(title).classes("w-full"):
+                    ui.code(stall.stack or "No stack was sampled").classes("w-full")
@@ -2,8 +2,9 @@
 
 from nicegui import APIRouter, ui
 
-from ...fibery.graphql import get_fibery_client
+from ...fibery.graphql import get_async_fibery_client
 from ...fibery.models import get_fibery_info
+from ...fibery.schema import get_schema_cache
 from ..components import frame
 from ..components.model_card import display_model_card
 from ..components.message import message
@@ -13,7 +14,6 @@ from ..components.styles import (
     LINK_CLASSES,
 )
 
-
 router = APIRouter(prefix="/kb")
 
 
@@ -36,54 +36,36 @@ def _is_database_type(type_info: dict, space_prefix: str) -> bool:
     )
 
 
-def _get_database_types(client, info) -> list:
-    """Get available database types from GraphQL schema.
+def _get_database_types(types: dict, info) -> list:
+    """Get available database types from the GraphQL schema.
 
     Args:
-        client: The GraphQL client to use
+        types: The types of the schema by name
         info: The Fibery environment info
 
     Returns:
         list: List of database types
     """
-    query = """
-        query {
-            __schema {
-                types {
-                    name
-                    fields {
-                        name
-                    }
-                }
-            }
-        }
-    """
-
-    response = client.execute(query)
-    if "errors" in response:
-        error_msg = response["errors"][0].get("message", "Unknown GraphQL error")
-        message(f"GraphQL Error: {error_msg}")
-        return []
-
-    if "data" not in response:
-        message("Unexpected API response format")
-        return []
-
-    types = response["data"]["__schema"]["types"]
     space_prefix = info._get_type_space_name()
-    return [t for t in types if _is_database_type(t, space_prefix)]
+    return [t for t in types.values() if _is_database_type(t, space_prefix)]
 
 
 @router.page("/")
-def kb_page() -> None:
+async def kb_page() -> None:
     """Render the knowledge base page."""
     with frame("Knowledge Base"):
         info = get_fibery_info()
-        client = get_fibery_client()
+        client = get_async_fibery_client()
 
         display_model_card(info, description_field="description")
 
-        database_types = _get_database_types(client, info)
+        try:
+            types = await get_schema_cache(client.url).aget(client)
+        except ValueError as e:
+            message(str(e))
+            types = {}
+
+        database_types = _get_database_types(types, info)
         if database_types:
             with ui.card().classes(CARD_CLASSES):
                 ui.label("Available Databases").classes(HEADER_CLASSES + " mb-4")
@@ -1,10 +1,24 @@
 """Products page implementation."""
 
-from typing import List, Dict, Any
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple, Union
 
-from nicegui import APIRouter, ui
+from nicegui import APIRouter, app, background_tasks, ui
 
-from ...products.models import ProductRepository
+from ...products.async_repository import AsyncProductRepository
+from ...products.cache import (
+    CachedProductRepository,
+    get_product_cache,
+    get_query_cache,
+)
+from ...products.models import Product, ProductRepository
+from ...products.pagination import cursor_for
+from ...products.snapshot import ProductSnapshot, get_product_snapshot
 from ..components import frame
 from ..components.model_card import display_model_card
 from ..components.message import show_error
@@ -14,26 +28,300 @@ from ..components.styles import (
     LINK_CLASSES,
 )
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/products")
 
-# Shared table state
-table_data = {
-    "pagination": {
-        "rowsPerPage": 10,
-        "page": 1,
-        "rowsNumber": 0,  # This will actually signal the Quasar component to use server side pagination
-        "sortBy": None,
-        "descending": False,
-    },
-    "filter": "",  # Single filter for searching all fields
-}
+# Number of pages each browser tab keeps to show again without a query
+PAGE_CACHE_SIZE = 20
+
+# Seconds a page is kept to show again, including prefetched pages
+PAGE_CACHE_TTL = 60.0
+
+# Seconds to wait for more typing before searching, see VINEAPP_SEARCH_DEBOUNCE
+DEFAULT_SEARCH_DEBOUNCE = 0.3
+
+# Listings with at most this many products are sorted and paged in the
+# browser, see VINEAPP_CLIENT_SIDE_THRESHOLD
+DEFAULT_CLIENT_SIDE_THRESHOLD = 500
+
+
+@dataclass
+class ProductTableState:
+    """State of the products table in one browser tab."""
+
+    pagination: Dict[str, Any] = field(
+        default_factory=lambda: {
+            "rowsPerPage": 10,
+            "page": 1,
+            "rowsNumber": 0,  # This will actually signal the Quasar component to use server side pagination
+            "sortBy": None,
+            "descending": False,
+        }
+    )
+    filter: str = ""  # Single filter for searching all fields
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+    # Continuation tokens for the pages next to the current one
+    cursors: Dict[str, Any] = field(default_factory=dict)
+    # Number of products matching counted_filter
+    total: int = 0
+    # Filter for which the total was counted
+    counted_filter: Optional[str] = None
+    # Number of the latest data request
+    request: int = 0
+    # Search waiting for the debounce interval or for its query
+    search: Optional[asyncio.Task] = None
+    # Recently shown and prefetched pages by page number and listing
+    pages: "OrderedDict[Tuple[int, tuple], tuple]" = field(default_factory=OrderedDict)
+
+    def start_request(self) -> int:
+        """Number a new data request, superseding the ones still running.
+
+        Requests await the repository, so a slow one can finish after a
+        newer one. Only the latest request may update the table.
+        """
+        self.request += 1
+        return self.request
+
+    def cached_page(self, page: int, listing: tuple) -> Optional[tuple]:
+        """Get a recently loaded page as (products, total, cursors), if any."""
+        cached = self.pages.get((page, listing))
+        if not cached:
+            return None
+        loaded_at, page_data = cached
+        if time.monotonic() - loaded_at > PAGE_CACHE_TTL:
+            del self.pages[(page, listing)]
+            return None
+        self.pages.move_to_end((page, listing))
+        return page_data
+
+    def remember(
+        self,
+        page: int,
+        listing: tuple,
+        products: List[Product],
+        total: int,
+        cursors: Dict[str, Any],
+    ) -> None:
+        """Keep a page in the page cache, without showing it.
+
+        Args:
+            page: The page number
+            listing: Rows per page, sort column, descending and filter
+            products: The products on the page
+            total: Number of products in the listing
+            cursors: Continuation tokens for the pages around this one
+        """
+        self.pages[(page, listing)] = (time.monotonic(), (products, total, cursors))
+        self.pages.move_to_end((page, listing))
+        while len(self.pages) > PAGE_CACHE_SIZE:
+            self.pages.popitem(last=False)
+
+    def show(
+        self,
+        page: int,
+        listing: tuple,
+        products: List[Product],
+        total: Optional[int],
+        cursors: Dict[str, Any],
+    ) -> None:
+        """Make a page the current one, paged by the server.
+
+        The page is also kept in the page cache.
+
+        Args:
+            page: The page number
+            listing: Rows per page, sort column, descending and filter
+            products: The products on the page
+            total: Number of products in the listing, None if not counted
+            cursors: Continuation tokens for the pages around this one
+        """
+        self.rows = [
+            {
+                "id": p.id,
+                "name": p.name,
+                "product_group_name": p.product_group_name,
+            }
+            for p in products
+        ]
+        if total is not None:
+            self.total = total
+            self.counted_filter = listing[3]
+        self.pagination["rowsNumber"] = self.total
+        self.cursors = cursors
+        if self.cached_page(page, listing) is None:
+            self.remember(page, listing, products, self.total, cursors)
+
+    def show_all(self, listing: tuple, products: List[Product]) -> None:
+        """Show all products of a listing, to be sorted and paged in the browser.
+
+        Without rowsNumber the Quasar table sorts and pages the rows itself
+        and sends no more requests until the filter changes.
+
+        Args:
+            listing: Rows per page, sort column, descending and filter
+            products: All products matching the filter
+        """
+        self.rows = [
+            {
+                "id": p.id,
+                "name": p.name,
+                "product_group_name": p.product_group_name,
+            }
+            for p in products
+        ]
+        self.total = len(products)
+        self.counted_filter = listing[3]
+        self.pagination.pop("rowsNumber", None)
+        self.pagination["page"] = 1
+        self.cursors = {}
+
+
+def _get_table_state() -> ProductTableState:
+    """Get the products table state of the current browser tab.
+
+    The state lives in the client storage, so every tab pages, sorts and
+    filters on its own without affecting other users.
+    """
+    return app.storage.client.setdefault("products_table", ProductTableState())
+
+
+def _get_repository() -> CachedProductRepository:
+    """Get the product data source.
+
+    Reads go to the in-memory snapshot when enabled, and to Dremio otherwise.
+    Recently read products are served from the shared product map, and
+    repeated queries from the shared query cache when that is enabled.
+    """
+    repository: Union[ProductRepository, ProductSnapshot]
+    if os.getenv("VINEAPP_PRODUCT_SNAPSHOT", "false").lower() == "true":
+        repository = get_product_snapshot()
+    else:
+        repository = ProductRepository()
+    cache = None
+    if os.getenv("VINEAPP_QUERY_CACHE", "false").lower() == "true":
+        cache = get_query_cache()
+    return CachedProductRepository(repository, cache, get_product_cache())
+
+
+def _page_cursors(
+    products: List[Product], page: int, total: int, listing: tuple
+) -> Dict[str, Any]:
+    """Create continuation tokens for the pages around a page loaded by offset."""
+    rows_per_page, sort_by, descending, filter_text = listing
+    has_next = products and page * rows_per_page < total
+    has_previous = products and page > 1
+    return {
+        "listing": listing,
+        "page": page,
+        "next": (
+            cursor_for(products[-1], sort_by, descending, filter_text)
+            if has_next
+            else None
+        ),
+        "previous": (
+            cursor_for(products[0], sort_by, descending, filter_text, before=True)
+            if has_previous
+            else None
+        ),
+    }
+
+
+async def _fetch_page(
+    repository: AsyncProductRepository,
+    state: ProductTableState,
+    page: int,
+    listing: tuple,
+) -> tuple:
+    """Fetch a page, seeking from the current page when adjacent.
+
+    Moving to the next or previous page continues from the boundary row of
+    the current page with a keyset cursor, which costs the same at any depth.
+    Other jumps fall back to offset pagination. The total is only counted
+    again when the filter changed since it was last counted. The table state
+    is left untouched; the caller shows the page if it is still current.
+
+    Returns:
+        The products, the total (None if not counted), the continuation
+        tokens for the pages around this one and the total of the listing,
+        counted or known from before
+    """
+    rows_per_page, sort_by, descending, filter_text = listing
+    include_total = state.counted_filter != filter_text
+    known_total = state.total
+    cursors = state.cursors
+    cursor = None
+    if cursors.get("listing") == listing:
+        if page == cursors["page"] + 1:
+            cursor = cursors["next"]
+        elif page == cursors["page"] - 1:
+            cursor = cursors["previous"]
+
+    if cursor:
+        result = await repository.get_keyset_page(
+            cursor=cursor,
+            items_per_page=rows_per_page,
+            include_total=include_total,
+        )
+        cursors = {
+            "listing": listing,
+            "page": page,
+            "next": result.next_cursor,
+            "previous": result.previous_cursor,
+        }
+        listing_total = known_total if result.total is None else result.total
+        return result.products, result.total, cursors, listing_total
+
+    products, total = await repository.get_paginated(
+        page=page,
+        items_per_page=rows_per_page,
+        sort_by=sort_by,
+        descending=descending,
+        filter_text=filter_text,  # Pass the filter text to the repository
+        include_total=include_total,
+    )
+    listing_total = known_total if total is None else total
+    cursors = _page_cursors(products, page, listing_total, listing)
+    return products, total, cursors, listing_total
+
+
+async def _prefetch_neighbours(
+    repository: AsyncProductRepository,
+    state: ProductTableState,
+    page: int,
+    listing: tuple,
+    request: int,
+) -> None:
+    """Load the pages after and before a page into the page cache.
+
+    The next page comes first, being the more likely next click. Nothing is
+    started once a newer request has made the page outdated, and pages
+    fetched for an outdated request aren't kept.
+    """
+    rows_per_page = listing[0]
+    for neighbour in (page + 1, page - 1):
+        if request != state.request:
+            return
+        exists = 1 <= neighbour and ((neighbour - 1) * rows_per_page < state.total)
+        if exists and state.cached_page(neighbour, listing) is None:
+            products, _, cursors, total = await _fetch_page(
+                repository, state, neighbour, listing
+            )
+            if request != state.request:
+                return
+            state.remember(neighbour, listing, products, total, cursors)
 
 
 @router.page("/")
-def products_page() -> None:
+async def products_page() -> None:
     """Render the products page with a table of all products."""
-    repository = ProductRepository()
+    repository = AsyncProductRepository(_get_repository())
+    state = _get_table_state()
+    debounce = float(os.getenv("VINEAPP_SEARCH_DEBOUNCE", str(DEFAULT_SEARCH_DEBOUNCE)))
+    prefetch = os.getenv("VINEAPP_PRODUCT_PREFETCH", "true").lower() == "true"
+    client_side_threshold = int(
+        os.getenv("VINEAPP_CLIENT_SIDE_THRESHOLD", str(DEFAULT_CLIENT_SIDE_THRESHOLD))
+    )
 
     with frame("Products"):
         with ui.card().classes(CARD_CLASSES.replace("max-w-3xl", "max-w-5xl")):
@@ -62,9 +350,9 @@ def products_page() -> None:
                 """Create a refreshable table component."""
                 table = ui.table(
                     columns=columns,
-                    rows=table_data["rows"] if "rows" in table_data else [],
+                    rows=state.rows,
                     row_key="id",
-                    pagination=table_data["pagination"],
+                    pagination=state.pagination,
                 ).classes("w-full")
                 table.add_slot(
                     "body-cell-actions",
@@ -82,16 +370,25 @@ def products_page() -> None:
                 """Handle click on view button."""
                 product_id = e.args.get("key")
                 if product_id:
-                    print(f"Navigating to /products/{product_id}")  # Debug log
+                    logger.debug("Navigating to /products/%s", product_id)
                     ui.navigate.to(f"/products/{product_id}")
 
             async def handle_filter(e: Any) -> None:
-                """Handle changes to the search filter with debounce."""
-                table_data["filter"] = e.value if e.value else ""
-                table_data["pagination"]["page"] = 1  # Reset to first page
-                load_filtered_data()
+                """Handle changes to the search filter with debounce.
 
-            def handle_table_request(event: Dict[str, Any]) -> None:
+                The search only runs once typing has paused for the debounce
+                interval. A newer change cancels the pending search, and
+                abandons its query if that is already on its way.
+                """
+                state.filter = e.value if e.value else ""
+                state.pagination["page"] = 1  # Reset to first page
+                if state.search and not state.search.done():
+                    state.search.cancel()
+                state.search = asyncio.current_task()
+                await asyncio.sleep(debounce)
+                await load_filtered_data()
+
+            async def handle_table_request(event: Dict[str, Any]) -> None:
                 """Handle table request events (pagination and sorting)."""
                 # Update pagination state from request
                 new_pagination = (
@@ -99,7 +396,7 @@ def products_page() -> None:
                     if isinstance(event, dict)
                     else event.args["pagination"]
                 )
-                table_data["pagination"].update(new_pagination)
+                state.pagination.update(new_pagination)
 
                 # Get new page of data with sorting
                 page = new_pagination.get("page", 1)
@@ -107,69 +404,104 @@ def products_page() -> None:
                 sort_by = new_pagination.get("sortBy")
                 descending = new_pagination.get("descending", False)
 
-                print(f"Fetching page {page} with {rows_per_page} rows per page")
-                print(
-                    f"Sorting by {sort_by} {'descending' if descending else 'ascending'}"
+                logger.debug(
+                    "Fetching page %s with %s rows per page, sorted by %s %s, "
+                    "filtered by %r",
+                    page,
+                    rows_per_page,
+                    sort_by,
+                    "descending" if descending else "ascending",
+                    state.filter,
                 )
-                print(f"Filter: {table_data['filter']}")
-
-                products, total = repository.get_paginated(
-                    page=page,
-                    items_per_page=rows_per_page,
-                    sort_by=sort_by,
-                    descending=descending,
-                    filter_text=table_data[
-                        "filter"
-                    ],  # Pass the filter text to the repository
+
+                listing = (rows_per_page, sort_by, descending, state.filter)
+                request = state.start_request()
+                cached = state.cached_page(page, listing)
+                if cached:
+                    # This tab loaded the page recently; show it again as is
+                    show_page(page, listing, request, *cached)
+                    return
+                products, total, cursors, _ = await _fetch_page(
+                    repository, state, page, listing
                 )
+                if request == state.request:
+                    await show_result(page, listing, request, products, total, cursors)
 
-                # Update table data
-                table_data["rows"] = [
-                    {
-                        "id": p.id,
-                        "name": p.name,
-                        "product_group_name": p.product_group_name,
-                    }
-                    for p in products
-                ]
-                table_data["pagination"]["rowsNumber"] = total
-
-                # Refresh the table UI
+            async def show_result(
+                page: int,
+                listing: tuple,
+                request: int,
+                products: List[Product],
+                total: Optional[int],
+                cursors: Dict[str, Any],
+            ) -> None:
+                """Show a fetched page, or the whole listing if it is small.
+
+                A freshly counted listing of at most client_side_threshold
+                products is sent to the browser at once, fetching the rest of
+                it if the page doesn't already hold everything. The browser
+                then sorts and pages it without further requests.
+                """
+                if total is None or not 0 < total <= client_side_threshold:
+                    show_page(page, listing, request, products, total, cursors)
+                    return
+                if len(products) < total:
+                    rows_per_page, sort_by, descending, filter_text = listing
+                    products, _ = await repository.get_paginated(
+                        page=1,
+                        items_per_page=total,
+                        sort_by=sort_by,
+                        descending=descending,
+                        filter_text=filter_text,
+                        include_total=False,
+                    )
+                    if request != state.request:
+                        return
+                state.show_all(listing, products)
+                products_table.refresh()
+
+            def show_page(
+                page: int, listing: tuple, request: int, *page_data: Any
+            ) -> None:
+                """Show a page and start loading the pages around it."""
+                state.show(page, listing, *page_data)
                 products_table.refresh()
+                if prefetch:
+                    background_tasks.create(
+                        _prefetch_neighbours(repository, state, page, listing, request),
+                        name="prefetch products",
+                    )
 
-            def load_filtered_data() -> None:
+            async def load_filtered_data() -> None:
                 """Load data with current filter and refresh table."""
-                handle_table_request({"pagination": table_data["pagination"]})
+                await handle_table_request({"pagination": state.pagination})
 
             # Initial data load
-            def load_initial_data() -> None:
+            async def load_initial_data() -> None:
                 """Load initial data and set total count."""
-                products, total = repository.get_paginated(page=1, items_per_page=10)
-                table_data["rows"] = [
-                    {
-                        "id": p.id,
-                        "name": p.name,
-                        "product_group_name": p.product_group_name,
-                    }
-                    for p in products
-                ]
-                table_data["pagination"]["rowsNumber"] = total
-                products_table.refresh()
+                listing = (10, None, False, "")
+                request = state.start_request()
+                products, total = await repository.get_paginated(
+                    page=1, items_per_page=10
+                )
+                if request == state.request:
+                    cursors = _page_cursors(products, 1, total, listing)
+                    await show_result(1, listing, request, products, total, cursors)
 
             # Create table and load data
             table = products_table()
-            load_initial_data()
+            await load_initial_data()
 
             return table
 
 
 @router.page("/{product_id:int}")
-def product_detail(product_id: int) -> None:
+async def product_detail(product_id: int) -> None:
     """Render the product detail page."""
-    repository = ProductRepository()
+    repository = AsyncProductRepository(_get_repository())
 
     with frame("Product Details"):
-        product = repository.get_by_id(product_id)
+        product = await repository.get_by_id(product_id)
 
         if product:
             with ui.row().classes("w-full justify-between items-center mb-6"):
@@ -0,0 +1,67 @@
+"""Reflection diagnostics page implementation."""
+
+from typing import Any, Dict, List
+
+from nicegui import APIRouter, ui
+
+from ...products.reflections import QueryShapeStats, get_reflection_diagnostics
+from ..components import frame
+from ..components.styles import (
+    CARD_CLASSES,
+    HEADER_CLASSES,
+    SUBHEADER_CLASSES,
+)
+
+router = APIRouter(prefix="/products/reflections")
+
+
+def _row(stats: QueryShapeStats) -> Dict[str, Any]:
+    """Create a table row for the statistics of a query shape.
+
+    Args:
+        stats: The statistics to display
+
+    Returns:
+        Dict[str, Any]: The table row
+    """
+    if stats.accelerated is None:
+        accelerated = f"unknown ({stats.error})" if stats.error else "unknown"
+    else:
+        accelerated = "yes" if stats.accelerated else "no"
+    return {
+        "shape": stats.shape,
+        "accelerated": accelerated,
+        "reflections": ", ".join(stats.reflections),
+        "executions": stats.executions,
+        "total_ms": round(stats.total_seconds * 1000, 1),
+        "mean_ms": round(stats.mean_seconds * 1000, 1),
+    }
+
+
+@router.page("/")
+def reflections_page() -> None:
+    """Render the reflection diagnostics of the product queries run so far."""
+    with frame("Reflection Diagnostics"):
+        with ui.card().classes(CARD_CLASSES.replace("max-w-3xl", "max-w-5xl")):
+            ui.label("Reflection Diagnostics").classes(HEADER_CLASSES + " mb-4")
+            diagnostics = get_reflection_diagnostics()
+            if diagnostics is None:
+                ui.label(
+                    "Reflection diagnostics are off. "
+                    "Set VINEAPP_REFLECTION_DIAGNOSTICS=true to collect them."
+                ).classes(SUBHEADER_CLASSES)
+                return
+
+            columns: List[Dict[str, Any]] = [
+                {"name": "shape", "label": "Query", "field": "shape"},
+                {"name": "accelerated", "label": "Accelerated", "field": "accelerated"},
+                {"name": "reflections", "label": "Reflections", "field": "reflections"},
+                {"name": "executions", "label": "Runs", "field": "executions"},
+                {"name": "total_ms", "label": "Total (ms)", "field": "total_ms"},
+                {"name": "mean_ms", "label": "Mean (ms)", "field": "mean_ms"},
+            ]
+            ui.table(
+                columns=columns,
+                rows=[_row(stats) for stats in diagnostics.report()],
+                row_key="shape",
+            ).classes("w-full")
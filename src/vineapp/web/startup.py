@@ -1,8 +1,14 @@
 """Web application startup configuration."""
 
+from fastapi.responses import PlainTextResponse
 from nicegui import app, ui
 
-from .pages import home, products, kb, database
+from ..fibery.graphql import close_async_client, close_session
+from ..products.async_repository import shutdown_executor
+from ..products.engine import dispose_engines
+from ..products.profiling import get_query_metrics
+from .pages import home, products, kb, database, reflections, diagnostics
+from .watchdog import get_loop_watchdog, start_watchdog, stop_watchdog
 
 
 def startup() -> None:
@@ -13,8 +19,27 @@ def startup() -> None:
     def root():
         home.index_page()
 
+    @app.get("/metrics", response_class=PlainTextResponse)
+    def metrics() -> str:
+        """Expose query timings and event loop lag for Prometheus to scrape."""
+        text = get_query_metrics().render_prometheus()
+        watchdog = get_loop_watchdog()
+        return text + watchdog.render_prometheus() if watchdog else text
+
     # Include routers
     app.include_router(home.root_router)
     app.include_router(products.router)
+    app.include_router(reflections.router)
+    app.include_router(diagnostics.router)
     app.include_router(kb.router)
     app.include_router(database.router)
+
+    # Finish running queries and close pooled connections when the server stops
+    app.on_shutdown(shutdown_executor)
+    app.on_shutdown(dispose_engines)
+    app.on_shutdown(close_session)
+    app.on_shutdown(close_async_client)
+
+    # Report handlers that block the event loop for everyone
+    start_watchdog()
+    app.on_shutdown(stop_watchdog)
@@ -0,0 +1,257 @@
+"""Watchdog reporting when the event loop of the web app stalls.
+
+NiceGUI runs every page and event handler on one asyncio event loop, so a
+handler that makes a blocking call, such as a synchronous query or HTTP
+request, keeps all other users waiting. :class:`LoopWatchdog` finds these:
+
+- a heartbeat task on the loop measures how late the loop wakes it up
+- a monitor thread notices when the heartbeat is overdue by more than the
+  threshold and samples the stack of the loop's thread at that moment, which
+  shows the call that is blocking it
+
+Each stall is logged as a warning with the handler that was running and the
+sampled stack, and kept for the diagnostics page.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional, Sequence, Tuple
+
+from nicegui import app, core
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD_SECONDS = 0.1
+DEFAULT_INTERVAL_SECONDS = 0.02
+DEFAULT_MODULES = ("vineapp",)
+MAX_STALLS = 50
+# Lag samples kept for the percentiles, a minute at the default interval
+MAX_SAMPLES = 3000
+
+
+@dataclass
+class Stall:
+    """A period in which the event loop didn't run other tasks."""
+
+    started_at: float
+    seconds: float
+    # Innermost function of the application on the stack, e.g. a page handler
+    handler: Optional[str]
+    stack: str
+
+
+@dataclass
+class LagStats:
+    """Event loop lag over the recent samples."""
+
+    samples: int
+    p50: float
+    p99: float
+    max: float
+    stalls: int
+
+
+class LoopWatchdog:
+    """Measures event loop lag and records what was running when it stalled."""
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD_SECONDS,
+        interval: float = DEFAULT_INTERVAL_SECONDS,
+        modules: Sequence[str] = DEFAULT_MODULES,
+    ):
+        """Initialize a stopped watchdog.
+
+        Args:
+            threshold: Seconds of lag that count as a stall
+            interval: Seconds between heartbeats
+            modules: Prefixes of the modules whose functions count as handlers
+        """
+        self.threshold = threshold
+        self.interval = interval
+        self.modules = tuple(modules)
+        self.stall_count = 0
+        self._stalls: Deque[Stall] = deque(maxlen=MAX_STALLS)
+        self._lags: Deque[float] = deque(maxlen=MAX_SAMPLES)
+        self._beat = time.monotonic()
+        self._sample: Optional[Tuple[Optional[str], str]] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        """Check whether the watchdog is watching a loop."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Start watching the running event loop."""
+        self.stop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped = threading.Event()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        threading.Thread(
+            target=self._monitor, args=(self._stopped,), daemon=True
+        ).start()
+
+    def stop(self) -> None:
+        """Stop watching."""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stalls(self) -> List[Stall]:
+        """Get the recent stalls, the latest first."""
+        with self._lock:
+            return list(reversed(self._stalls))
+
+    def stats(self) -> LagStats:
+        """Get the lag percentiles of the recent heartbeats."""
+        with self._lock:
+            lags = sorted(self._lags)
+            stalls = self.stall_count
+        if not lags:
+            return LagStats(0, 0.0, 0.0, 0.0, stalls)
+        return LagStats(
+            samples=len(lags),
+            p50=lags[len(lags) // 2],
+            p99=lags[min(int(len(lags) * 0.99), len(lags) - 1)],
+            max=lags[-1],
+            stalls=stalls,
+        )
+
+    def render_prometheus(self) -> str:
+        """Render the lag statistics in the Prometheus text exposition format."""
+        stats = self.stats()
+        return (
+            "\n".join(
+                [
+                    "# HELP vineapp_event_loop_lag_seconds Lag of recent event loop "
+                    "heartbeats.",
+                    "# TYPE vineapp_event_loop_lag_seconds gauge",
+                    f'vineapp_event_loop_lag_seconds{{quantile="0.5"}} {stats.p50}',
+                    f'vineapp_event_loop_lag_seconds{{quantile="0.99"}} {stats.p99}',
+                    f'vineapp_event_loop_lag_seconds{{quantile="1"}} {stats.max}',
+                    "# HELP vineapp_event_loop_stalls_total Event loop stalls longer "
+                    "than the threshold.",
+                    "# TYPE vineapp_event_loop_stalls_total counter",
+                    f"vineapp_event_loop_stalls_total {stats.stalls}",
+                ]
+            )
+            + "\n"
+        )
+
+    async def _heartbeat(self) -> None:
+        """Measure how late the loop wakes up after each interval."""
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._beat = now
+            lag = max(now - started - self.interval, 0.0)
+            with self._lock:
+                self._lags.append(lag)
+                sample, self._sample = self._sample, None
+            if lag >= self.threshold:
+                self._record(lag, sample)
+
+    def _monitor(self, stopped: threading.Event) -> None:
+        """Sample the loop thread's stack once the heartbeat is overdue."""
+        while not stopped.wait(self.interval):
+            overdue = time.monotonic() - self._beat - self.interval
+            if overdue < self.threshold:
+                continue
+            with self._lock:
+                if self._sample is not None:
+                    continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            sample = (self._handler(frame), "".join(traceback.format_stack(frame)))
+            with self._lock:
+                self._sample = sample
+
+    def _handler(self, frame) -> Optional[str]:
+        """Find the innermost application function on a stack."""
+        while frame is not None:
+            module = frame.f_globals.get("__name__", "")
+            if module != __name__ and module.startswith(self.modules):
+                code = frame.f_code
+                return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+            frame = frame.f_back
+        return None
+
+    def _record(
+        self, seconds: float, sample: Optional[Tuple[Optional[str], str]]
+    ) -> None:
+        """Keep and log a stall."""
+        handler, stack = sample or (None, "")
+        stall = Stall(time.time() - seconds, seconds, handler, stack)
+        with self._lock:
+            self._stalls.append(stall)
+            self.stall_count += 1
+        logger.warning(
+            "Event loop stalled for %.0f ms in %s\n%s",
+            seconds * 1000,
+            handler or "an unknown handler",
+            stack,
+            extra={"stall": {"seconds": seconds, "handler": handler}},
+        )
+
+
+_watchdog: Optional[LoopWatchdog] = None
+
+
+def get_loop_watchdog() -> Optional[LoopWatchdog]:
+    """Get the process-wide watchdog, None when it is turned off.
+
+    The stall threshold is read from ``VINEAPP_LOOP_LAG_THRESHOLD`` (in
+    seconds, 0.1 by default); 0 turns the watchdog off.
+    """
+    global _watchdog
+    threshold = float(
+        os.getenv("VINEAPP_LOOP_LAG_THRESHOLD", str(DEFAULT_THRESHOLD_SECONDS))
+    )
+    if threshold <= 0:
+        return None
+    if _watchdog is None:
+        _watchdog = LoopWatchdog(threshold=threshold)
+    _watchdog.threshold = threshold
+    return _watchdog
+
+
+def start_watchdog() -> None:
+    """Start the process-wide watchdog, if enabled.
+
+    Outside the event loop the watchdog is started on the app's loop: with
+    the app when it is set up before it runs, or as soon as the loop gets to
+    it when the app is already running.
+    """
+    watchdog = get_loop_watchdog()
+    if watchdog is None:
+        return
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        if core.loop is not None and app.is_started:
+            core.loop.call_soon_threadsafe(watchdog.start)
+        else:
+            app.on_startup(watchdog.start)
+        return
+    watchdog.start()
+
+
+def stop_watchdog() -> None:
+    """Stop the process-wide watchdog."""
+    if _watchdog is not None:
+        _watchdog.stop()
@@ -1 +1,65 @@
+"""Shared test fixtures."""
+
+from typing import Generator
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel
+
+from vineapp.products import Product, ProductRepository
+
 pytest_plugins = ["nicegui.testing.user_plugin"]
+
+PRODUCT_GROUPS = {113: "13 aziaat", 219: "19 oriëntal", 319: "19 sensations"}
+
+
+def make_products(count: int) -> list:
+    """Create synthetic products spread over a few product groups."""
+    group_ids = list(PRODUCT_GROUPS)
+    return [
+        Product(
+            id=i,
+            name=f"T. Bee {i:03d}" if i % 2 else f"S. Okinawa {i:03d}",
+            product_group_id=group_ids[i % len(group_ids)],
+            product_group_name=PRODUCT_GROUPS[group_ids[i % len(group_ids)]],
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def forget_schemas() -> Generator[None, None, None]:
+    """Keep the Fibery schema loaded in one test out of the next one."""
+    from vineapp.fibery.schema import clear_schema_caches
+
+    yield
+    clear_schema_caches()
+
+
+@pytest.fixture
+def sqlite_engine() -> Generator[Engine, None, None]:
+    """Create an in-memory SQLite engine exposing a "Vines".products table."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    @event.listens_for(engine, "connect")
+    def attach_vines_schema(dbapi_connection, _):
+        dbapi_connection.execute("ATTACH DATABASE ':memory:' AS \"Vines\"")
+
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(make_products(25))
+        session.commit()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def sqlite_repository(sqlite_engine: Engine) -> ProductRepository:
+    """Create a product repository backed by the SQLite engine."""
+    return ProductRepository(sqlite_engine)
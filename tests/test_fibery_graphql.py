@@ -1,11 +1,24 @@
 """Tests for Fibery GraphQL client."""
 
+import asyncio
 import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Generator
 from unittest.mock import patch, Mock
 
 import pytest
 import requests
-from vineapp.fibery.graphql import FiberyGraphQLClient, get_fibery_client
+from vineapp.fibery.graphql import (
+    AsyncFiberyGraphQLClient,
+    FiberyGraphQLClient,
+    HTTPSettings,
+    close_async_client,
+    close_session,
+    get_fibery_client,
+)
+from vineapp.fibery.graphql_server import FiberyGraphQLServer
 
 
 def test_get_fibery_client_requires_token():
@@ -24,7 +37,7 @@ def test_graphql_client_sets_auth_header():
     url = "https://test.fibery.io/api/graphql"
     client = FiberyGraphQLClient(url=url, token=token)
 
-    with patch.object(requests, "post") as mock_post:
+    with patch.object(requests.Session, "post") as mock_post:
         mock_response = Mock()
         mock_response.json.return_value = {"data": {"test": "value"}}
         mock_post.return_value = mock_response
@@ -36,3 +49,141 @@ def test_graphql_client_sets_auth_header():
         mock_post.assert_called_once()
         headers = mock_post.call_args[1]["headers"]
         assert headers["Authorization"] == f"Token {token}"
+
+
+@pytest.fixture
+def shared_session() -> Generator[None, None, None]:
+    """Start and end each test with a new shared session."""
+    close_session()
+    yield
+    close_session()
+
+
+def test_clients_reuse_connections_of_the_shared_session(shared_session):
+    """Test that queries of different clients go over one kept alive connection."""
+    with FiberyGraphQLServer() as server:
+        url = server.url.rstrip("/") + server.path
+
+        for _ in range(3):
+            client = FiberyGraphQLClient(url=url, token="any")
+            client.execute("query { findActies (limit: 1) { id } }")
+
+        assert server.connections == 1
+
+
+class _RateLimitedHandler(BaseHTTPRequestHandler):
+    """Answers 429 to the first request and a GraphQL result to the others."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests += 1
+        limited = self.server.requests == 1
+        body = b'{"data": {"ok": true}}'
+        self.send_response(429 if limited else 200)
+        if limited:
+            self.send_header("Retry-After", "0")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def rate_limited_server() -> Generator[ThreadingHTTPServer, None, None]:
+    """Serve GraphQL results after rate limiting the first request."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RateLimitedHandler)
+    server.requests = 0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_execute_retries_when_rate_limited(
+    shared_session, rate_limited_server, monkeypatch
+):
+    """Test that a rate limited query is sent again after a backoff."""
+    monkeypatch.setenv("VINEAPP_FIBERY_BACKOFF", "0")
+    client = FiberyGraphQLClient(url=rate_limited_server.url, token="any")
+
+    result = client.execute("query { ok }")
+
+    assert result == {"data": {"ok": True}}
+    assert rate_limited_server.requests == 2
+
+
+async def test_async_execute_retries_when_rate_limited(rate_limited_server):
+    """Test that the async client also sends a rate limited query again."""
+    client = AsyncFiberyGraphQLClient(url=rate_limited_server.url, token="any")
+
+    result = await client.execute("query { ok }")
+    await close_async_client()
+
+    assert result == {"data": {"ok": True}}
+    assert rate_limited_server.requests == 2
+
+
+async def test_execute_many_runs_queries_concurrently():
+    """Test that queries overlap, keep their order and share a connection pool."""
+    with FiberyGraphQLServer(latency=0.2) as server:
+        client = AsyncFiberyGraphQLClient(
+            url=server.url.rstrip("/") + server.path, token="any"
+        )
+        queries = [
+            f"query {{ find{name}s (limit: 1) {{ id }} }}" for name in server.databases
+        ]
+
+        started = time.perf_counter()
+        results = await client.execute_many(queries)
+        elapsed = time.perf_counter() - started
+        await close_async_client()
+
+    assert elapsed < 0.2 * len(queries)
+    assert [next(iter(r["data"])) for r in results] == [
+        f"find{name}s" for name in server.databases
+    ]
+
+
+async def test_execute_many_limits_concurrency():
+    """Test that no more queries are in flight than the limit allows."""
+    in_flight, most_in_flight = 0, 0
+
+    async def post(*args, **kwargs):
+        nonlocal in_flight, most_in_flight
+        in_flight += 1
+        most_in_flight = max(most_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return Mock(status_code=200, json=Mock(return_value={"data": {}}))
+
+    client = AsyncFiberyGraphQLClient(
+        url="https://test.fibery.io/api/graphql",
+        token="test-token",
+        client=Mock(post=post),
+    )
+
+    results = await client.execute_many(["query { test }"] * 6, max_concurrency=2)
+
+    assert len(results) == 6
+    assert most_in_flight == 2
+
+
+def test_http_settings_from_env(monkeypatch):
+    """Test that the pool, timeouts and retries can be configured."""
+    monkeypatch.setenv("VINEAPP_FIBERY_POOL_SIZE", "4")
+    monkeypatch.setenv("VINEAPP_FIBERY_CONNECT_TIMEOUT", "2")
+    monkeypatch.setenv("VINEAPP_FIBERY_READ_TIMEOUT", "10")
+    monkeypatch.setenv("VINEAPP_FIBERY_RETRIES", "0")
+    monkeypatch.setenv("VINEAPP_FIBERY_MAX_CONCURRENCY", "8")
+
+    settings = HTTPSettings.from_env()
+
+    assert settings.pool_size == 4
+    assert settings.timeout == (2.0, 10.0)
+    assert settings.retries == 0
+    assert settings.max_concurrency == 8
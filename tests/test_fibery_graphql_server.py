@@ -0,0 +1,81 @@
+"""Tests for the Fibery GraphQL stand-in server."""
+
+from typing import Generator
+
+import pytest
+import requests
+
+from vineapp.fibery.graphql import FiberyGraphQLClient
+from vineapp.fibery.graphql_server import FiberyGraphQLServer
+from vineapp.fibery.models import FiberySchema, get_fibery_info
+
+
+@pytest.fixture
+def server() -> Generator[FiberyGraphQLServer, None, None]:
+    """Serve the default databases of a space with a space in its name."""
+    with FiberyGraphQLServer(space="Serra Public") as server:
+        yield server
+
+
+@pytest.fixture
+def client(server, monkeypatch) -> FiberyGraphQLClient:
+    """Create a client configured for the server like the application is."""
+    monkeypatch.setenv("VINEAPP_FIBERY_URL", server.url)
+    monkeypatch.setenv("VINEAPP_FIBERY_SPACE", server.space)
+    info = get_fibery_info()
+    return FiberyGraphQLClient(url=str(info.graphql_url), token="any")
+
+
+def test_schema_lists_databases(client):
+    """Test that the schema has a type per database of the space."""
+    result = client.execute("query { __schema { types { name fields { name } } } }")
+
+    names = [t["name"] for t in result["data"]["__schema"]["types"]]
+    assert "SerraPublicActie" in names
+    assert "SerraPublicWerkdocument" in names
+
+
+def test_type_describes_fields(client):
+    """Test that a database type can be read as a schema."""
+    result = client.execute(
+        'query { __type(name: "SerraPublicActie") { name fields { name } } }'
+    )
+
+    schema = FiberySchema.from_type_info(result["data"]["__type"])
+    assert [(f.name, f.type_name) for f in schema.fields] == [
+        ("id", "ID"),
+        ("name", "String"),
+        ("description", "RichText"),
+    ]
+
+
+def test_unknown_type_is_null(client):
+    """Test that an unknown type is answered with null, like Fibery does."""
+    result = client.execute('query { __type(name: "Nothing") { name } }')
+
+    assert result == {"data": {"__type": None}}
+
+
+def test_find_entities(client):
+    """Test that the plural find field returns entities up to the limit."""
+    result = client.execute(
+        "query { findActies (limit: 3) { id name description { text } } }"
+    )
+
+    entities = result["data"]["findActies"]
+    assert [e["name"] for e in entities] == ["Actie 1", "Actie 2", "Actie 3"]
+    assert entities[0]["description"] == {"text": "Description of actie 1"}
+
+
+def test_unknown_field_is_an_error(client):
+    """Test that the singular find field is reported as a GraphQL error."""
+    result = client.execute("query { findActie (limit: 5) { id } }")
+
+    assert "findActie" in result["errors"][0]["message"]
+
+
+def test_requires_token(server):
+    """Test that requests without a token are refused."""
+    response = requests.post(server.url.rstrip("/") + server.path, json={})
+
+    assert response.status_code == 401
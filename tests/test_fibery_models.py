@@ -182,24 +182,21 @@ def test_fibery_database_from_name(mock_get_client):
     """Test that FiberyDatabase correctly loads from name."""
     # Given
     space_name = "TestSpace"
-    schema_response = {
-        "data": {
-            "__type": {
-                "name": "TestSpaceAction",
-                "fields": [
-                    {"name": "id", "type": {"name": "ID"}},
-                    {"name": "publicId", "type": {"name": "String"}},
-                    {"name": "creationDate", "type": {"name": "String"}},
-                    {"name": "modificationDate", "type": {"name": "String"}},
-                    {"name": "rank", "type": {"name": "Float"}},
-                    {"name": "createdBy", "type": {"name": "FiberyUser"}},
-                    {"name": "description", "type": {"name": "RichField"}},
-                    {"name": "name", "type": {"name": "String"}},
-                    {"name": "state", "type": {"name": "WorkflowStateTestSpaceAction"}},
-                ],
-            }
-        }
+    type_info = {
+        "name": "TestSpaceAction",
+        "fields": [
+            {"name": "id", "type": {"name": "ID"}},
+            {"name": "publicId", "type": {"name": "String"}},
+            {"name": "creationDate", "type": {"name": "String"}},
+            {"name": "modificationDate", "type": {"name": "String"}},
+            {"name": "rank", "type": {"name": "Float"}},
+            {"name": "createdBy", "type": {"name": "FiberyUser"}},
+            {"name": "description", "type": {"name": "RichField"}},
+            {"name": "name", "type": {"name": "String"}},
+            {"name": "state", "type": {"name": "WorkflowStateTestSpaceAction"}},
+        ],
     }
+    schema_response = {"data": {"__schema": {"types": [type_info]}}}
 
     entities_response = {
         "data": {
@@ -234,24 +231,21 @@ def test_fibery_database_handles_type_ending_with_s(mock_get_client):
     """Test that FiberyDatabase correctly handles type names ending with 's'."""
     # Given
     space_name = "TestSpace"
-    schema_response = {
-        "data": {
-            "__type": {
-                "name": "TestSpaceNews",
-                "fields": [
-                    {"name": "id", "type": {"name": "ID"}},
-                    {"name": "publicId", "type": {"name": "String"}},
-                    {"name": "creationDate", "type": {"name": "String"}},
-                    {"name": "modificationDate", "type": {"name": "String"}},
-                    {"name": "rank", "type": {"name": "Float"}},
-                    {"name": "createdBy", "type": {"name": "FiberyUser"}},
-                    {"name": "description", "type": {"name": "RichField"}},
-                    {"name": "name", "type": {"name": "String"}},
-                    {"name": "state", "type": {"name": "WorkflowStateTestSpaceNews"}},
-                ],
-            }
-        }
+    type_info = {
+        "name": "TestSpaceNews",
+        "fields": [
+            {"name": "id", "type": {"name": "ID"}},
+            {"name": "publicId", "type": {"name": "String"}},
+            {"name": "creationDate", "type": {"name": "String"}},
+            {"name": "modificationDate", "type": {"name": "String"}},
+            {"name": "rank", "type": {"name": "Float"}},
+            {"name": "createdBy", "type": {"name": "FiberyUser"}},
+            {"name": "description", "type": {"name": "RichField"}},
+            {"name": "name", "type": {"name": "String"}},
+            {"name": "state", "type": {"name": "WorkflowStateTestSpaceNews"}},
+        ],
     }
+    schema_response = {"data": {"__schema": {"types": [type_info]}}}
 
     entities_response = {
         "data": {
@@ -286,17 +280,14 @@ def test_fibery_database_handles_spaces_in_space_name(mock_get_client):
     """Test that FiberyDatabase correctly handles spaces in space names."""
     # Given
     space_name = "Test Space Name"
-    schema_response = {
-        "data": {
-            "__type": {
-                "name": "TestSpaceNameAction",
-                "fields": [
-                    {"name": "id", "type": {"name": "ID"}},
-                    {"name": "name", "type": {"name": "String"}},
-                ],
-            }
-        }
+    type_info = {
+        "name": "TestSpaceNameAction",
+        "fields": [
+            {"name": "id", "type": {"name": "ID"}},
+            {"name": "name", "type": {"name": "String"}},
+        ],
     }
+    schema_response = {"data": {"__schema": {"types": [type_info]}}}
 
     entities_response = {
         "data": {
@@ -0,0 +1,107 @@
+"""Tests for the Fibery schema cache."""
+
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from vineapp.fibery.schema import SchemaCache, get_schema_cache, parse_schema
+
+URL = "https://test.fibery.io/api/graphql/space/Public"
+
+
+def schema_result(*names: str) -> dict:
+    """Create a schema query result with a database type per name."""
+    types = [
+        {"name": name, "fields": [{"name": "id", "type": {"name": "ID"}}]}
+        for name in names
+    ]
+    return {"data": {"__schema": {"types": types}}}
+
+
+def test_parse_schema_reports_graphql_errors():
+    """Test that errors in the result are raised with their message."""
+    with pytest.raises(ValueError, match="GraphQL Error: Not allowed"):
+        parse_schema({"errors": [{"message": "Not allowed"}]})
+
+    with pytest.raises(ValueError, match="Unexpected API response format"):
+        parse_schema({"data": {}})
+
+
+def test_get_loads_the_schema_once():
+    """Test that later calls are answered without querying Fibery."""
+    # Given
+    cache = SchemaCache(URL)
+    client = Mock()
+    client.execute.return_value = schema_result("PublicActie")
+
+    # When
+    cache.get(client)
+    types = cache.get(client)
+
+    # Then
+    assert list(types) == ["PublicActie"]
+    client.execute.assert_called_once()
+
+
+async def test_aget_serves_a_stale_schema_while_reloading_it():
+    """Test that a stale schema is returned at once and replaced in the background."""
+    # Given
+    cache = SchemaCache(URL, ttl=0)
+    client = Mock(execute=AsyncMock())
+    client.execute.side_effect = [
+        schema_result("PublicActie"),
+        schema_result("PublicActie", "PublicLeerpunt"),
+    ]
+    await cache.aget(client)
+
+    # When
+    types = await cache.aget(client)
+    await cache._task
+
+    # Then
+    assert list(types) == ["PublicActie"]
+    assert list(await cache.aget(client)) == ["PublicActie", "PublicLeerpunt"]
+
+
+async def test_failed_reload_keeps_the_schema(caplog):
+    """Test that the schema is still served when reloading it fails."""
+    cache = SchemaCache(URL, ttl=0)
+    client = Mock(execute=AsyncMock())
+    client.execute.side_effect = [schema_result("PublicActie"), ConnectionError()]
+    await cache.aget(client)
+
+    await cache.aget(client)
+    await cache._task
+
+    assert list(await cache.aget(client)) == ["PublicActie"]
+    assert "Reloading the schema" in caplog.text
+
+
+def test_schema_is_kept_in_a_file(tmp_path):
+    """Test that a new cache starts with the schema another one saved."""
+    # Given
+    path = tmp_path / "fibery" / "schema.json"
+    SchemaCache(URL, path=path).update(schema_result("PublicActie"))
+    client = Mock()
+
+    # When
+    types = SchemaCache(URL, path=path).get(client)
+    other_space = SchemaCache(URL + "_2", path=path)
+
+    # Then
+    assert list(types) == ["PublicActie"]
+    client.execute.assert_not_called()
+    assert other_space._cached() is None
+
+
+def test_get_schema_cache_is_shared_per_url(monkeypatch, tmp_path):
+    """Test that the cache of a space is configured from the environment."""
+    monkeypatch.setenv("VINEAPP_FIBERY_SCHEMA_TTL", "60")
+    monkeypatch.setenv("VINEAPP_FIBERY_SCHEMA_CACHE_PATH", str(tmp_path / "s.json"))
+
+    cache = get_schema_cache(URL)
+
+    assert get_schema_cache(URL) is cache
+    assert get_schema_cache(URL + "_2") is not cache
+    assert cache.ttl == 60
+    assert cache.path == tmp_path / "s.json"
@@ -0,0 +1,117 @@
+"""Tests for the Arrow fetch path of the product repository."""
+
+from types import SimpleNamespace
+from typing import Generator
+
+import pyarrow as pa
+import pytest
+from pyarrow import flight
+
+from vineapp.products import Product
+from vineapp.products.arrow import PRODUCT_SCHEMA, read_flight, rebatch, stream_flight
+from vineapp.products.models import ProductTable
+
+
+class StaticFlightServer(flight.FlightServerBase):
+    """Flight server answering every command with the same table."""
+
+    def __init__(self, table: pa.Table):
+        super().__init__("grpc://127.0.0.1:0")
+        self.table = table
+        self.commands = []
+
+    def get_flight_info(self, context, descriptor):
+        self.commands.append(descriptor.command.decode())
+        endpoint = flight.FlightEndpoint(b"ticket", [])
+        return flight.FlightInfo(self.table.schema, descriptor, [endpoint], -1, -1)
+
+    def do_get(self, context, ticket):
+        return flight.RecordBatchStream(self.table)
+
+
+@pytest.fixture
+def flight_server() -> Generator[StaticFlightServer, None, None]:
+    """Serve two products over Arrow Flight."""
+    table = pa.table(
+        {
+            "id": pa.array([1, 2], pa.int32()),
+            "name": ["T. Bee 13", None],
+            "product_group_id": pa.array([113, 219], pa.int32()),
+            "product_group_name": ["13 aziaat", "19 oriëntal"],
+        }
+    )
+    with StaticFlightServer(table) as server:
+        yield server
+
+
+def test_read_flight_returns_arrow_table(flight_server):
+    """Test that a query is read over Flight into an Arrow table."""
+    # Given
+    client = flight.connect(f"grpc://127.0.0.1:{flight_server.port}")
+    connection = SimpleNamespace(flightclient=client, options=None)
+
+    # When
+    table = read_flight(connection, "SELECT * FROM products")
+
+    # Then
+    assert flight_server.commands == ["SELECT * FROM products"]
+    assert table.num_rows == 2
+    assert table["name"].to_pylist() == ["T. Bee 13", None]
+
+
+def test_get_all_arrow_matches_get_all(sqlite_repository):
+    """Test that the Arrow listing has the product schema and order."""
+    table = sqlite_repository.get_all_arrow()
+
+    assert table.schema == PRODUCT_SCHEMA
+    assert table["id"].to_pylist() == [p.id for p in sqlite_repository.get_all()]
+
+
+def test_fetch_arrow_renders_statement_literals(sqlite_repository):
+    """Test that statements with parameters are rendered before fetching."""
+    from sqlmodel import select
+
+    table = sqlite_repository.fetch_arrow(select(Product).where(Product.id == 7))
+
+    assert table["id"].to_pylist() == [7]
+
+
+def test_iter_all_streams_products_in_order(sqlite_repository):
+    """Test that streaming yields all products in the get_all order."""
+    batches = list(sqlite_repository.iter_batches(batch_size=10))
+
+    assert [b.num_rows for b in batches] == [10, 10, 5]
+    assert all(b.schema == PRODUCT_SCHEMA for b in batches)
+    assert list(sqlite_repository.iter_all(batch_size=4)) == list(
+        sqlite_repository.get_all()
+    )
+
+
+def test_stream_flight_yields_batches(flight_server):
+    """Test that Flight results are yielded batch by batch."""
+    client = flight.connect(f"grpc://127.0.0.1:{flight_server.port}")
+    connection = SimpleNamespace(flightclient=client, options=None)
+
+    batches = list(rebatch(stream_flight(connection, "SELECT 1"), batch_size=1))
+
+    assert [b.num_rows for b in batches] == [1, 1]
+
+
+def test_product_table_creates_products_lazily():
+    """Test that a product table behaves like a sequence of products."""
+    # Given
+    rows = [
+        {"id": i, "name": f"P{i}", "product_group_id": 1, "product_group_name": "G"}
+        for i in range(5)
+    ]
+    products = ProductTable(pa.Table.from_pylist(rows, schema=PRODUCT_SCHEMA))
+
+    # Then
+    assert len(products) == 5
+    assert products[-1] == Product(**rows[4])
+    assert [p.id for p in products[1:3]] == [1, 2]
+    assert [p.id for p in products[::2]] == [0, 2, 4]
+    assert [p.id for p in products[:1] + [products[4]]] == [0, 4]
+    assert list(products) == [Product(**row) for row in rows]
+    with pytest.raises(IndexError):
+        products[5]
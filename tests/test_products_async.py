@@ -0,0 +1,106 @@
+"""Tests for the async product repository."""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+import pytest
+
+from vineapp.products.async_repository import (
+    AsyncProductRepository,
+    get_executor,
+    shutdown_executor,
+)
+from vineapp.products.models import InvalidParameterError
+
+
+@pytest.fixture(autouse=True)
+def fresh_executor():
+    """Start and end every test without a shared executor."""
+    shutdown_executor()
+    yield
+    shutdown_executor()
+
+
+async def test_async_repository_returns_wrapped_result(sqlite_repository):
+    """Test that async methods return what the wrapped repository returns."""
+    repository = AsyncProductRepository(sqlite_repository)
+
+    page = await repository.get_paginated(page=2, items_per_page=5, sort_by="name")
+
+    assert page == sqlite_repository.get_paginated(
+        page=2, items_per_page=5, sort_by="name"
+    )
+    assert await repository.get_by_id(7) == sqlite_repository.get_by_id(7)
+
+
+async def test_async_repository_raises_wrapped_error(sqlite_repository):
+    """Test that errors of the wrapped repository reach the caller."""
+    repository = AsyncProductRepository(sqlite_repository)
+
+    with pytest.raises(InvalidParameterError):
+        await repository.get_paginated(page=0)
+
+
+async def test_async_repository_runs_off_the_event_loop():
+    """Test that blocking calls run on the executor's threads."""
+    wrapped = Mock()
+    wrapped.get_by_id.side_effect = lambda product_id: threading.current_thread()
+    repository = AsyncProductRepository(wrapped)
+
+    thread = await repository.get_by_id(1)
+
+    assert thread is not threading.current_thread()
+    assert thread.name.startswith("vineapp-db")
+
+
+async def test_async_repository_is_bounded_by_its_executor():
+    """Test that no more queries run at once than the executor has threads."""
+    running, peak = 0, 0
+    lock = threading.Lock()
+
+    def get_by_id(product_id):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        threading.Event().wait(0.02)
+        with lock:
+            running -= 1
+
+    wrapped = Mock()
+    wrapped.get_by_id.side_effect = get_by_id
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        repository = AsyncProductRepository(wrapped, executor)
+        await asyncio.gather(*(repository.get_by_id(i) for i in range(6)))
+
+    assert peak == 2
+
+
+def test_executor_is_shared_and_sized_from_env(monkeypatch):
+    """Test that the executor is created once with the configured size."""
+    monkeypatch.setenv("VINEAPP_DB_MAX_WORKERS", "3")
+
+    executor = get_executor()
+
+    assert get_executor() is executor
+    assert executor._max_workers == 3
+
+
+def test_executor_defaults_to_pool_capacity(monkeypatch):
+    """Test that the executor has as many threads as the pool has connections."""
+    monkeypatch.delenv("VINEAPP_DB_MAX_WORKERS", raising=False)
+    monkeypatch.setenv("VINEAPP_DB_POOL_SIZE", "4")
+    monkeypatch.setenv("VINEAPP_DB_POOL_MAX_OVERFLOW", "2")
+
+    assert get_executor()._max_workers == 6
+
+
+def test_shutdown_executor_replaces_executor():
+    """Test that a new executor is created after shutting down the old one."""
+    executor = get_executor()
+
+    shutdown_executor()
+
+    assert get_executor() is not executor
@@ -0,0 +1,194 @@
+"""Tests for the product query cache."""
+
+from unittest.mock import Mock
+
+import pytest
+
+from vineapp.products.cache import (
+    CachedProductRepository,
+    QueryCache,
+    estimate_size,
+    get_product_cache,
+)
+from vineapp.products.models import InvalidParameterError, Product
+
+
+@pytest.fixture
+def repository(sqlite_repository) -> Mock:
+    """Create a mock that answers with the SQLite repository."""
+    return Mock(wraps=sqlite_repository)
+
+
+def test_cached_repository_serves_repeated_page_from_cache(
+    repository, sqlite_repository
+):
+    """Test that the same page is only queried once."""
+    cached = CachedProductRepository(repository, QueryCache())
+
+    first = cached.get_paginated(page=2, items_per_page=5, filter_text="")
+    second = cached.get_paginated(page=2, items_per_page=5, filter_text=None)
+
+    assert first == second == sqlite_repository.get_paginated(page=2, items_per_page=5)
+    assert repository.get_paginated.call_count == 1
+    assert (cached.cache.stats.hits, cached.cache.stats.misses) == (1, 1)
+
+
+def test_cached_total_answers_calls_without_total(repository):
+    """Test that a page cached with its total serves calls that skip it."""
+    cached = CachedProductRepository(repository, QueryCache())
+
+    cached.get_paginated(page=1, sort_by="name", include_total=False)
+    cached.get_paginated(page=1, sort_by="name")
+    products, total = cached.get_paginated(page=1, sort_by="name", include_total=False)
+
+    assert repository.get_paginated.call_count == 2
+    assert total is None
+    assert len(products) == 10
+
+
+def test_cached_keyset_page(repository):
+    """Test that keyset pages are cached by cursor."""
+    cached = CachedProductRepository(repository, QueryCache())
+    first = cached.get_keyset_page(items_per_page=5)
+
+    again = cached.get_keyset_page(cursor=first.next_cursor, items_per_page=5)
+    cached.get_keyset_page(cursor=first.next_cursor, items_per_page=5)
+
+    assert repository.get_keyset_page.call_count == 2
+    assert again.products[0].id != first.products[0].id
+
+
+def test_cache_entries_expire():
+    """Test that entries are not served after their time to live."""
+    cache = QueryCache(ttl=0)
+
+    cache.put("key", "value")
+
+    assert cache.get("key") is None
+    assert cache.stats.expirations == 1
+    assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used_entries():
+    """Test that the cache keeps at most max_entries values."""
+    cache = QueryCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats.evictions == 1
+
+
+def test_cache_evicts_to_stay_within_max_bytes():
+    """Test that the cache keeps its estimated size below max_bytes."""
+    value = "x" * 1000
+    cache = QueryCache(max_bytes=int(estimate_size(value) * 2.5))
+
+    for key in "abc":
+        cache.put(key, value)
+
+    assert len(cache) == 2
+    assert cache.stats.bytes <= cache.max_bytes
+    assert cache.get("a") is None
+
+
+def test_cache_invalidation(repository):
+    """Test that invalidated results are queried again."""
+    cached = CachedProductRepository(repository, QueryCache())
+    cached.get_by_id(7)
+    cached.get_paginated()
+
+    removed = cached.cache.invalidate(lambda key: key[0] == "get_by_id")
+    cached.get_by_id(7)
+    cached.get_paginated()
+    cached.invalidate()
+    cached.get_paginated()
+
+    assert removed == 1
+    assert repository.get_by_id.call_count == 2
+    assert repository.get_paginated.call_count == 2
+
+
+def test_cache_remembers_missing_products(repository):
+    """Test that a lookup of an unknown id is cached as well."""
+    cached = CachedProductRepository(repository, QueryCache())
+
+    assert cached.get_by_id(999) is None
+    assert cached.get_by_id(999) is None
+    assert repository.get_by_id.call_count == 1
+
+
+def test_cache_does_not_keep_errors(repository):
+    """Test that invalid calls raise every time."""
+    cached = CachedProductRepository(repository, QueryCache())
+
+    for _ in range(2):
+        with pytest.raises(InvalidParameterError):
+            cached.get_paginated(page=0)
+    assert len(cached.cache) == 0
+
+
+def test_estimate_size_of_products():
+    """Test that larger products are estimated to use more memory."""
+    small = Product(id=1, name="A", product_group_id=1, product_group_name="G")
+    large = Product(id=1, name="A" * 100, product_group_id=1, product_group_name="G")
+
+    assert estimate_size([large]) - estimate_size([small]) >= 99
+
+
+def test_query_cache_from_env(monkeypatch):
+    """Test that the cache can be configured with environment variables."""
+    monkeypatch.setenv("VINEAPP_QUERY_CACHE_TTL", "5")
+    monkeypatch.setenv("VINEAPP_QUERY_CACHE_MAX_ENTRIES", "7")
+    monkeypatch.setenv("VINEAPP_QUERY_CACHE_MAX_BYTES", "1024")
+
+    cache = QueryCache.from_env()
+
+    assert (cache.ttl, cache.max_entries, cache.max_bytes) == (5.0, 7, 1024)
+
+
+def test_listed_products_are_found_by_id_without_query(repository):
+    """Test that products read with a page are served from the product map."""
+    cached = CachedProductRepository(repository, products=QueryCache())
+    products, _ = cached.get_paginated(page=1, items_per_page=5)
+
+    product = cached.get_by_id(products[2].id)
+
+    assert product == products[2]
+    repository.get_by_id.assert_not_called()
+
+
+def test_get_many_only_fetches_unknown_products(repository):
+    """Test that get_many queries just the ids missing from the product map."""
+    cached = CachedProductRepository(repository, products=QueryCache())
+    known = cached.get_by_id(7)
+
+    products = cached.get_many([7, 3, 999])
+
+    assert [p.id for p in products] == [7, 3]
+    assert products[0] is known
+    repository.get_many.assert_called_once_with([3, 999])
+
+
+def test_product_map_is_optional(repository):
+    """Test that without caches every read queries the repository."""
+    cached = CachedProductRepository(repository)
+
+    cached.get_by_id(7)
+    cached.get_by_id(7)
+
+    assert repository.get_by_id.call_count == 2
+
+
+def test_product_cache_from_env(monkeypatch):
+    """Test that the shared product map is configured from the environment."""
+    monkeypatch.setattr("vineapp.products.cache._product_cache", None)
+    monkeypatch.setenv("VINEAPP_PRODUCT_CACHE_MAX_ENTRIES", "50")
+
+    cache = get_product_cache()
+
+    assert (cache.max_entries, cache.ttl) == (50, 300.0)
@@ -0,0 +1,125 @@
+"""Tests for the shared, pooled database engines."""
+
+from typing import Generator
+
+import pytest
+from sqlalchemy import literal, select, text
+
+from vineapp.products import ProductRepository
+from vineapp.products.engine import (
+    PoolSettings,
+    dispose_engines,
+    get_engine,
+    get_pool_metrics,
+    get_statement_cache_stats,
+)
+
+CONNECTION = "sqlite:///:memory:"
+
+
+@pytest.fixture(autouse=True)
+def clean_registry() -> Generator[None, None, None]:
+    """Start and end every test with an empty engine registry."""
+    dispose_engines()
+    yield
+    dispose_engines()
+
+
+def run_query(engine) -> None:
+    """Check out a connection and run a trivial query."""
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+def test_engine_is_shared_per_connection_string():
+    """Test that the same connection string yields the same engine."""
+    assert get_engine(CONNECTION) is get_engine(CONNECTION)
+    assert get_engine(CONNECTION) is not get_engine("sqlite:///other.db")
+
+
+def test_repositories_share_the_engine(monkeypatch):
+    """Test that repositories created without an engine share one."""
+    monkeypatch.setenv("VINEAPP_DB_CONNECTION", CONNECTION)
+
+    assert ProductRepository().engine is ProductRepository().engine
+    assert ProductRepository(CONNECTION).engine is get_engine(CONNECTION)
+
+
+def test_pool_metrics_count_hits_and_misses():
+    """Test that reusing a pooled connection counts as a hit."""
+    # Given
+    engine = get_engine(CONNECTION, PoolSettings(size=1, pre_ping=False))
+
+    # When
+    run_query(engine)
+    run_query(engine)
+    run_query(engine)
+
+    # Then
+    metrics = get_pool_metrics(CONNECTION)
+    assert (metrics.checkouts, metrics.misses, metrics.hits) == (3, 1, 2)
+    assert metrics.hit_rate == pytest.approx(2 / 3)
+
+
+def test_pool_discards_idle_connections():
+    """Test that a connection idle for too long is replaced on checkout."""
+    # Given
+    engine = get_engine(CONNECTION, PoolSettings(size=1, max_idle=0))
+
+    # When
+    run_query(engine)
+    run_query(engine)
+
+    # Then
+    metrics = get_pool_metrics(CONNECTION)
+    assert metrics.idle_discards == 1
+    assert (metrics.misses, metrics.hits) == (2, 0)
+
+
+def test_pool_settings_from_env(monkeypatch):
+    """Test that pool settings can be configured with environment variables."""
+    monkeypatch.setenv("VINEAPP_DB_POOL_SIZE", "2")
+    monkeypatch.setenv("VINEAPP_DB_POOL_MAX_IDLE", "10")
+    monkeypatch.setenv("VINEAPP_DB_POOL_PRE_PING", "true")
+
+    settings = PoolSettings.from_env()
+
+    assert (settings.size, settings.max_idle, settings.pre_ping) == (2, 10.0, True)
+
+
+def test_pool_settings_skip_pre_ping_by_default(monkeypatch):
+    """Test that reused connections aren't health checked unless enabled."""
+    monkeypatch.delenv("VINEAPP_DB_POOL_PRE_PING", raising=False)
+
+    assert PoolSettings.from_env().pre_ping is False
+
+
+def test_statement_cache_compiles_queries_once():
+    """Test that queries differing only in their values reuse the compilation."""
+    # Given
+    engine = get_engine(CONNECTION, PoolSettings(size=1))
+
+    # When
+    with engine.connect() as connection:
+        for value in ("a", "b", "c"):
+            connection.execute(select(literal(value)))
+        connection.exec_driver_sql("SELECT 1")
+
+    # Then
+    stats = get_statement_cache_stats(CONNECTION)
+    assert (stats.misses, stats.hits, stats.uncached) == (1, 2, 0)
+    assert stats.hit_rate == pytest.approx(2 / 3)
+    assert 0 < stats.entries <= stats.capacity == 500
+
+
+def test_statement_cache_size_from_env(monkeypatch):
+    """Test that the statement cache can be sized or turned off."""
+    monkeypatch.setenv("VINEAPP_DB_STATEMENT_CACHE_SIZE", "0")
+    engine = get_engine(CONNECTION)
+
+    run_query(engine)
+    run_query(engine)
+
+    stats = get_statement_cache_stats(CONNECTION)
+    assert (stats.hits, stats.misses, stats.uncached) == (0, 0, 2)
+    assert stats.capacity == 0
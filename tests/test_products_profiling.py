@@ -0,0 +1,133 @@
+"""Tests for query profiling and metrics."""
+
+import logging
+import time
+from typing import Generator
+
+import pytest
+
+from vineapp.products.profiling import (
+    PHASES,
+    QueryMetrics,
+    QueryProfile,
+    get_query_metrics,
+    phase,
+    profile_query,
+    record_result,
+)
+
+
+@pytest.fixture
+def metrics() -> Generator[QueryMetrics, None, None]:
+    """Start every test with empty process-wide metrics."""
+    metrics = get_query_metrics()
+    metrics.reset()
+    yield metrics
+    metrics.reset()
+
+
+def test_phases_exclude_nested_time():
+    """Test that an enclosing phase leaves out the time of nested phases."""
+    with profile_query("op") as profile:
+        with phase("fetch"):
+            with phase("materialize"):
+                time.sleep(0.02)
+
+    assert profile.phases["materialize"] >= 0.02
+    assert profile.phases["fetch"] < 0.01
+    assert profile.total >= sum(profile.phases.values())
+
+
+def test_nested_profiles_count_toward_the_outer_one(metrics):
+    """Test that calls made inside a profiled call are not recorded twice."""
+    with profile_query("outer") as outer:
+        with profile_query("inner") as inner:
+            record_result(3, 30)
+
+    assert inner is None
+    assert (outer.rows, outer.bytes) == (3, 30)
+    assert list(metrics.operations()) == ["outer"]
+
+
+def test_errors_are_recorded(metrics):
+    """Test that a failing call is counted as an error and re-raised."""
+    with pytest.raises(ValueError):
+        with profile_query("op"):
+            raise ValueError("boom")
+
+    assert metrics.operations()["op"].errors == 1
+
+
+def test_repository_calls_are_profiled(sqlite_repository, metrics):
+    """Test that repository calls record their phases, rows and bytes."""
+    sqlite_repository.get_paginated(page=1, items_per_page=5)
+    sqlite_repository.get_all_arrow()
+
+    operations = metrics.operations()
+    page = operations["get_paginated"]
+    assert (page.count, page.rows) == (1, 5)
+    assert page.bytes > 0
+    assert page.phases["execute"] > 0
+    assert page.phases["fetch"] > 0
+    everything = operations["get_all"]
+    assert everything.rows == 25
+    assert everything.phases["materialize"] > 0
+
+
+def test_quantiles_cover_the_rolling_window():
+    """Test that quantiles are computed from recent calls only."""
+    metrics = QueryMetrics(window=60)
+    for seconds in (0.1, 0.2, 0.3, 0.4):
+        metrics.record(QueryProfile("op", total=seconds))
+
+    assert metrics.quantiles("op") == {0.5: 0.3, 0.95: 0.4, 0.99: 0.4}
+
+    metrics.window = 0
+    time.sleep(0.001)
+    assert metrics.quantiles("op") == {}
+    assert metrics.operations()["op"].count == 4
+
+
+def test_render_prometheus():
+    """Test that the histogram and counters are rendered per operation."""
+    metrics = QueryMetrics()
+    profile = QueryProfile("get_by_id", total=0.03, rows=1, bytes=40)
+    profile.add("execute", 0.02)
+    metrics.record(profile)
+
+    text = metrics.render_prometheus()
+
+    assert "# TYPE vineapp_query_duration_seconds histogram" in text
+    assert (
+        'vineapp_query_duration_seconds_bucket{operation="get_by_id",le="0.025"} 0'
+        in text
+    )
+    assert (
+        'vineapp_query_duration_seconds_bucket{operation="get_by_id",le="0.05"} 1'
+        in text
+    )
+    assert (
+        'vineapp_query_duration_seconds_bucket{operation="get_by_id",le="+Inf"} 1'
+        in text
+    )
+    assert 'vineapp_query_duration_seconds_count{operation="get_by_id"} 1' in text
+    assert (
+        'vineapp_query_phase_seconds_total{operation="get_by_id",phase="execute"} 0.02'
+        in text
+    )
+    assert 'vineapp_query_rows_total{operation="get_by_id"} 1' in text
+    assert len([line for line in text.splitlines() if "phase=" in line]) == len(PHASES)
+
+
+def test_slow_queries_are_logged_as_warnings(metrics, monkeypatch, caplog):
+    """Test that calls slower than the slow query threshold are warnings."""
+    monkeypatch.setattr(metrics, "slow_query_seconds", 0)
+
+    with caplog.at_level(logging.DEBUG, logger="vineapp.products.queries"):
+        with profile_query("op"):
+            record_result(2, 20)
+
+    (record,) = caplog.records
+    assert record.levelno == logging.WARNING
+    assert record.query["operation"] == "op"
+    assert record.query["rows"] == 2
@@ -0,0 +1,83 @@
+"""Tests for the reflection diagnostics of product queries."""
+
+from vineapp.products.models import ProductRepository
+from vineapp.products.reflections import (
+    ReflectionDiagnostics,
+    get_reflection_diagnostics,
+    parse_plan,
+)
+
+ACCELERATED_PLAN = """00-00    Screen
+00-01      Project(id=[$0], name=[$1])
+00-02        IcebergManifestList(table=[__accelerator."5a1d"."8c3f-22ab"], columns=[...])
+"""
+
+PLAN = """00-00    Screen
+00-01      TableFunction(Table Function Type=[DATA_FILE_SCAN], table=[Vines.products])
+"""
+
+
+def test_parse_plan_finds_reflections():
+    """Test that scans of reflections are recognised in a plan."""
+    assert parse_plan(ACCELERATED_PLAN) == (True, ["8c3f-22ab"])
+    assert parse_plan(PLAN) == (False, [])
+
+
+def test_each_shape_is_explained_once_per_interval():
+    """Test that only the first query of a shape is explained."""
+    diagnostics = ReflectionDiagnostics(explain_interval=60)
+
+    assert diagnostics.claim_explain("page")
+    assert not diagnostics.claim_explain("page")
+    assert diagnostics.claim_explain("count")
+
+
+def test_repository_records_query_shapes(sqlite_engine, monkeypatch):
+    """Test that queries are timed per shape and their plans are recorded."""
+    # Given
+    diagnostics = ReflectionDiagnostics()
+    repository = ProductRepository(sqlite_engine, diagnostics)
+    explained = []
+
+    def explain(sql):
+        explained.append(sql)
+        return ACCELERATED_PLAN if "LIMIT" in sql else PLAN
+
+    monkeypatch.setattr(repository, "explain", explain)
+
+    # When
+    repository.get_paginated(page=1)
+    repository.get_paginated(page=2)
+    repository.get_keyset_page(filter_text="bee")
+
+    # Then
+    report = {stats.shape: stats for stats in diagnostics.report()}
+    assert set(report) == {"page", "filtered keyset page", "count"}
+    assert report["page"].executions == 2
+    assert report["page"].accelerated is True
+    assert report["page"].reflections == ["8c3f-22ab"]
+    assert report["count"].accelerated is False
+    assert "LIMIT 10 OFFSET 0" in report["page"].sql
+    assert len(explained) == 3
+
+
+def test_failed_explain_does_not_break_queries(sqlite_repository):
+    """Test that a query still runs when its plan can't be read."""
+    # SQLite doesn't know EXPLAIN PLAN FOR
+    sqlite_repository.diagnostics = ReflectionDiagnostics()
+
+    product = sqlite_repository.get_by_id(7)
+
+    [stats] = sqlite_repository.diagnostics.report()
+    assert product.id == 7
+    assert (stats.shape, stats.accelerated, stats.executions) == ("by id", None, 1)
+    assert stats.error
+
+
+def test_diagnostics_are_off_by_default(monkeypatch):
+    """Test that no diagnostics are collected unless enabled."""
+    monkeypatch.delenv("VINEAPP_REFLECTION_DIAGNOSTICS", raising=False)
+    assert get_reflection_diagnostics() is None
+
+    monkeypatch.setenv("VINEAPP_REFLECTION_DIAGNOSTICS", "true")
+    assert get_reflection_diagnostics() is get_reflection_diagnostics()
@@ -0,0 +1,160 @@
+"""Tests for the product repository."""
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import select
+
+from vineapp.products.models import (
+    CustomDremioDialect,
+    InvalidParameterError,
+    Product,
+    ProductRepository,
+)
+
+
+def all_pages(repository, **kwargs):
+    """Walk a keyset listing from the first to the last page."""
+    pages = [repository.get_keyset_page(**kwargs)]
+    while pages[-1].next_cursor:
+        pages.append(repository.get_keyset_page(cursor=pages[-1].next_cursor))
+    return pages
+
+
+def test_keyset_pages_match_offset_pages(sqlite_repository):
+    """Test that walking keyset pages yields the same rows as offset pages."""
+    # When
+    pages = all_pages(sqlite_repository, items_per_page=10)
+
+    # Then
+    assert [len(p.products) for p in pages] == [10, 10, 5]
+    for number, page in enumerate(pages, start=1):
+        products, total = sqlite_repository.get_paginated(
+            page=number, items_per_page=10
+        )
+        assert page.products == products
+        assert page.total == total == 25
+
+
+def test_paginated_counts_total_with_the_page(sqlite_repository):
+    """Test that the total comes with the page, also for filtered listings."""
+    # When
+    products, total = sqlite_repository.get_paginated(
+        page=2, items_per_page=5, filter_text="okinawa"
+    )
+
+    # Then
+    assert len(products) == 5
+    assert total == 12
+
+
+def test_paginated_total_past_last_page(sqlite_repository):
+    """Test that the total is still known for a page past the last one."""
+    products, total = sqlite_repository.get_paginated(page=9, items_per_page=10)
+
+    assert products == []
+    assert total == 25
+
+
+def test_paginated_can_skip_total(sqlite_repository):
+    """Test that the total count can be skipped."""
+    products, total = sqlite_repository.get_paginated(include_total=False)
+
+    assert len(products) == 10
+    assert total is None
+
+
+def test_keyset_previous_cursor_returns_previous_page(sqlite_repository):
+    """Test that the previous cursor of a page leads back to the page before."""
+    # Given
+    first = sqlite_repository.get_keyset_page(items_per_page=7, sort_by="name")
+    second = sqlite_repository.get_keyset_page(cursor=first.next_cursor)
+
+    # When
+    back = sqlite_repository.get_keyset_page(cursor=second.previous_cursor)
+
+    # Then
+    assert first.previous_cursor is None
+    assert back.products == first.products
+    assert back.previous_cursor is None
+    assert back.next_cursor is not None
+
+
+def test_keyset_cursor_keeps_sort_and_filter(sqlite_repository):
+    """Test that a cursor continues the sorted and filtered listing it came from."""
+    # When
+    pages = all_pages(
+        sqlite_repository,
+        items_per_page=4,
+        sort_by="name",
+        descending=True,
+        filter_text="bee",
+    )
+
+    # Then
+    names = [p.name for page in pages for p in page.products]
+    assert len(names) == 13
+    assert names == sorted(names, reverse=True)
+    assert all("Bee" in name for name in names)
+
+
+def test_keyset_rejects_invalid_cursor(sqlite_repository):
+    """Test that a malformed cursor raises an invalid parameter error."""
+    with pytest.raises(InvalidParameterError, match="Invalid page cursor"):
+        sqlite_repository.get_keyset_page(cursor="not-a-cursor")
+
+
+def test_sort_by_unknown_column_is_rejected(sqlite_repository):
+    """Test that sorting by a column that doesn't exist is rejected."""
+    with pytest.raises(InvalidParameterError, match="unknown column"):
+        sqlite_repository.get_paginated(sort_by="price")
+
+
+def test_get_many_uses_a_single_query(sqlite_repository, sqlite_engine):
+    """Test that a batch of ids is resolved with one IN query."""
+    # Given
+    statements = []
+    event.listen(
+        sqlite_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    # When
+    products = sqlite_repository.get_many([7, 3, 999, 7])
+
+    # Then
+    assert [p.id for p in products] == [7, 3]
+    assert len(statements) == 1
+    assert "IN (7, 3, 999)" in statements[0]
+    assert sqlite_repository.get_many([]) == []
+
+
+def test_dremio_dialect_renders_escaped_literals():
+    """Test that bound values reach Dremio as escaped literals."""
+    query = select(Product).where(
+        ProductRepository._filter_clause("O'Brien"), Product.id == 3
+    )
+
+    compiled = query.compile(dialect=CustomDremioDialect())
+    sql = compiled.construct_expanded_state().statement
+
+    assert "lower('%O''Brien%')" in sql
+    assert '"Vines".products.id = 3' in sql
+
+
+def test_dremio_dialect_compiles_values_out_of_the_statement():
+    """Test that statements differing only in values share a compiled form."""
+    dialect = CustomDremioDialect()
+
+    first = select(Product).where(Product.id == 3).compile(dialect=dialect)
+    second = select(Product).where(Product.id == 4).compile(dialect=dialect)
+
+    assert str(first) == str(second)
+    assert dialect.supports_statement_cache
+
+
+def test_filter_matches_quotes_literally(sqlite_repository):
+    """Test that quotes in the filter text are matched, not interpreted."""
+    products, total = sqlite_repository.get_paginated(filter_text="x' OR '1'='1")
+
+    assert (products, total) == ([], 0)
@@ -0,0 +1,133 @@
+"""Tests for the product search index."""
+
+import pyarrow as pa
+import pytest
+from sqlalchemy import event
+
+from vineapp.products.cache import CachedProductRepository, QueryCache
+from vineapp.products.models import InvalidParameterError
+from vineapp.products.search import SearchIndex
+from vineapp.products.snapshot import ProductSnapshot
+
+
+def products_table(*rows) -> pa.Table:
+    """Create a products table from (id, name, product group name) rows."""
+    return pa.table(
+        {
+            "id": [r[0] for r in rows],
+            "name": [r[1] for r in rows],
+            "product_group_name": [r[2] for r in rows],
+        }
+    )
+
+
+def test_search_ranks_by_match_quality():
+    """Test that better matches come first, ties in table order."""
+    index = SearchIndex()
+    index.update(
+        products_table(
+            (1, "Rose 'Bee'", "Roses"),
+            (2, "Beekeeper", "Tools"),
+            (3, "Honeybee", "Bees"),
+            (4, "Bee", "Insects"),
+            (5, "Daisy", "Bee friendly"),
+            (6, "Tulip", "Bulbs"),
+            (7, "Bee Balm", "Herbs"),
+        )
+    )
+
+    assert index.search("BEE") == [4, 2, 7, 1, 3, 5]
+
+
+def test_search_short_text():
+    """Test that texts shorter than a trigram are matched too."""
+    index = SearchIndex()
+    index.update(products_table((1, "Fig", "Trees"), (2, "Olive", "Trees")))
+
+    assert index.search("o") == [2]
+    assert index.search("") == [1, 2]
+
+
+def test_update_reindexes_changed_products():
+    """Test that an update adds, renames and removes products."""
+    index = SearchIndex()
+    index.update(products_table((1, "Fig", "Trees"), (2, "Olive", "Trees")))
+
+    index.update(products_table((2, "Olive Fig", "Trees"), (3, "Figwort", "Herbs")))
+
+    assert index.search("fig") == [3, 2]
+    assert index.search("olive") == [2]
+    assert len(index) == 2
+    assert index.search("trees") == [2]
+
+
+def test_refresh_loads_only_when_stale():
+    """Test that the index is loaded again only after its ttl."""
+    index = SearchIndex(ttl=60)
+    loads = []
+
+    def load():
+        loads.append(1)
+        return products_table((1, "Fig", "Trees"))
+
+    index.refresh(load)
+    index.refresh(load)
+    index.refresh(load, force=True)
+
+    assert len(loads) == 2
+    assert not index.stale
+
+
+def test_repository_search_fetches_only_the_page(sqlite_repository, sqlite_engine):
+    """Test that a search fetches the page rows after loading the index once."""
+    # Given
+    index = SearchIndex()
+    sqlite_repository.search("okinawa", index=index)
+    # All names match as a word prefix, so they keep the default order
+    expected, _ = sqlite_repository.get_paginated(
+        page=2, items_per_page=5, filter_text="okinawa"
+    )
+    statements = []
+    event.listen(
+        sqlite_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+
+    # When
+    products, total = sqlite_repository.search(
+        "okinawa", page=2, items_per_page=5, index=index
+    )
+
+    # Then
+    assert total == 12
+    assert products == expected
+    assert len(statements) == 1
+
+
+def test_repository_search_validates_parameters(sqlite_repository):
+    """Test that invalid pages are rejected."""
+    with pytest.raises(InvalidParameterError):
+        sqlite_repository.search("bee", page=0, index=SearchIndex())
+
+
+def test_snapshot_search_matches_repository(sqlite_repository):
+    """Test that the snapshot ranks and pages search results the same way."""
+    snapshot = ProductSnapshot(sqlite_repository)
+
+    for text in ("19 s", "bee 01", "ok"):
+        assert snapshot.search(text, items_per_page=4) == sqlite_repository.search(
+            text, items_per_page=4, index=SearchIndex()
+        )
+
+
+def test_cached_search(sqlite_repository):
+    """Test that repeated searches are served from the query cache."""
+    snapshot = ProductSnapshot(sqlite_repository)
+    cached = CachedProductRepository(snapshot, QueryCache())
+
+    first = cached.search("Bee")
+    second = cached.search("bee")
+
+    assert first == second
+    assert cached.cache.stats.hits == 1
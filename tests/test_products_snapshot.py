@@ -0,0 +1,123 @@
+"""Tests for the in-memory product snapshot."""
+
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from vineapp.products.arrow import PRODUCT_SCHEMA
+from vineapp.products.models import InvalidParameterError, ProductTable
+from vineapp.products.snapshot import ProductSnapshot
+
+
+@pytest.fixture
+def snapshot(sqlite_repository) -> ProductSnapshot:
+    """Create a snapshot of the SQLite products."""
+    return ProductSnapshot(sqlite_repository)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {},
+        {"page": 2, "items_per_page": 7, "sort_by": "name"},
+        {"page": 3, "items_per_page": 4, "sort_by": "name", "descending": True},
+        {"filter_text": "OKI", "sort_by": "product_group_name"},
+        {"filter_text": "19 s", "items_per_page": 3, "page": 2},
+        {"filter_text": "no such product"},
+    ],
+)
+def test_snapshot_pages_match_repository(snapshot, sqlite_repository, kwargs):
+    """Test that the snapshot pages, sorts and filters like the repository."""
+    assert snapshot.get_paginated(**kwargs) == sqlite_repository.get_paginated(**kwargs)
+
+
+def test_snapshot_keyset_pages_match_repository(snapshot, sqlite_repository):
+    """Test that keyset cursors from the snapshot walk the same pages."""
+    # Given
+    first = snapshot.get_keyset_page(items_per_page=10, sort_by="name")
+
+    # When
+    second = snapshot.get_keyset_page(cursor=first.next_cursor)
+    back = snapshot.get_keyset_page(cursor=second.previous_cursor)
+
+    # Then
+    expected = sqlite_repository.get_keyset_page(cursor=first.next_cursor)
+    assert second.products == expected.products
+    assert back.products == first.products
+
+
+def test_snapshot_get_all_and_by_id(snapshot, sqlite_repository):
+    """Test that all products and single products are served from memory."""
+    products = snapshot.get_all()
+    assert isinstance(products, ProductTable)
+    assert products == sqlite_repository.get_all()
+    assert snapshot.get_by_id(7) == sqlite_repository.get_by_id(7)
+    assert snapshot.get_by_id(999) is None
+    assert snapshot.get_many([7, 999, 3]) == sqlite_repository.get_many([7, 999, 3])
+
+
+def test_snapshot_loads_once_until_refreshed():
+    """Test that the snapshot only queries the repository when (re)loading."""
+    # Given
+    repository = Mock()
+    repository.get_all_arrow.return_value = PRODUCT_SCHEMA.empty_table()
+    snapshot = ProductSnapshot(repository, ttl=60)
+
+    # When
+    snapshot.get_paginated()
+    snapshot.get_paginated(filter_text="bee")
+    snapshot.refresh()
+
+    # Then
+    assert repository.get_all_arrow.call_count == 2
+
+
+def test_snapshot_reloads_when_expired():
+    """Test that an expired snapshot is reloaded on next use."""
+    repository = Mock()
+    repository.get_all_arrow.return_value = PRODUCT_SCHEMA.empty_table()
+    snapshot = ProductSnapshot(repository, ttl=0)
+
+    snapshot.get_all()
+    snapshot.get_all()
+
+    assert repository.get_all_arrow.call_count == 2
+
+
+def test_snapshot_serves_the_old_table_while_reloading(sqlite_repository):
+    """Test that reads don't wait for a reload another caller started."""
+    # Given
+    old = sqlite_repository.get_all_arrow()
+    reloading, release = threading.Event(), threading.Event()
+
+    def get_all_arrow():
+        if repository.get_all_arrow.call_count > 1:
+            reloading.set()
+            release.wait(5)
+        return old.slice(0, 5)
+
+    repository = Mock(get_all_arrow=Mock(side_effect=get_all_arrow))
+    snapshot = ProductSnapshot(repository, ttl=60)
+    snapshot.get_all()
+    snapshot.ttl = 0
+    reload = threading.Thread(target=snapshot.get_all)
+    reload.start()
+    reloading.wait(5)
+
+    # When
+    products = snapshot.get_paginated(items_per_page=3)
+
+    # Then
+    release.set()
+    reload.join(5)
+    assert len(products[0]) == 3
+    assert repository.get_all_arrow.call_count == 2
+
+
+def test_snapshot_validates_parameters(snapshot):
+    """Test that the snapshot rejects the same invalid parameters."""
+    with pytest.raises(InvalidParameterError):
+        snapshot.get_paginated(page=0)
+    with pytest.raises(InvalidParameterError, match="unknown column"):
+        snapshot.get_paginated(sort_by="price")
@@ -12,3 +12,12 @@ def user(user: User) -> Generator[User, None, None]:
 
     startup()
     yield user
+
+
+@pytest.fixture(autouse=True)
+def forget_products() -> Generator[None, None, None]:
+    """Keep products read in one test out of the next one."""
+    from vineapp.products.cache import get_product_cache
+
+    yield
+    get_product_cache().invalidate()
@@ -1,7 +1,7 @@
 """Tests for knowledge base page functionality."""
 
 import os
-from unittest.mock import patch, Mock
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from nicegui import ui
@@ -54,6 +54,13 @@ def mock_graphql_response():
                                 {"name": "name", "type": {"name": "String"}},
                             ],
                         },
+                        {
+                            "name": "Query",
+                            "fields": [
+                                {"name": "findActions"},
+                                {"name": "findLearning"},
+                            ],
+                        },
                     ]
                 }
             }
@@ -85,10 +92,10 @@ def mock_graphql_response():
         },
     ]
 
-    with patch("requests.post") as mock_post:
+    with patch("httpx.AsyncClient.post", new_callable=AsyncMock) as mock_post:
 
         def mock_post_side_effect(*args, **kwargs):
-            mock_response = Mock()
+            mock_response = Mock(status_code=200)
             mock_response.raise_for_status.return_value = None
 
             # Get the current query being made
@@ -104,7 +111,7 @@ def mock_graphql_response():
             return mock_response
 
         mock_post.side_effect = mock_post_side_effect
-        yield
+        yield mock_post
 
 
 @pytest.fixture
@@ -112,8 +119,8 @@ def mock_graphql_schema_error():
     """Mock GraphQL API response with schema error."""
     error_response = {"errors": [{"message": "Type 'PublicActions' not found"}]}
 
-    with patch("requests.post") as mock_post:
-        mock_response = Mock()
+    with patch("httpx.AsyncClient.post", new_callable=AsyncMock) as mock_post:
+        mock_response = Mock(status_code=200)
         mock_response.raise_for_status.return_value = None
         mock_response.json.return_value = error_response
         mock_post.return_value = mock_response
@@ -125,15 +132,19 @@ def mock_graphql_invalid_schema():
     """Mock GraphQL API response with invalid schema structure."""
     invalid_response = {
         "data": {
-            "__type": {
-                "name": "PublicActions",
-                # Missing fields key
+            "__schema": {
+                "types": [
+                    {
+                        "name": "PublicActions",
+                        # Missing fields key
+                    }
+                ]
             }
         }
     }
 
-    with patch("requests.post") as mock_post:
-        mock_response = Mock()
+    with patch("httpx.AsyncClient.post", new_callable=AsyncMock) as mock_post:
+        mock_response = Mock(status_code=200)
         mock_response.raise_for_status.return_value = None
         mock_response.json.return_value = invalid_response
         mock_post.return_value = mock_response
@@ -155,7 +166,8 @@ def mock_graphql_response_plural():
                                 {"name": "id", "type": {"name": "ID"}},
                                 {"name": "name", "type": {"name": "String"}},
                             ],
-                        }
+                        },
+                        {"name": "Query", "fields": [{"name": "findLearnings"}]},
                     ]
                 }
             }
@@ -195,10 +207,10 @@ def mock_graphql_response_plural():
         },
     ]
 
-    with patch("requests.post") as mock_post:
+    with patch("httpx.AsyncClient.post", new_callable=AsyncMock) as mock_post:
 
         def mock_post_side_effect(*args, **kwargs):
-            mock_response = Mock()
+            mock_response = Mock(status_code=200)
             mock_response.raise_for_status.return_value = None
 
             # Get the current query being made
@@ -256,6 +268,22 @@ async def test_kb_page_shows_databases(
     await user.should_see("Learning")
 
 
+async def test_kb_pages_share_one_schema_query(
+    user: User, mock_env, mock_graphql_response
+) -> None:
+    """Test that the schema is introspected once for all knowledge base pages."""
+    # When
+    await user.open("/kb")
+    await user.open("/kb")
+    await user.open("/kb/database/Actions")
+
+    # Then
+    await user.should_see("Test Action")
+    queries = [c.kwargs["json"]["query"] for c in mock_graphql_response.call_args_list]
+    assert sum("__schema" in query for query in queries) == 1
+    assert sum("findActions" in query for query in queries) == 1
+
+
 async def test_kb_page_requires_env_var(user: User) -> None:
     """Test that the knowledge base page handles missing environment variable."""
     # When/Then
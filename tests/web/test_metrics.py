@@ -0,0 +1,21 @@
+"""Tests for the metrics endpoint."""
+
+from nicegui.testing import User
+
+from vineapp.products.profiling import get_query_metrics, profile_query
+
+
+async def test_metrics_endpoint_renders_query_metrics(user: User) -> None:
+    """Test that /metrics serves the query metrics in the Prometheus format."""
+    get_query_metrics().reset()
+    with profile_query("get_by_id"):
+        pass
+
+    response = await user.http_client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'vineapp_query_duration_seconds_count{operation="get_by_id"} 1' in (
+        response.text
+    )
+    assert "vineapp_event_loop_stalls_total" in response.text
@@ -1,11 +1,43 @@
 """Tests for web interface."""
 
 import asyncio
+import threading
 from unittest.mock import Mock, patch
+import pytest
 from nicegui.testing import User
-from nicegui import ui
+from nicegui import background_tasks, events, ui
 
+from vineapp.products.cache import CachedProductRepository, get_query_cache
 from vineapp.products.models import Product
+from vineapp.web.pages import products as products_page_module
+from vineapp.products.pagination import KeysetPage, decode_cursor
+
+
+@pytest.fixture
+def server_side(monkeypatch) -> None:
+    """Page, sort and filter every listing on the server, however small."""
+    monkeypatch.setenv("VINEAPP_CLIENT_SIDE_THRESHOLD", "0")
+
+
+async def request_page(user: User, table: ui.table, pagination: dict) -> None:
+    """Emit a table request event as the Quasar table does when paging."""
+    running = set(background_tasks.running_tasks)
+    with user.client:
+        for listener in table._event_listeners.values():
+            if listener.type == "request":
+                arguments = events.GenericEventArguments(
+                    sender=table, client=user.client, args={"pagination": pagination}
+                )
+                events.handle_event(listener.handler, arguments)
+    # The async handler runs as a background task; wait until it is done
+    await wait_for_handlers(running)
+
+
+async def wait_for_handlers(running: set) -> None:
+    """Wait for the event handlers started after the running tasks were noted."""
+    await asyncio.gather(
+        *(background_tasks.running_tasks - running), return_exceptions=True
+    )
 
 
 async def test_products_page_shows_table(user: User) -> None:
@@ -74,7 +106,12 @@ async def test_products_page_filtering_calls_repository(user) -> None:
         done_event = asyncio.Event()
 
         def on_get_paginated(
-            page=1, items_per_page=10, sort_by=None, descending=False, filter_text=""
+            page=1,
+            items_per_page=10,
+            sort_by=None,
+            descending=False,
+            filter_text="",
+            include_total=True,
         ):
             if filter_text == "mix":
                 done_event.set()  # Set the event when desired call is made
@@ -96,10 +133,69 @@ async def test_products_page_filtering_calls_repository(user) -> None:
 
         # Then verify repository was called with filter
         mock_repo.get_paginated.assert_called_with(
-            page=1, items_per_page=10, sort_by=None, descending=False, filter_text="mix"
+            page=1,
+            items_per_page=10,
+            sort_by=None,
+            descending=False,
+            filter_text="mix",
+            include_total=True,
         )
 
 
+async def test_products_page_next_page_uses_keyset_cursor(
+    user: User, monkeypatch, server_side
+) -> None:
+    """Test that moving to the next page seeks from the last row shown."""
+    monkeypatch.setenv("VINEAPP_PRODUCT_PREFETCH", "false")
+    with patch("vineapp.web.pages.products.ProductRepository") as mock_repo_class:
+        # Given
+        mock_repo = Mock()
+        mock_repo_class.return_value = mock_repo
+        first_page = [
+            Product(id=i, name=f"P{i}", product_group_id=1, product_group_name="G")
+            for i in range(1, 11)
+        ]
+        mock_repo.get_paginated.return_value = (first_page, 30)
+        mock_repo.get_keyset_page.return_value = KeysetPage(products=[], total=30)
+        await user.open("/products")
+        table = user.find(ui.table).elements.pop()
+
+        # When
+        await request_page(
+            user,
+            table,
+            {"page": 2, "rowsPerPage": 10, "sortBy": None, "descending": False},
+        )
+
+        # Then
+        cursor = mock_repo.get_keyset_page.call_args.kwargs["cursor"]
+        assert decode_cursor(cursor).values == ["G", "P10", 10]
+        mock_repo.get_paginated.assert_called_once()
+
+
+async def test_products_page_sorting_skips_total_count(user: User, server_side) -> None:
+    """Test that re-sorting with an unchanged filter doesn't count again."""
+    with patch("vineapp.web.pages.products.ProductRepository") as mock_repo_class:
+        # Given
+        mock_repo = Mock()
+        mock_repo_class.return_value = mock_repo
+        mock_repo.get_paginated.return_value = ([], 30)
+        await user.open("/products")
+        table = user.find(ui.table).elements.pop()
+        mock_repo.get_paginated.return_value = ([], None)
+
+        # When
+        await request_page(
+            user,
+            table,
+            {"page": 1, "rowsPerPage": 10, "sortBy": "name", "descending": True},
+        )
+
+        # Then
+        assert mock_repo.get_paginated.call_args.kwargs["include_total"] is False
+        assert table.pagination["rowsNumber"] == 30
+
+
 async def test_product_detail_page_shows_product(user: User) -> None:
     """Test that product detail page shows product information."""
     with patch("vineapp.web.pages.products.ProductRepository") as mock_repo_class:
@@ -135,3 +231,289 @@ async def test_product_detail_page_handles_invalid_id(user: User) -> None:
 
         # Then
         await user.should_see("Product not found")
+
+
+async def test_products_page_uses_snapshot_when_enabled(
+    user: User, monkeypatch
+) -> None:
+    """Test that the products page is served from the snapshot when enabled."""
+    # Given
+    snapshot = Mock()
+    snapshot.get_paginated.return_value = ([], 0)
+    monkeypatch.setenv("VINEAPP_PRODUCT_SNAPSHOT", "true")
+    monkeypatch.setattr(
+        "vineapp.web.pages.products.get_product_snapshot", lambda: snapshot
+    )
+
+    # When
+    await user.open("/products")
+
+    # Then
+    snapshot.get_paginated.assert_called_once()
+
+
+async def test_products_page_ignores_superseded_results(
+    user: User, monkeypatch
+) -> None:
+    """Test that a slow request can't overwrite the rows of a newer one."""
+    monkeypatch.setenv("VINEAPP_SEARCH_DEBOUNCE", "0")
+    with patch("vineapp.web.pages.products.ProductRepository") as mock_repo_class:
+        # Given
+        mock_repo = Mock()
+        mock_repo_class.return_value = mock_repo
+        release = threading.Event()
+
+        def on_get_paginated(filter_text=None, **kwargs):
+            if filter_text == "mi":
+                release.wait(timeout=2.0)  # Answer only after "mix" did
+            product = Product(
+                id=len(filter_text or ""),
+                name=f"Match {filter_text}",
+                product_group_id=1,
+                product_group_name="G",
+            )
+            return [product], 1
+
+        mock_repo.get_paginated.side_effect = on_get_paginated
+        await user.open("/products")
+        search_box = user.find(marker="search", kind=ui.input)
+        running = set(background_tasks.running_tasks)
+
+        # When
+        search_box.type("mi")
+        search_box.type("x")
+        for _ in range(20):  # Wait until the rows for "mix" are shown
+            if user.find(ui.table).elements.pop().rows[0]["id"] == 3:
+                break
+            await asyncio.sleep(0.05)
+        release.set()
+        await wait_for_handlers(running)
+
+        # Then
+        table = user.find(ui.table).elements.pop()
+        assert [row["name"] for row in table.rows] == ["Match mix"]
+
+
+async def test_products_page_keeps_table_state_per_user(create_user) -> None:
+    """Test that one user's filter doesn't change another user's table."""
+    with patch("vineapp.web.pages.products.ProductRepository") as mock_repo_class:
+        # Given
+        mock_repo = Mock()
+        mock_repo_class.return_value = mock_repo
+        mock_repo.get_paginated.return_value = ([], 0)
+        alice, bob = create_user(), create_user()
+        await alice.open("/products")
+        await bob.open("/products")
+        running = set(background_tasks.running_tasks)
+
+        # When
+        alice.find(marker="search", kind=ui.input).type("mix")
+        await wait_for_handlers(running)
+        table = bob.find(ui.table).elements.pop()
+        await request_page(
+            bob,
+            table,
+            {"page": 1, "rowsPerPage": 10, "sortBy": "name", "descending": False},
+        )
+
+        # Then
+        assert mock_repo.get_paginated.call_args.kwargs["filter_text"] == ""
+
+
+async def test_products_page_shows_recent_pages_without_query(
+    user: User, monkeypatch, server_side
+) -> None:
+    """Test that returning to a page this user just saw doesn't query again."""
+    monkeypatch.setenv("VINEAPP_PRODUCT_PREFETCH", "false")
+    with patch("vineapp.web.pages.products.ProductRepository") as mock_repo_class:
+        # Given
+        mock_repo = Mock()
+        mock_repo_class.return_value = mock_repo
+        mock_repo.get_paginated.return_value = ([], 30)
+        await user.open("/products")
+        sorted_by_name = {
+            "page": 1,
+            "rowsPerPage": 10,
+            "sortBy": "name",
+            "descending": False,
+        }
+        table = user.find(ui.table).elements.pop()
+        await request_page(user, table, sorted_by_name)
+
+        # When
+        table = user.find(ui.table).elements.pop()
+        await request_page(user, table, {**sorted_by_name, "sortBy": None})
+
+        # Then
+        assert mock_repo.get_paginated.call_count == 2
+
+
+async def test_products_page_debounces_search(user: User, monkeypatch) -> None:
+    """Test that typing quickly searches only once, for the final text."""
+    monkeypatch.setenv("VINEAPP_SEARCH_DEBOUNCE", "0.2")
+    with patch("vineapp.web.pages.products.ProductRepository") as mock_repo_class:
+        # Given
+        mock_repo = Mock()
+        mock_repo_class.return_value = mock_repo
+        mock_repo.get_paginated.return_value = ([], 0)
+        await user.open("/products")
+        search_box = user.find(marker="search", kind=ui.input)
+        running = set(background_tasks.running_tasks)
+
+        # When
+        for letter in "beg":
+            search_box.type(letter)
+            await asyncio.sleep(0.01)
+        await wait_for_handlers(running)
+
+        # Then
+        searches = [
+            c.kwargs["filter_text"] for c in mock_repo.get_paginated.call_args_list[1:]
+        ]
+        assert searches == ["beg"]
+
+
+def test_products_pages_use_query_cache_when_enabled(monkeypatch) -> None:
+    """Test that the products pages read through the shared query cache."""
+    monkeypatch.setenv("VINEAPP_QUERY_CACHE", "true")
+    with patch("vineapp.web.pages.products.ProductRepository") as mock_repo_class:
+        repository = products_page_module._get_repository()
+
+    assert isinstance(repository, CachedProductRepository)
+    assert repository.repository is mock_repo_class.return_value
+    assert repository.cache is get_query_cache()
+
+
+async def test_product_detail_page_reached_from_table_skips_query(user: User) -> None:
+    """Test that a product listed in the table is shown without a query."""
+    with patch("vineapp.web.pages.products.ProductRepository") as mock_repo_class:
+        # Given
+        mock_repo = Mock()
+        mock_repo_class.return_value = mock_repo
+        product = Product(
+            id=12,
+            name="T. Bee 13",
+            product_group_id=113,
+            product_group_name="13 aziaat",
+        )
+        mock_repo.get_paginated.return_value = ([product], 1)
+        await user.open("/products")
+
+        # When
+        await user.open("/products/12")
+
+        # Then
+        await user.should_see("T. Bee 13")
+        mock_repo.get_by_id.assert_not_called()
+
+
+async def test_products_page_prefetches_next_page(user: User, server_side) -> None:
+    """Test that the next page is loaded ahead and shown without waiting."""
+    with patch("vineapp.web.pages.products.ProductRepository") as mock_repo_class:
+        # Given
+        mock_repo = Mock()
+        mock_repo_class.return_value = mock_repo
+        first_page = [
+            Product(id=i, name=f"P{i}", product_group_id=1, product_group_name="G")
+            for i in range(1, 11)
+        ]
+        second_page = [
+            Product(id=i, name=f"P{i}", product_group_id=1, product_group_name="G")
+            for i in range(11, 21)
+        ]
+        mock_repo.get_paginated.return_value = (first_page, 30)
+        mock_repo.get_keyset_page.return_value = KeysetPage(
+            products=second_page, total=None, next_cursor="next"
+        )
+        await user.open("/products")
+        for _ in range(20):  # Wait until page 2 is prefetched
+            if mock_repo.get_keyset_page.called:
+                break
+            await asyncio.sleep(0.05)
+
+        # When
+        table = user.find(ui.table).elements.pop()
+        await request_page(
+            user,
+            table,
+            {"page": 2, "rowsPerPage": 10, "sortBy": None, "descending": False},
+        )
+
+        # Then
+        table = user.find(ui.table).elements.pop()
+        assert [row["id"] for row in table.rows] == list(range(11, 21))
+        assert table.pagination["rowsNumber"] == 30
+        assert mock_repo.get_keyset_page.call_count == 2  # Prefetching page 3
+        assert mock_repo.get_paginated.call_count == 1
+
+
+async def test_prefetch_drops_pages_of_outdated_requests() -> None:
+    """Test that a page prefetched while the listing changed isn't kept."""
+    # Given
+    state = products_page_module.ProductTableState(total=30, counted_filter="")
+    listing = (10, None, False, "")
+    state.cursors = {"listing": listing, "page": 1, "next": "n", "previous": None}
+    request = state.start_request()
+
+    async def get_keyset_page(**kwargs) -> KeysetPage:
+        # The user filters while the page is being fetched
+        state.start_request()
+        state.total = 3
+        return KeysetPage(products=[], total=None, next_cursor=None)
+
+    repository = Mock(get_keyset_page=get_keyset_page)
+
+    # When
+    await products_page_module._prefetch_neighbours(
+        repository, state, 1, listing, request
+    )
+
+    # Then
+    assert state.cached_page(2, listing) is None
+
+
+async def test_products_page_pages_small_listings_in_browser(user: User) -> None:
+    """Test that a listing below the threshold is sent to the browser at once."""
+    with patch("vineapp.web.pages.products.ProductRepository") as mock_repo_class:
+        # Given
+        mock_repo = Mock()
+        mock_repo_class.return_value = mock_repo
+        products = [
+            Product(id=i, name=f"P{i}", product_group_id=1, product_group_name="G")
+            for i in range(1, 31)
+        ]
+
+        def on_get_paginated(page=1, items_per_page=10, include_total=True, **kwargs):
+            rows = products[(page - 1) * items_per_page : page * items_per_page]
+            return rows, len(products) if include_total else None
+
+        mock_repo.get_paginated.side_effect = on_get_paginated
+
+        # When
+        await user.open("/products")
+
+        # Then
+        table = user.find(ui.table).elements.pop()
+        assert [row["id"] for row in table.rows] == list(range(1, 31))
+        assert "rowsNumber" not in table.pagination
+        assert mock_repo.get_paginated.call_args.kwargs["items_per_page"] == 30
+        mock_repo.get_keyset_page.assert_not_called()
+
+
+async def test_products_page_pages_large_listings_on_server(
+    user: User, monkeypatch
+) -> None:
+    """Test that a listing above the threshold keeps server side pagination."""
+    monkeypatch.setenv("VINEAPP_CLIENT_SIDE_THRESHOLD", "20")
+    with patch("vineapp.web.pages.products.ProductRepository") as mock_repo_class:
+        # Given
+        mock_repo = Mock()
+        mock_repo_class.return_value = mock_repo
+        mock_repo.get_paginated.return_value = ([], 30)
+
+        # When
+        await user.open("/products")
+
+        # Then
+        table = user.find(ui.table).elements.pop()
+        assert table.pagination["rowsNumber"] == 30
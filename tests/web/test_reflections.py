@@ -0,0 +1,42 @@
+"""Tests for the reflection diagnostics page."""
+
+from nicegui import ui
+from nicegui.testing import User
+
+from vineapp.products.reflections import get_reflection_diagnostics
+
+
+async def test_reflections_page_explains_how_to_enable(user: User, monkeypatch) -> None:
+    """Test that the page says how to turn the diagnostics on."""
+    monkeypatch.delenv("VINEAPP_REFLECTION_DIAGNOSTICS", raising=False)
+
+    await user.open("/products/reflections")
+
+    await user.should_see("VINEAPP_REFLECTION_DIAGNOSTICS=true", kind=ui.label)
+
+
+async def test_reflections_page_shows_query_shapes(user: User, monkeypatch) -> None:
+    """Test that the page lists the recorded query shapes."""
+    # Given
+    monkeypatch.setenv("VINEAPP_REFLECTION_DIAGNOSTICS", "true")
+    diagnostics = get_reflection_diagnostics()
+    diagnostics.reset()
+    diagnostics.record_plan("page", "SELECT ...", '__accelerator."a"."raw-1"')
+    diagnostics.record("page", 0.25)
+
+    # When
+    await user.open("/products/reflections")
+
+    # Then
+    table = user.find(ui.table).elements.pop()
+    assert table.rows == [
+        {
+            "shape": "page",
+            "accelerated": "yes",
+            "reflections": "raw-1",
+            "executions": 1,
+            "total_ms": 250.0,
+            "mean_ms": 250.0,
+        }
+    ]
+    diagnostics.reset()
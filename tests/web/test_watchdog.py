@@ -0,0 +1,68 @@
+"""Tests for the event loop watchdog and diagnostics page."""
+
+import asyncio
+import logging
+import time
+
+from nicegui.testing import User
+
+from vineapp.web.watchdog import LoopWatchdog, get_loop_watchdog
+
+
+def blocking_handler() -> None:
+    """Block the event loop like a synchronous query would."""
+    time.sleep(0.2)
+
+
+async def test_watchdog_samples_the_blocking_call(caplog) -> None:
+    """Test that a stall is recorded with the handler and stack that caused it."""
+    # Given
+    watchdog = LoopWatchdog(threshold=0.05, interval=0.01, modules=(__name__,))
+    watchdog.start()
+    await asyncio.sleep(0.05)
+
+    # When
+    with caplog.at_level(logging.WARNING, logger="vineapp.web.watchdog"):
+        blocking_handler()
+        await asyncio.sleep(0.05)
+    watchdog.stop()
+
+    # Then
+    (stall,) = watchdog.stalls()
+    assert stall.seconds >= 0.15
+    assert stall.handler == f"{__name__}.blocking_handler"
+    assert "time.sleep(0.2)" in stall.stack
+    assert watchdog.stats().stalls == 1
+    assert "blocking_handler" in caplog.text
+
+
+async def test_watchdog_ignores_short_lag() -> None:
+    """Test that a loop that keeps running has heartbeats but no stalls."""
+    watchdog = LoopWatchdog(threshold=0.05, interval=0.01)
+    watchdog.start()
+
+    await asyncio.sleep(0.1)
+    watchdog.stop()
+
+    assert watchdog.stalls() == []
+    assert watchdog.stats().samples > 0
+    assert not watchdog.running
+
+
+async def test_diagnostics_page_lists_stalls(user: User) -> None:
+    """Test that the diagnostics page shows the recorded stalls."""
+    watchdog = get_loop_watchdog()
+    watchdog._record(0.25, ("vineapp.web.pages.kb.kb_page", "requests.post(...)"))
+
+    await user.open("/diagnostics")
+
+    await user.should_see("250 ms in vineapp.web.pages.kb.kb_page")
+
+
+async def test_diagnostics_page_explains_how_to_enable(user: User, monkeypatch) -> None:
+    """Test that the page says how to turn the watchdog on."""
+    monkeypatch.setenv("VINEAPP_LOOP_LAG_THRESHOLD", "0")
+
+    await user.open("/diagnostics")
+
+    await user.should_see("Set VINEAPP_LOOP_LAG_THRESHOLD above 0")